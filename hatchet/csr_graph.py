@@ -0,0 +1,730 @@
+# Copyright 2017-2023 Lawrence Livermore National Security, LLC and other
+# Hatchet Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import numpy as np
+
+from .node import Node, mutation_count, traversal_order
+
+
+def _offsets(counts):
+    """Turn per-row counts into CSR offsets (length len(counts) + 1)."""
+    offsets = np.zeros(len(counts) + 1, dtype=np.int32)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets
+
+
+def segment_positions(offsets, selected):
+    """Positions covered by the CSR rows ``selected``.
+
+    Return:
+        (numpy.ndarray, numpy.ndarray): for every position, the index into
+            ``selected`` of the row it belongs to, and the position itself
+    """
+    starts = offsets[selected]
+    counts = offsets[selected + 1] - starts
+    owners = np.repeat(np.arange(len(selected)), counts)
+    positions = np.arange(counts.sum()) + np.repeat(starts - np.cumsum(counts), counts)
+    return owners, positions + counts[owners]
+
+
+class CSRGraph:
+    """A compact, array-backed representation of a Graph.
+
+    Nodes are identified by their position in the preorder traversal of
+    the graph (the order in which ``Graph.traverse()`` yields them), so a
+    preorder traversal is just ``range(len(csr))``. Parent and child
+    links are stored in compressed sparse row (CSR) form as int32 arrays,
+    and every node refers to its frame through an index into a table of
+    unique (interned) frames.
+
+    ``Node`` objects are only created when something asks for them (see
+    ``materialize``), so sizes, traversals over frame attributes, depths,
+    and tree checks can all be answered from the arrays alone.
+    """
+
+    def __init__(
+        self,
+        parent_offsets,
+        parent_indices,
+        child_offsets,
+        child_indices,
+        frame_ids,
+        frames,
+        depth,
+        roots,
+        nids=None,
+        nodes=None,
+    ):
+        self.parent_offsets = parent_offsets
+        self.parent_indices = parent_indices
+        self.child_offsets = child_offsets
+        self.child_indices = child_indices
+        self.frame_ids = frame_ids
+        self.frames = frames
+        self.depth = depth
+        self.roots = roots
+        if nids is None:
+            nids = np.arange(len(frame_ids), dtype=np.int32)
+        self.nids = nids
+
+        self._nodes = nodes
+        self._postorder = None
+        self._mutations = mutation_count()
+
+    def __getstate__(self):
+        """Pickle only the arrays and frames, not the materialized nodes."""
+        state = self.__dict__.copy()
+        state["_nodes"] = None
+        return state
+
+    def _nodes_match(self):
+        """Whether the materialized nodes have the links and frames that the
+        arrays describe (in any order)."""
+        nodes = self._nodes
+        index = {id(node): i for i, node in enumerate(nodes)}
+        child_offsets = self.child_offsets.tolist()
+        children = self.child_indices.tolist()
+        parent_offsets = self.parent_offsets.tolist()
+        parents = self.parent_indices.tolist()
+        frames = self.frames
+        for i, (node, fid) in enumerate(zip(nodes, self.frame_ids.tolist())):
+            if node.frame != frames[fid]:
+                return False
+            linked = sorted(index.get(id(child), -1) for child in node.children)
+            if linked != sorted(children[child_offsets[i] : child_offsets[i + 1]]):
+                return False
+            # dangling links to parents outside the graph are not in the arrays
+            linked = sorted(
+                index[id(parent)] for parent in node.parents if id(parent) in index
+            )
+            if linked != sorted(parents[parent_offsets[i] : parent_offsets[i + 1]]):
+                return False
+        return True
+
+    def is_current(self):
+        """False if the materialized nodes have been changed since the arrays
+        were built.
+
+        Links added with ``Node.add_child()`` or ``Node.add_parent()``, and
+        ``children``, ``parents``, ``frame`` or ``Graph.roots`` assignments
+        anywhere increase a single counter (see
+        ``hatchet.node.mutation_count``), so as long as it has not changed,
+        this is a single comparison. Otherwise, the nodes are compared with
+        the arrays once, as the changes may concern other graphs. Edits
+        inside the lists and frames of nodes are not noticed.
+        """
+        if self._nodes is None or self._mutations == mutation_count():
+            return True
+        if not self._nodes_match():
+            return False
+        self._mutations = mutation_count()
+        return True
+
+    def mark_current(self):
+        """Record that the materialized nodes still match the arrays, e.g.
+        after their children lists were reordered."""
+        self._mutations = mutation_count()
+
+    def __len__(self):
+        """Number of nodes in the graph."""
+        return len(self.frame_ids)
+
+    def children(self, index):
+        """Indices of the children of the node at ``index``, in traversal order."""
+        return self.child_indices[
+            self.child_offsets[index] : self.child_offsets[index + 1]
+        ]
+
+    def parents(self, index):
+        """Indices of the parents of the node at ``index``."""
+        return self.parent_indices[
+            self.parent_offsets[index] : self.parent_offsets[index + 1]
+        ]
+
+    def in_degree(self):
+        """Number of times each node is reached from a parent."""
+        return np.bincount(self.child_indices, minlength=len(self))
+
+    def is_tree(self):
+        """True if this graph is a tree, false otherwise."""
+        if len(self.roots) > 1:
+            return False
+        return len(self) == 0 or self.in_degree().max() <= 1
+
+    def parent_array(self):
+        """Index of the (first) parent of every node, or -1 for roots.
+
+        For trees this fully describes the graph structure.
+        """
+        parents = np.full(len(self), -1, dtype=np.int32)
+        has_parent = np.diff(self.parent_offsets) > 0
+        parents[has_parent] = self.parent_indices[self.parent_offsets[:-1][has_parent]]
+        return parents
+
+    def postorder(self):
+        """Node indices in the order of a postorder ``traverse()``."""
+        if self._postorder is None:
+            offsets = self.child_offsets.tolist()
+            children = self.child_indices.tolist()
+            visited = [False] * len(self)
+            order = []
+            for root in self.roots.tolist():
+                if visited[root]:
+                    continue
+                visited[root] = True
+                # explicit stack of (node, position of next child to visit)
+                stack = [(root, offsets[root])]
+                while stack:
+                    node, pos = stack[-1]
+                    if pos < offsets[node + 1]:
+                        stack[-1] = (node, pos + 1)
+                        child = children[pos]
+                        if not visited[child]:
+                            visited[child] = True
+                            stack.append((child, offsets[child]))
+                    else:
+                        stack.pop()
+                        order.append(node)
+            self._postorder = np.array(order, dtype=np.int32)
+        return self._postorder
+
+    def edges(self):
+        """All parent-child links as a pair of (parent, child) index arrays."""
+        parents = np.repeat(
+            np.arange(len(self), dtype=np.int32), np.diff(self.child_offsets)
+        )
+        return parents, self.child_indices
+
+    def parent_links(self):
+        """Every entry of the nodes' parents lists as a pair of (child,
+        parent) index arrays, grouped by child in list order.
+
+        Unlike the links returned by ``edges``, these keep the order of each
+        parents list, and a parent that a node lists several times.
+        """
+        children = np.repeat(
+            np.arange(len(self), dtype=np.int32), np.diff(self.parent_offsets)
+        )
+        return children, self.parent_indices
+
+    def up_links(self):
+        """The parent of every parent-child link, grouped by child.
+
+        Unlike ``parent_offsets`` and ``parent_indices``, these are derived
+        from the child links, so every link is listed exactly once.
+
+        Return:
+            (numpy.ndarray, numpy.ndarray): CSR offsets and parent indices
+        """
+        edge_parents, edge_children = self.edges()
+        by_child = np.argsort(edge_children, kind="stable")
+        offsets = _offsets(np.bincount(edge_children, minlength=len(self)))
+        return offsets, edge_parents[by_child]
+
+    def link_parents(self):
+        """Parent of every node according to the child links, or -1.
+
+        Readers do not always set ``Node.parents``, so for forests this is
+        more reliable than ``parent_array``. In graphs where a node has
+        several parents, one of them is picked arbitrarily.
+        """
+        parents = np.full(len(self), -1, dtype=np.int64)
+        edge_parents, edge_children = self.edges()
+        parents[edge_children] = edge_parents
+        return parents
+
+    def sibling_ranks(self, roots=None):
+        """Rank of every node among its siblings with an equal frame.
+
+        Siblings with equal frames are ranked in the order of their parent's
+        ``children`` list (or of ``roots``), which is the order in which
+        ``Graph.union`` pairs them up. Other nodes have rank 0.
+
+        Arguments:
+            roots (list, optional): root Node objects in the order of the
+                Graph's roots, if it differs from the CSRGraph's order
+        """
+        parents = self.link_parents()
+        ranks = np.zeros(len(self), dtype=np.int64)
+        keys = (parents + 1) * len(self.frames) + self.frame_ids
+        _, groups, counts = np.unique(keys, return_inverse=True, return_counts=True)
+        tied = np.flatnonzero(counts[groups] > 1)
+        if not len(tied):
+            return ranks
+
+        nodes = self.nodes
+        if roots is None:
+            roots = [nodes[r] for r in self.roots.tolist()]
+        list_positions = {}
+        positions = []
+        for i in tied.tolist():
+            parent = parents[i]
+            if parent not in list_positions:
+                siblings = nodes[parent].children if parent >= 0 else roots
+                list_positions[parent] = {id(n): k for k, n in enumerate(siblings)}
+            positions.append(list_positions[parent][id(nodes[i])])
+
+        order = np.lexsort((positions, groups[tied]))
+        tied_groups = groups[tied][order]
+        starts = np.flatnonzero(np.r_[True, tied_groups[1:] != tied_groups[:-1]])
+        ranks[tied[order]] = np.arange(len(tied)) - np.repeat(
+            starts, np.diff(np.r_[starts, len(tied)])
+        )
+        return ranks
+
+    def heights(self):
+        """Length of the longest path from each node down to a leaf.
+
+        Leaves have height 0, and every node is higher than all of its
+        children, so processing nodes by increasing height visits children
+        before their parents. Nodes that lie on or above a cycle have no
+        height and are marked with -1.
+        """
+        height = np.full(len(self), -1, dtype=np.int32)
+        up_offsets, up_parents = self.up_links()
+
+        remaining = np.diff(self.child_offsets).astype(np.int64)
+        frontier = np.flatnonzero(remaining == 0)
+        level = 0
+        while len(frontier):
+            height[frontier] = level
+            parents = up_parents[segment_positions(up_offsets, frontier)[1]]
+            np.subtract.at(remaining, parents, 1)
+            frontier = np.unique(parents[remaining[parents] == 0])
+            level += 1
+        return height
+
+    def descendants(self):
+        """Distinct nodes reachable from each node of an acyclic graph,
+        including itself.
+
+        The sets are built in postorder, each from the sets of the node's
+        children with duplicates removed, so shared subgraphs are only
+        visited once, and a set is dropped once all parents of its node have
+        used it. Time and memory are proportional to the sizes of the sets
+        that are built, not to the square of the number of nodes.
+
+        Yields:
+            (int, numpy.ndarray): each node, in postorder, and the indices
+                of its descendants
+        """
+        offsets = self.child_offsets.tolist()
+        children = self.child_indices.tolist()
+        pending = np.bincount(self.child_indices, minlength=len(self)).tolist()
+        sets = {}
+        for node in self.postorder().tolist():
+            kids = children[offsets[node] : offsets[node + 1]]
+            if not kids:
+                reach = np.array([node], dtype=np.int32)
+            else:
+                parts = [np.array([node], dtype=np.int32)]
+                parts.extend(sets[child] for child in kids)
+                reach = np.concatenate(parts)
+                if len(kids) > 1:
+                    reach = np.unique(reach)
+                for child in kids:
+                    pending[child] -= 1
+                    if pending[child] == 0:
+                        del sets[child]
+            if pending[node] > 0:
+                sets[node] = reach
+            yield node, reach
+
+    def traverse(self, order="pre", attrs=None):
+        """Traverse the graph depth-first without recursion.
+
+        Arguments:
+            order (str):  "pre" or "post" for preorder or postorder (default: pre)
+            attrs (list or str, optional): if provided, extract these fields
+                from frames while traversing and yield them instead of nodes
+        """
+        if order not in ("pre", "post"):
+            raise ValueError("order must be one of 'pre' or 'post'")
+
+        indices = range(len(self)) if order == "pre" else self.postorder().tolist()
+        if attrs is None:
+            nodes = self.nodes
+            for i in indices:
+                yield nodes[i]
+        else:
+            frames = self.frames
+            frame_ids = self.frame_ids
+            for i in indices:
+                yield frames[frame_ids[i]].values(attrs)
+
+    @property
+    def nodes(self):
+        """List of Node objects indexed like the arrays (created on demand)."""
+        if self._nodes is None:
+            self.materialize()
+        return self._nodes
+
+    def node(self, index):
+        """The Node object at ``index``."""
+        return self.nodes[index]
+
+    def materialize(self):
+        """Create linked Node objects for every node in the graph.
+
+        Return:
+            (list): the root nodes, in traversal order
+        """
+        if self._nodes is None:
+            frames = self.frames
+            nodes = [
+                Node(frames[f], None, nid, d)
+                for f, nid, d in zip(
+                    self.frame_ids.tolist(), self.nids.tolist(), self.depth.tolist()
+                )
+            ]
+            child_offsets = self.child_offsets.tolist()
+            children = self.child_indices.tolist()
+            parent_offsets = self.parent_offsets.tolist()
+            parents = self.parent_indices.tolist()
+            # the nodes are new, so linking them does not count as a change
+            for i, node in enumerate(nodes):
+                node._children = [
+                    nodes[c] for c in children[child_offsets[i] : child_offsets[i + 1]]
+                ]
+                node._parents = [
+                    nodes[p] for p in parents[parent_offsets[i] : parent_offsets[i + 1]]
+                ]
+            self._nodes = nodes
+            self._mutations = mutation_count()
+        return [self._nodes[r] for r in self.roots.tolist()]
+
+    def enumerate(self):
+        """Number nodes in preorder, updating any materialized nodes."""
+        self.nids = np.arange(len(self), dtype=np.int32)
+        if self._nodes is not None:
+            for i, node in enumerate(self._nodes):
+                node._hatchet_nid = i
+
+    def assign_depth(self):
+        """Copy the depth array onto any materialized nodes."""
+        if self._nodes is not None:
+            for node, depth in zip(self._nodes, self.depth.tolist()):
+                node._depth = depth
+
+    @staticmethod
+    def _compute_depth(roots, child_offsets, child_indices, num_nodes):
+        """Depth of each node at its first visit in a preorder traversal."""
+        depth = [-1] * num_nodes
+        offsets = child_offsets.tolist()
+        children = child_indices.tolist()
+        for root in roots.tolist():
+            depth[root] = 0
+        # nodes are numbered in preorder, so a node's discovering parent is
+        # always processed before the node itself
+        for node in range(num_nodes):
+            child_depth = depth[node] + 1
+            for child in children[offsets[node] : offsets[node + 1]]:
+                if depth[child] < 0:
+                    depth[child] = child_depth
+        return np.array(depth, dtype=np.int32)
+
+    @classmethod
+    def from_graph(cls, graph):
+        """Build a CSRGraph snapshot of an existing, Node-based Graph.
+
+        The Node objects of ``graph`` are reused as the materialized nodes,
+        and equal frames are interned into a single table.
+        """
+        # preorder, as in Node.traverse(), with an explicit stack; a node is
+        # skipped when it is popped again, so the order is the same
+        nodes = []
+        sorted_children = []
+        index = {}
+        stack = sorted(graph.roots, key=traversal_order)[::-1]
+        while stack:
+            node = stack.pop()
+            if id(node) in index:
+                continue
+            index[id(node)] = len(nodes)
+            nodes.append(node)
+            kids = sorted(node.children, key=traversal_order)
+            sorted_children.append(kids)
+            stack.extend(kids[::-1])
+        num_nodes = len(nodes)
+
+        # frames are equal if their tuple_reprs are
+        frame_table = {}
+        frames = []
+        frame_ids = np.empty(num_nodes, dtype=np.int32)
+        nids = np.empty(num_nodes, dtype=np.int32)
+        child_counts = np.zeros(num_nodes, dtype=np.int32)
+        parent_counts = np.zeros(num_nodes, dtype=np.int32)
+        children = []
+        parents = []
+        for i, (node, kids) in enumerate(zip(nodes, sorted_children)):
+            key = node.frame.tuple_repr
+            fid = frame_table.get(key)
+            if fid is None:
+                fid = frame_table[key] = len(frames)
+                frames.append(node.frame)
+            frame_ids[i] = fid
+            nids[i] = node._hatchet_nid
+
+            child_counts[i] = len(kids)
+            children.extend(index[id(c)] for c in kids)
+
+            # ignore dangling parent links to nodes outside the graph
+            pars = [index[id(p)] for p in node.parents if id(p) in index]
+            parent_counts[i] = len(pars)
+            parents.extend(pars)
+
+        child_offsets = _offsets(child_counts)
+        child_indices = np.array(children, dtype=np.int32)
+        roots = np.array(sorted({index[id(r)] for r in graph.roots}), dtype=np.int32)
+
+        return cls(
+            _offsets(parent_counts),
+            np.array(parents, dtype=np.int32),
+            child_offsets,
+            child_indices,
+            frame_ids,
+            frames,
+            cls._compute_depth(roots, child_offsets, child_indices, num_nodes),
+            roots,
+            nids,
+            nodes,
+        )
+
+    @classmethod
+    def from_edges(
+        cls,
+        edge_parents,
+        edge_children,
+        frame_ids,
+        frames,
+        depth,
+        roots,
+        nids=None,
+        parent_links=None,
+    ):
+        """Build a CSRGraph from the parent-child links returned by ``edges``.
+
+        Arguments:
+            edge_parents (array-like): parent index of every link, in
+                increasing order
+            edge_children (array-like): child index of every link, with the
+                children of each parent in traversal order
+            frame_ids (array-like): index into ``frames`` of each node's frame
+            frames (list): table of unique Frame objects
+            depth (array-like): depth of each node
+            roots (array-like): indices of the root nodes
+            nids (array-like, optional): _hatchet_nid of each node
+            parent_links (tuple, optional): the (child, parent) index arrays
+                returned by ``parent_links``; by default, the parents of each
+                node are those of its links, by increasing index
+        """
+        edge_parents = np.asarray(edge_parents, dtype=np.int32)
+        edge_children = np.asarray(edge_children, dtype=np.int32)
+        num_nodes = len(frame_ids)
+
+        if parent_links is None:
+            by_child = np.argsort(edge_children, kind="stable")
+            link_children, link_parents = (
+                edge_children[by_child],
+                edge_parents[by_child],
+            )
+        else:
+            link_children = np.asarray(parent_links[0], dtype=np.int32)
+            link_parents = np.asarray(parent_links[1], dtype=np.int32)
+        return cls(
+            _offsets(np.bincount(link_children, minlength=num_nodes)),
+            link_parents,
+            _offsets(np.bincount(edge_parents, minlength=num_nodes)),
+            edge_children,
+            np.asarray(frame_ids, dtype=np.int32),
+            frames,
+            np.asarray(depth, dtype=np.int32),
+            np.asarray(roots, dtype=np.int32),
+            None if nids is None else np.asarray(nids, dtype=np.int32),
+        )
+
+    @classmethod
+    def from_parents(cls, parents, frame_ids, frames, sort_keys=None):
+        """Build a CSRGraph for a forest from each node's parent.
+
+        Nodes are renumbered into preorder. Siblings are ordered by their
+        frames (as ``Node.traverse()`` orders them), with ties broken by
+        input position, unless ``sort_keys`` is given.
+
+        Arguments:
+            parents (array-like): input position of each node's parent, or
+                -1 for roots
+            frame_ids (array-like): index into ``frames`` of each node's frame
+            frames (list): table of unique Frame objects
+            sort_keys (array-like, optional): per-node key used to order
+                siblings instead of their frames
+
+        Return:
+            (CSRGraph, numpy.ndarray): the new graph, and for each of its
+                nodes the position of that node in the input arrays
+        """
+        parents = np.asarray(parents, dtype=np.int64)
+        frame_ids = np.asarray(frame_ids, dtype=np.int32)
+        num_nodes = len(parents)
+
+        if sort_keys is None:
+            frame_rank = np.empty(len(frames), dtype=np.int64)
+            frame_rank[sorted(range(len(frames)), key=frames.__getitem__)] = np.arange(
+                len(frames)
+            )
+            sort_keys = frame_rank[frame_ids]
+
+        # group nodes by parent (roots first, since their parent is -1), and
+        # order siblings by key, then by input position
+        grouped = np.lexsort((np.arange(num_nodes), sort_keys, parents))
+        num_roots = int(np.count_nonzero(parents < 0))
+        offsets = _offsets(np.bincount(parents[parents >= 0], minlength=num_nodes))
+
+        preorder = []
+        offsets_list = offsets.tolist()
+        children = grouped[num_roots:].tolist()
+        stack = grouped[:num_roots].tolist()[::-1]
+        while stack:
+            node = stack.pop()
+            preorder.append(node)
+            stack.extend(children[offsets_list[node] : offsets_list[node + 1]][::-1])
+        if len(preorder) != num_nodes:
+            raise ValueError("parents must describe a forest")
+        preorder = np.array(preorder, dtype=np.int64)
+
+        new_index = np.empty(num_nodes, dtype=np.int64)
+        new_index[preorder] = np.arange(num_nodes)
+        old_parents = parents[preorder]
+        new_parents = np.where(
+            old_parents >= 0, new_index[np.maximum(old_parents, 0)], -1
+        )
+
+        return cls.from_parent_index(new_parents, frame_ids[preorder], frames), preorder
+
+    @classmethod
+    def from_parent_index(cls, parents, frame_ids, frames):
+        """Build a CSRGraph from a parent array that is already in preorder.
+
+        Arguments:
+            parents (array-like): index of each node's parent, or -1 for
+                roots; every parent must precede its children and siblings
+                must appear in traversal order
+            frame_ids (array-like): index into ``frames`` of each node's frame
+            frames (list): table of unique Frame objects
+        """
+        parents = np.asarray(parents, dtype=np.int32)
+        num_nodes = len(parents)
+        has_parent = parents >= 0
+
+        # stable sort keeps siblings in increasing (preorder) position
+        children = np.flatnonzero(has_parent)
+        children = children[np.argsort(parents[children], kind="stable")]
+        child_offsets = _offsets(np.bincount(parents[has_parent], minlength=num_nodes))
+        child_indices = children.astype(np.int32)
+
+        depth = [0] * num_nodes
+        for i, p in enumerate(parents.tolist()):
+            if p >= 0:
+                depth[i] = depth[p] + 1
+
+        return cls(
+            _offsets(has_parent.astype(np.int32)),
+            parents[has_parent],
+            child_offsets,
+            child_indices,
+            np.asarray(frame_ids, dtype=np.int32),
+            frames,
+            np.array(depth, dtype=np.int32),
+            np.flatnonzero(~has_parent).astype(np.int32),
+        )
+
+
+def call_path_ids(graphs, ranks=None):
+    """Number the distinct call paths of the nodes of several forests.
+
+    Two nodes get the same id if the frames on their paths from a root are
+    equal, whichever graph they belong to. Ids are assigned level by level,
+    so the parent path of every path has a smaller id.
+
+    Arguments:
+        graphs (list): CSRGraphs in which every node has at most one parent
+        ranks (list, optional): for each graph, the rank of every node among
+            its siblings with an equal frame (see ``sibling_ranks``); if
+            given, such siblings get different ids, and are paired up with
+            the siblings of the same rank in the other graphs
+
+    Return:
+        (list, numpy.ndarray, numpy.ndarray, list): the path id of every
+            node of each graph, the parent path id (or -1) and frame index of
+            every path, and the table of frames; or None if some node cannot
+            be reached from a root
+    """
+    frame_table = {}
+    frames = []
+    sizes = [len(csr) for csr in graphs]
+    node_offsets = np.concatenate(([0], np.cumsum(sizes))).astype(np.int64)
+    num_nodes = int(node_offsets[-1])
+
+    parents = np.full(num_nodes, -1, dtype=np.int64)
+    frame_ids = np.empty(num_nodes, dtype=np.int64)
+    if ranks is None:
+        node_ranks = np.zeros(num_nodes, dtype=np.int64)
+    else:
+        node_ranks = np.concatenate([np.zeros(0, dtype=np.int64)] + list(ranks))
+    child_offsets = [np.zeros(1, dtype=np.int64)]
+    child_indices = []
+    for csr, start in zip(graphs, node_offsets[:-1].tolist()):
+        local_frames = []
+        for frame in csr.frames:
+            fid = frame_table.get(frame)
+            if fid is None:
+                fid = frame_table[frame] = len(frames)
+                frames.append(frame)
+            local_frames.append(fid)
+        local_frames = np.array(local_frames, dtype=np.int64)
+        frame_ids[start : start + len(csr)] = local_frames[csr.frame_ids]
+
+        local_parents = csr.link_parents()
+        parents[start : start + len(csr)] = np.where(
+            local_parents >= 0, start + local_parents, -1
+        )
+        child_offsets.append(child_offsets[-1][-1] + csr.child_offsets[1:])
+        child_indices.append(start + csr.child_indices.astype(np.int64))
+    child_offsets = np.concatenate(child_offsets)
+    child_indices = np.concatenate(child_indices) if child_indices else parents[:0]
+
+    path_ids = np.full(num_nodes, -1, dtype=np.int64)
+    path_parents = []
+    path_frames = []
+    num_paths = 0
+    level = np.flatnonzero(parents < 0)
+    visited = 0
+    while len(level):
+        parent_paths = np.where(
+            parents[level] >= 0, path_ids[np.maximum(parents[level], 0)], -1
+        )
+        keys = (parent_paths + 1) * len(frames) + frame_ids[level]
+        keys = np.unique(keys, return_inverse=True)[1]
+        keys = keys * (node_ranks[level].max() + 1) + node_ranks[level]
+        unique_keys, first, inverse = np.unique(
+            keys, return_index=True, return_inverse=True
+        )
+        path_ids[level] = num_paths + inverse
+        path_parents.append(parent_paths[first])
+        path_frames.append(frame_ids[level[first]])
+        num_paths += len(unique_keys)
+        visited += len(level)
+        level = child_indices[segment_positions(child_offsets, level)[1]]
+
+    if visited != num_nodes:
+        return None
+    if not path_parents:
+        path_parents = path_frames = [np.zeros(0, dtype=np.int64)]
+    return (
+        [path_ids[start:stop] for start, stop in zip(node_offsets, node_offsets[1:])],
+        np.concatenate(path_parents),
+        np.concatenate(path_frames),
+        frames,
+    )
@@ -5,7 +5,8 @@
 
 from collections import defaultdict
 
-from .node import Node, traversal_order, node_traversal_order
+from .node import Node, node_traversal_order, record_mutation, traversal_order
+from .csr_graph import CSRGraph
 
 
 def index_by(attr, objects):
@@ -21,13 +22,64 @@ def index_by(attr, objects):
 
 
 class Graph:
-    """A possibly multi-rooted tree or graph from one input dataset."""
+    """A possibly multi-rooted tree or graph from one input dataset.
+
+    A Graph may optionally be backed by a compact array representation
+    (see :class:`~hatchet.csr_graph.CSRGraph`, ``compact()`` and
+    ``from_csr()``). While it is, traversals, sizes, depths, and tree
+    checks run over the arrays, and Node objects are only created when
+    ``roots`` is first accessed.
+    """
 
     def __init__(self, roots):
         assert roots is not None
-        self.roots = roots
+        self._roots = roots
+        self._csr = None
         self.node_ordering = False
 
+    @property
+    def roots(self):
+        if self._roots is None:
+            self._roots = self._csr.materialize()
+        return self._roots
+
+    @roots.setter
+    def roots(self, roots):
+        # rewiring the roots means the arrays no longer describe the graph,
+        # nor any other graph that shares its nodes
+        self._roots = roots
+        self._csr = None
+        record_mutation()
+
+    def _current_csr(self):
+        """The array representation, or None if there is none or if nodes
+        have been relinked since it was built; such a snapshot is dropped.
+        """
+        if self._csr is not None and not self._csr.is_current():
+            self._roots = self.roots
+            self._csr = None
+        return self._csr
+
+    def compact(self):
+        """Back this graph with a compact array (CSR) representation.
+
+        The arrays are a snapshot of the current structure; they are dropped
+        again when the graph is rewired through Graph methods or its nodes
+        are relinked.
+
+        Return:
+            (Graph): self, for chaining
+        """
+        self._csr = CSRGraph.from_graph(self)
+        return self
+
+    def to_csr(self):
+        """Return a CSRGraph for this graph, building a snapshot if needed."""
+        csr = self._current_csr()
+        if csr is not None:
+            return csr
+        return CSRGraph.from_graph(self)
+
     def traverse(self, order="pre", attrs=None, visited=None):
         """Preorder traversal of all roots of this Graph.
 
@@ -38,6 +90,11 @@ class Graph:
 
         Only preorder traversal is currently supported.
         """
+        if visited is None and self._current_csr() is not None:
+            for value in self._csr.traverse(order=order, attrs=attrs):
+                yield value
+            return
+
         # share visited dict so that we visit each node at most once.
         if visited is None:
             visited = {}
@@ -71,6 +128,9 @@ class Graph:
 
     def is_tree(self):
         """True if this graph is a tree, false otherwise."""
+        if self._current_csr() is not None:
+            return self._csr.is_tree()
+
         if len(self.roots) > 1:
             return False
 
@@ -343,6 +403,10 @@ class Graph:
         return graph
 
     def enumerate_depth(self):
+        if self._current_csr() is not None:
+            self._csr.assign_depth()
+            return
+
         def _iter_depth(node, visited):
             for child in node.children:
                 if child not in visited:
@@ -357,11 +421,19 @@ class Graph:
             _iter_depth(root, visited)
 
     def enumerate_traverse(self):
+        if not self.node_ordering and self._current_csr() is not None:
+            # array positions are already in preorder
+            self._csr.enumerate()
+            self._csr.assign_depth()
+            return
+
         if not self._check_enumerate_traverse():
             # if "node order" column exists, we traverse sorting by _hatchet_nid
             if self.node_ordering:
                 for i, node in enumerate(self.node_order_traverse()):
                     node._hatchet_nid = i
+                # node order numbering is not preorder, so drop the arrays
+                self._csr = None
             else:
                 for i, node in enumerate(self.traverse()):
                     node._hatchet_nid = i
@@ -381,6 +453,8 @@ class Graph:
 
     def __len__(self):
         """Size of the graph in terms of number of nodes."""
+        if self._current_csr() is not None:
+            return len(self._csr)
         return sum(1 for _ in self.traverse())
 
     def __eq__(self, other):
@@ -418,6 +492,17 @@ class Graph:
     def __ne__(self, other):
         return not (self == other)
 
+    @staticmethod
+    def from_csr(csr):
+        """Create a Graph backed by a CSRGraph without creating any nodes.
+
+        Node objects are materialized the first time ``roots`` is accessed.
+        """
+        graph = Graph([])
+        graph._roots = None
+        graph._csr = csr
+        return graph
+
     @staticmethod
     def from_lists(*roots):
         """Convenience method to invoke Node.from_lists() on each root value."""
@@ -4,18 +4,20 @@
 # SPDX-License-Identifier: MIT
 
 import copy
+import os
 import sys
 import traceback
 
 from collections import defaultdict
+from operator import attrgetter
 
 import pandas as pd
 import numpy as np
 import multiprocess as mp
-import json
 
-from .node import Node
+from .node import MultiplePathError, Node
 from .graph import Graph
+from .csr_graph import CSRGraph, call_path_ids, segment_positions
 from .frame import Frame
 from .query import (
     is_hatchet_query,
@@ -27,6 +29,7 @@ from .query import (
 from .external.console import ConsoleRenderer
 from .util.dot import trees_to_dot
 from .util.deprecated import deprecated_params
+from .util.executor import apply_rows, recursion_limit, use_parallel
 
 try:
     from .cython_modules.libs import graphframe_modules as _gfm_cy
@@ -40,12 +43,47 @@ except ImportError:
     raise
 
 
-def parallel_apply(filter_function, dataframe, queue):
-    """A function called in parallel, which does a pandas apply on part of a
-    dataframe and returns the results via multiprocessing queue function."""
-    filtered_rows = dataframe.apply(filter_function, axis=1)
-    filtered_df = dataframe[filtered_rows]
-    queue.put(filtered_df)
+def _sum_min_count(series):
+    """Sum of a series, or NaN if it has no values."""
+    return series.sum(min_count=1)
+
+
+def _node_positions(dframe, csr):
+    """Position in a CSRGraph of the node of every row of a DataFrame, or
+    None if some nodes are not in the graph."""
+    index = dframe.index
+    node_level = (
+        index.get_level_values("node") if isinstance(index, pd.MultiIndex) else index
+    )
+    node_ids = np.fromiter(map(id, node_level), dtype=np.uint64, count=len(node_level))
+    codes, uniques = pd.factorize(node_ids)
+    positions = {id(node): i for i, node in enumerate(csr.nodes)}
+    unique_positions = np.array(
+        [positions.get(key, -1) for key in uniques.tolist()], dtype=np.int64
+    )
+    if (unique_positions < 0).any():
+        return None
+    return unique_positions[codes]
+
+
+def _node_ids(nodes):
+    """Node id of every node in an array."""
+    return np.fromiter(
+        map(attrgetter("_hatchet_nid"), nodes), dtype=np.int64, count=len(nodes)
+    )
+
+
+def _node_id_index(index):
+    """Copy of a DataFrame index with node ids in place of Node objects."""
+    if isinstance(index, pd.MultiIndex):
+        levels = [
+            _node_ids(index.get_level_values(name))
+            if name == "node"
+            else index.get_level_values(name)
+            for name in index.names
+        ]
+        return pd.MultiIndex.from_arrays(levels, names=index.names)
+    return pd.Index(_node_ids(index), name=index.name)
 
 
 class GraphFrame:
@@ -95,20 +133,31 @@ class GraphFrame:
         self.query_engine = QueryEngine()
 
     @staticmethod
-    def from_hpctoolkit(dirname):
+    def from_hpctoolkit(dirname, ranks=None, threads=None, metrics=None):
         """Read an HPCToolkit database directory into a new GraphFrame.
 
+        Both the experiment.xml and metric-db files of older versions of
+        HPCToolkit, and the sparse meta.db and profile.db files of newer
+        versions are supported.
+
         Arguments:
             dirname (str): parent directory of an HPCToolkit
-                experiment.xml file
+                experiment.xml or meta.db file
+            ranks (list, optional): MPI ranks to read (default: all)
+            threads (list, optional): thread ids to read (default: all)
+            metrics (list, optional): metrics to read, e.g., ["time"]
+                (default: all)
 
         Returns:
             (GraphFrame): new GraphFrame containing HPCToolkit profile data
         """
         # import this lazily to avoid circular dependencies
         from .readers.hpctoolkit_reader import HPCToolkitReader
+        from .readers.hpctoolkit_sparse_reader import HPCToolkitSparseReader
 
-        return HPCToolkitReader(dirname).read()
+        if os.path.exists(os.path.join(str(dirname), "meta.db")):
+            return HPCToolkitSparseReader(dirname, ranks, threads, metrics).read()
+        return HPCToolkitReader(dirname, ranks, threads, metrics).read()
 
     @staticmethod
     def from_caliper(filename_or_stream, query=None):
@@ -151,6 +200,7 @@ class GraphFrame:
         level="loop.start_iteration",
         native=False,
         string_attributes=[],
+        combined=False,
     ):
         """Read in a native Caliper timeseries `cali` file using Caliper's python reader.
 
@@ -160,13 +210,16 @@ class GraphFrame:
             native (bool): use native or user-readable metric names (default)
             string_attributes (str or list, optional): Adds existing string
                 attributes from within the caliper file to the dataframe
+            combined (bool, optional): return a single graphframe of all the
+                timesteps, with a "timestep" index level, instead of a list
+                of graphframes (one per timestep)
         """
         # import this lazily to avoid circular dependencies
         from .readers.caliper_native_reader import CaliperNativeReader
 
         return CaliperNativeReader(
             filename_or_caliperreader, native, string_attributes
-        ).read_timeseries(level=level)
+        ).read_timeseries(level=level, combined=combined)
 
     @staticmethod
     def from_spotdb(db_key, list_of_ids=None):
@@ -217,15 +270,21 @@ class GraphFrame:
         return PyinstrumentReader(filename).read()
 
     @staticmethod
-    def from_tau(dirname):
-        """Read in a profile generated using TAU."""
+    def from_tau(dirname, num_procs=mp.cpu_count()):
+        """Read in a profile generated using TAU.
+
+        Arguments:
+            dirname (str): directory of the TAU profiles
+            num_procs (int, optional): number of worker processes used to
+                parse the profiles of the ranks, if there are many of them
+        """
         # import this lazily to avoid circular dependencies
         from .readers.tau_reader import TAUReader
 
-        return TAUReader(dirname).read()
+        return TAUReader(dirname, num_procs).read()
 
     @staticmethod
-    def from_timemory(input=None, select=None, **_kwargs):
+    def from_timemory(input=None, select=None, ranks=None, **_kwargs):
         """Read in timemory data.
 
         Links:
@@ -278,6 +337,11 @@ class GraphFrame:
 
             select (list of str):
                 A list of strings which match the component enumeration names, e.g. ["cpu_clock"].
+                The other components are skipped when reading a JSON file.
+
+            ranks (list of int):
+                The MPI and/or UPC++ ranks to read. The data of the other MPI
+                ranks is skipped when reading a JSON file.
 
             per_thread (boolean):
                 Ensures that when applying filters to the graphframe, frames with
@@ -294,14 +358,16 @@ class GraphFrame:
 
         if input is not None:
             try:
-                return TimemoryReader(input, select, **_kwargs).read()
+                return TimemoryReader(input, select, ranks, **_kwargs).read()
             except IOError:
                 pass
         else:
             try:
                 import timemory
 
-                TimemoryReader(timemory.get(hierarchy=True), select, **_kwargs).read()
+                TimemoryReader(
+                    timemory.get(hierarchy=True), select, ranks, **_kwargs
+                ).read()
             except ImportError:
                 print(
                     "Error! timemory could not be imported. Provide filename, file stream, or dict."
@@ -357,6 +423,35 @@ class GraphFrame:
 
         HDF5Writer(filename).write(self, key=key, **kwargs)
 
+    @staticmethod
+    def from_parquet(dirname, columns=None):
+        """Read in a GraphFrame written by ``to_parquet``. Requires pyarrow.
+
+        Arguments:
+            dirname (str): directory the GraphFrame was written to
+            columns (list, optional): dataframe columns to read (default: all)
+
+        Returns:
+            (GraphFrame): new GraphFrame
+        """
+        # import this lazily to avoid circular dependencies
+        from .readers.parquet_reader import ParquetReader
+
+        return ParquetReader(dirname).read(columns=columns)
+
+    def to_parquet(self, dirname, **kwargs):
+        """Write the GraphFrame to a directory of Parquet files. Requires
+        pyarrow.
+
+        Arguments:
+            dirname (str): directory to write to (created if needed)
+            kwargs: passed on to ``pyarrow.parquet.write_table``
+        """
+        # import this lazily to avoid circular dependencies
+        from .writers.parquet_writer import ParquetWriter
+
+        ParquetWriter(dirname).write(self, **kwargs)
+
     def copy(self):
         """Return a partially shallow copy of the graphframe.
 
@@ -432,6 +527,7 @@ class GraphFrame:
                 agg_dict[col] = lambda x: x.iloc[0]
 
         # perform a groupby to merge nodes that just differ in index columns
+        self.query_engine.invalidate_cache(self.dataframe)
         self.dataframe.reset_index(level="node", inplace=True)
         agg_df = self.dataframe.groupby("node").agg(agg_dict)
 
@@ -448,100 +544,87 @@ class GraphFrame:
     ):
         """Filter the dataframe using a user-supplied function.
 
-        Note: Operates in parallel on user-supplied lambda functions.
+        Note: Operates in parallel on user-supplied lambda functions, for
+        DataFrames with at least ``hatchet.util.executor.parallel_min_rows``
+        rows.
 
         Arguments:
             filter_obj (callable, list, or QueryMatcher): the filter to apply to the GraphFrame.
             squash (boolean, optional): if True, automatically call squash for the user.
             update_inc_cols (boolean, optional): if True, update inclusive columns when performing squash.
-            rec_limit: set Python recursion limit, increase if running into
-                recursion depth errors) (default: 1000).
+            num_procs (int, optional): number of worker processes used to
+                apply a callable filter (default: all CPUs).
+            rec_limit: minimum Python recursion limit while filtering,
+                increase if running into recursion depth errors) (default: 1000).
         """
-        sys.setrecursionlimit(rec_limit)
-
-        dataframe_copy = self.dataframe.copy()
-
-        index_names = self.dataframe.index.names
-        dataframe_copy.reset_index(inplace=True)
-
-        filtered_df = None
-
-        if callable(filter_obj):
-            # applying pandas filter using the callable function
-            if num_procs > 1:
-                # perform filter in parallel (default)
-                queue = mp.Queue()
-                processes = []
-                returned_frames = []
-                subframes = np.array_split(dataframe_copy, num_procs)
-
-                # Manually create a number of processes equal to the number of
-                # logical cpus available
-                for pid in range(num_procs):
-                    process = mp.Process(
-                        target=parallel_apply,
-                        args=(filter_obj, subframes[pid], queue),
+        with recursion_limit(rec_limit):
+            dataframe_copy = self.dataframe.copy()
+
+            index_names = self.dataframe.index.names
+            dataframe_copy.reset_index(inplace=True)
+
+            filtered_df = None
+
+            if callable(filter_obj):
+                # applying pandas filter using the callable function
+                filtered_rows = None
+                if use_parallel(len(dataframe_copy), num_procs):
+                    # perform filter in parallel in the shared pool of worker
+                    # processes, which only send back the result for each row
+                    filtered_rows = apply_rows(
+                        filter_obj, dataframe_copy, num_procs, self.graph
                     )
-                    process.start()
-                    processes.append(process)
-
-                # Stores filtered subframes in a list: 'returned_frames', for
-                # pandas concatenation. This intermediary list is used because
-                # pandas concat is faster when called only once on a list of
-                # dataframes, than when called multiple times appending onto a
-                # frame of increasing size.
-                for pid in range(num_procs):
-                    returned_frames.append(queue.get())
-
-                for proc in processes:
-                    proc.join()
-
-                filtered_df = pd.concat(returned_frames)
-
-            else:
-                # perform filter sequentiually if num_procs = 1
-                filtered_rows = dataframe_copy.apply(filter_obj, axis=1)
+                if filtered_rows is None:
+                    # perform filter sequentially for small dataframes, or if
+                    # the function cannot be sent to other processes
+                    filtered_rows = dataframe_copy.apply(filter_obj, axis=1)
+                else:
+                    filtered_rows = pd.Series(filtered_rows, index=dataframe_copy.index)
                 filtered_df = dataframe_copy[filtered_rows]
 
-        elif isinstance(filter_obj, (list, str)) or is_hatchet_query(filter_obj):
-            # use a callpath query to apply the filter
-            query = filter_obj
-            # If a raw Object-dialect query is provided (not already passed to ObjectQuery),
-            # create a new ObjectQuery object.
-            if isinstance(filter_obj, list):
-                query = ObjectQuery(filter_obj, multi_index_mode)
-            # If a raw String-dialect query is provided (not already passed to StringQuery),
-            # create a new StringQuery object.
-            elif isinstance(filter_obj, str):
-                query = parse_string_dialect(filter_obj, multi_index_mode)
-            # If an old-style query is provided, extract the underlying new-style query.
-            elif issubclass(type(filter_obj), AbstractQuery):
-                query = filter_obj._get_new_query()
-            query_matches = self.query_engine.apply(query, self.graph, self.dataframe)
-            # match_set = list(set().union(*query_matches))
-            # filtered_df = dataframe_copy.loc[dataframe_copy["node"].isin(match_set)]
-            filtered_df = dataframe_copy.loc[dataframe_copy["node"].isin(query_matches)]
-        else:
-            raise InvalidFilter(
-                "The argument passed to filter must be a callable, a query path list, or a QueryMatcher object."
-            )
+            elif isinstance(filter_obj, (list, str)) or is_hatchet_query(filter_obj):
+                # use a callpath query to apply the filter
+                query = filter_obj
+                # If a raw Object-dialect query is provided (not already passed to ObjectQuery),
+                # create a new ObjectQuery object.
+                if isinstance(filter_obj, list):
+                    query = ObjectQuery(filter_obj, multi_index_mode)
+                # If a raw String-dialect query is provided (not already passed to StringQuery),
+                # create a new StringQuery object.
+                elif isinstance(filter_obj, str):
+                    query = parse_string_dialect(filter_obj, multi_index_mode)
+                # If an old-style query is provided, extract the underlying new-style query.
+                elif issubclass(type(filter_obj), AbstractQuery):
+                    query = filter_obj._get_new_query()
+                query_matches = self.query_engine.apply(
+                    query, self.graph, self.dataframe
+                )
+                # match_set = list(set().union(*query_matches))
+                # filtered_df = dataframe_copy.loc[dataframe_copy["node"].isin(match_set)]
+                filtered_df = dataframe_copy.loc[
+                    dataframe_copy["node"].isin(query_matches)
+                ]
+            else:
+                raise InvalidFilter(
+                    "The argument passed to filter must be a callable, a query path list, or a QueryMatcher object."
+                )
 
-        if filtered_df.shape[0] == 0:
-            raise EmptyFilter(
-                "The provided filter would have produced an empty GraphFrame."
-            )
+            if filtered_df.shape[0] == 0:
+                raise EmptyFilter(
+                    "The provided filter would have produced an empty GraphFrame."
+                )
 
-        filtered_df.set_index(index_names, inplace=True)
+            filtered_df.set_index(index_names, inplace=True)
 
-        filtered_gf = GraphFrame(self.graph, filtered_df)
-        filtered_gf.exc_metrics = self.exc_metrics
-        filtered_gf.inc_metrics = self.inc_metrics
-        filtered_gf.default_metric = self.default_metric
-        filtered_gf.metadata = self.metadata
+            filtered_gf = GraphFrame(self.graph, filtered_df)
+            filtered_gf.exc_metrics = self.exc_metrics
+            filtered_gf.inc_metrics = self.inc_metrics
+            filtered_gf.default_metric = self.default_metric
+            filtered_gf.metadata = self.metadata
 
-        if squash:
-            return filtered_gf.squash(update_inc_cols)
-        return filtered_gf
+            if squash:
+                return filtered_gf.squash(update_inc_cols)
+            return filtered_gf
 
     def squash(self, update_inc_cols=True):
         """Rewrite the Graph to include only nodes present in the DataFrame's rows.
@@ -552,6 +635,133 @@ class GraphFrame:
         Arguments:
             update_inc_cols (boolean, optional): if True, update inclusive columns.
         """
+        new_gf = self._squash_tree()
+        if new_gf is None:
+            new_gf = self._squash_graph()
+        if update_inc_cols:
+            new_gf.update_inclusive_columns()
+        return new_gf
+
+    def _squash_tree(self):
+        """Squash a tree (or forest) using the arrays of its CSRGraph.
+
+        Each kept node is attached to its nearest kept ancestor, found by
+        pointer jumping over the parent array, and kept siblings with equal
+        frames are merged into the first of them in traversal order. Rows
+        are remapped to the new nodes with a lookup table.
+
+        Returns:
+            (GraphFrame): the squashed GraphFrame, without updated inclusive
+                columns, or None if some node has several parents, the
+                graph uses node_ordering, or the DataFrame has nodes that
+                are not in the graph
+        """
+        if self.graph.node_ordering:
+            return None
+        csr = self.graph.to_csr()
+        if len(csr) and csr.in_degree().max() > 1:
+            return None
+
+        index = self.dataframe.index
+        index_names = index.names
+        row_positions = _node_positions(self.dataframe, csr)
+        if row_positions is None:
+            return None
+        kept = np.zeros(len(csr), dtype=bool)
+        kept[row_positions] = True
+
+        # nearest kept proper ancestor of every node, or -1 if there is none
+        ancestor = csr.link_parents()
+        while True:
+            skip = ancestor >= 0
+            skip[skip] = ~kept[ancestor[skip]]
+            if not skip.any():
+                break
+            ancestor[skip] = ancestor[ancestor[skip]]
+
+        # number the kept nodes in preorder; parents always come first
+        kept_positions = np.flatnonzero(kept)
+        kept_index = np.full(len(csr), -1, dtype=np.int64)
+        kept_index[kept_positions] = np.arange(len(kept_positions))
+        kept_parents = ancestor[kept_positions]
+        kept_parents = np.where(
+            kept_parents >= 0, kept_index[np.maximum(kept_parents, 0)], -1
+        )
+        kept_frames = csr.frame_ids[kept_positions]
+
+        # merge kept siblings with equal frames, like Graph.normalize()
+        merged = {}
+        target = []
+        for parent, frame_id in zip(kept_parents.tolist(), kept_frames.tolist()):
+            key = (target[parent] if parent >= 0 else -1, frame_id)
+            target.append(merged.setdefault(key, len(target)))
+        target = np.array(target, dtype=np.int64)
+
+        survivors = np.flatnonzero(target == np.arange(len(target)))
+        survivor_index = np.empty(len(target), dtype=np.int64)
+        survivor_index[survivors] = np.arange(len(survivors))
+        parents = kept_parents[survivors]
+        parents = np.where(
+            parents >= 0, survivor_index[target[np.maximum(parents, 0)]], -1
+        )
+        used_frames, frame_ids = np.unique(kept_frames[survivors], return_inverse=True)
+        frames = [csr.frames[f].copy() for f in used_frames.tolist()]
+        new_csr, preorder = CSRGraph.from_parents(parents, frame_ids, frames)
+        new_nodes = np.empty(len(new_csr), dtype=object)
+        new_nodes[:] = new_csr.nodes
+
+        # old CSR position -> new Node
+        new_positions = np.empty(len(preorder), dtype=np.int64)
+        new_positions[preorder] = np.arange(len(preorder))
+        lookup = np.empty(len(csr), dtype=object)
+        lookup[kept_positions] = new_nodes[new_positions[survivor_index[target]]]
+
+        df = self.dataframe.copy(deep=False)
+        new_node_level = lookup[row_positions]
+        if isinstance(index, pd.MultiIndex):
+            df.index = pd.MultiIndex.from_arrays(
+                [
+                    new_node_level if name == "node" else index.get_level_values(name)
+                    for name in index_names
+                ],
+                names=index_names,
+            )
+        else:
+            df.index = pd.Index(new_node_level, name=index.name)
+
+        # sum metrics of merged rows (an all-NA sum stays NaN), and keep the
+        # first value of other columns
+        metrics = [
+            col for col in df.columns if col in self.exc_metrics + self.inc_metrics
+        ]
+        others = [col for col in df.columns if col not in metrics]
+        parts = []
+        if metrics:
+            parts.append(df[metrics].groupby(level=index_names).sum(min_count=1))
+        if others:
+            parts.append(
+                df.loc[~df.index.duplicated(keep="first"), others].sort_index()
+            )
+        agg_df = pd.concat(parts, axis=1)[df.columns] if parts else df
+        agg_df.sort_index(inplace=True)
+
+        graph = Graph.from_csr(new_csr)
+        return GraphFrame(
+            graph,
+            agg_df,
+            self.exc_metrics,
+            self.inc_metrics,
+            self.default_metric,
+            self.metadata,
+        )
+
+    def _squash_graph(self):
+        """Squash any graph by rewiring copies of the kept Node objects.
+
+        Returns:
+            (GraphFrame): the squashed GraphFrame, without updated inclusive
+                columns
+        """
         index_names = self.dataframe.index.names
         self.dataframe.reset_index(inplace=True)
 
@@ -644,12 +854,11 @@ class GraphFrame:
             self.default_metric,
             self.metadata,
         )
-        if update_inc_cols:
-            new_gf.update_inclusive_columns()
         return new_gf
 
     def _init_sum_columns(self, columns, out_columns):
         """Helper function for subtree_sum and subgraph_sum."""
+        self.query_engine.invalidate_cache(self.dataframe)
         if out_columns is None:
             out_columns = columns
         else:
@@ -662,9 +871,209 @@ class GraphFrame:
 
         return out_columns
 
-    def subtree_sum(
-        self, columns, out_columns=None, function=lambda x: x.sum(min_count=1)
-    ):
+    def _row_layout(self, csr):
+        """Locate every dataframe row in the graph's array representation.
+
+        Rows are identified by the CSR index of their node and by a slice
+        number shared by all rows with the same values in the other index
+        levels (e.g., the same rank and thread).
+
+        Return:
+            (numpy.ndarray, numpy.ndarray, int): CSR index of each row's node
+                (-1 if the node is not in the graph), slice number of each
+                row, and the number of slices
+        """
+        node_index = {node: i for i, node in enumerate(csr.nodes)}
+        index = self.dataframe.index
+
+        if isinstance(index, pd.MultiIndex):
+            level = index.names.index("node")
+            lookup = np.array(
+                [node_index.get(node, -1) for node in index.levels[level]] + [-1],
+                dtype=np.int64,
+            )
+            # missing values have code -1, which picks the trailing -1 above
+            row_nodes = lookup[np.asarray(index.codes[level])]
+
+            other_codes = [
+                np.asarray(codes) for i, codes in enumerate(index.codes) if i != level
+            ]
+            if not other_codes:
+                return row_nodes, np.zeros(len(row_nodes), dtype=np.int64), 1
+            slices, row_slices = np.unique(
+                np.column_stack(other_codes), axis=0, return_inverse=True
+            )
+            return row_nodes, row_slices.reshape(-1), len(slices)
+
+        row_nodes = np.array(
+            [node_index.get(node, -1) for node in index], dtype=np.int64
+        )
+        return row_nodes, np.zeros(len(row_nodes), dtype=np.int64), 1
+
+    def _row_keys(self, csr):
+        """Sort the dataframe rows whose node is in the graph by node and slice.
+
+        Each row gets the key ``node index * number of slices + slice``
+        (see ``_row_layout``), so the row of any (node, slice) pair can be
+        found with a binary search over the sorted keys.
+
+        Return:
+            (numpy.ndarray, numpy.ndarray, int): positions of the rows in the
+                dataframe, their keys in increasing order, and the number of
+                slices; or None if several rows have the same key
+        """
+        row_nodes, row_slices, num_slices = self._row_layout(csr)
+        rows = np.flatnonzero(row_nodes >= 0)
+        keys = row_nodes[rows] * num_slices + row_slices[rows]
+        order = np.argsort(keys, kind="stable")
+        rows = rows[order]
+        keys = keys[order]
+        if (np.diff(keys) == 0).any():
+            return None
+        return rows, keys, num_slices
+
+    def _vectorized_sum(self, columns, out_columns, subgraph):
+        """Sum ``columns`` over subtrees or subgraphs with array operations.
+
+        All columns and all slices of the dataframe (see ``_row_layout``)
+        are summed at once, with the semantics of ``sum(min_count=1)``:
+        missing values are skipped, and a sum with no values is NaN.
+
+        Arguments:
+            columns (list of str): names of columns to sum
+            out_columns (list of str): names of columns to store results
+            subgraph (bool): count each descendant once, even if it is
+                reachable along several paths (otherwise, a node's sum is
+                its own value plus the sums of its children)
+
+        Return:
+            (bool): False if the sums could not be computed this way (e.g.,
+                for non-numeric columns or cyclic graphs), True otherwise
+        """
+        dtypes = [self.dataframe[col].dtype for col in columns]
+        if not all(isinstance(dt, np.dtype) and dt.kind in "iuf" for dt in dtypes):
+            return False
+
+        csr = self.graph.to_csr()
+        height = csr.heights()
+        if (height < 0).any():
+            return False
+
+        layout = self._row_keys(csr)
+        if layout is None:
+            return False
+        rows, keys, num_slices = layout
+        nodes = keys // num_slices
+        slices = keys % num_slices
+
+        # sum integers exactly, and everything else as floats with NaNs
+        groups = defaultdict(list)
+        for i, dt in enumerate(dtypes):
+            kind = {"i": np.int64, "u": np.uint64}.get(dt.kind, np.float64)
+            groups[kind].append(i)
+
+        if subgraph:
+            sum_function = self._subgraph_row_sums
+            structure = (csr, nodes, slices, num_slices)
+        else:
+            sum_function = self._subtree_row_sums
+            parents, children = self._row_links(csr, keys, num_slices)
+            # group the links by the height of the parent, lowest first
+            parent_height = height[nodes[parents]]
+            order = np.argsort(parent_height, kind="stable")
+            bounds = np.flatnonzero(np.diff(parent_height[order])) + 1
+            links = zip(
+                np.split(parents[order], bounds), np.split(children[order], bounds)
+            )
+            structure = (list(links),)
+
+        for kind, indices in groups.items():
+            values = self.dataframe[[columns[i] for i in indices]].to_numpy(dtype=kind)
+            values = values[rows]
+            sums = sum_function(values, *structure)
+            for j, i in enumerate(indices):
+                column = self.dataframe[out_columns[i]].to_numpy(copy=True)
+                column[rows] = sums[:, j]
+                self.dataframe[out_columns[i]] = column
+        return True
+
+    @staticmethod
+    def _row_links(csr, keys, num_slices):
+        """Link each row to its parents' rows in the same slice.
+
+        Arguments:
+            csr (CSRGraph): array representation of the graph
+            keys (numpy.ndarray): sorted row keys (see ``_row_keys``)
+            num_slices (int): number of slices
+
+        Return:
+            (numpy.ndarray, numpy.ndarray): positions in ``keys`` of the
+                parent and child row of each link
+        """
+        up_offsets, up_parents = csr.up_links()
+        children, positions = segment_positions(up_offsets, keys // num_slices)
+        parent_keys = up_parents[positions] * num_slices + keys[children] % num_slices
+
+        parents = np.searchsorted(keys, parent_keys)
+        found = parents < len(keys)
+        found[found] = keys[parents[found]] == parent_keys[found]
+        return parents[found], children[found]
+
+    @staticmethod
+    def _subtree_row_sums(values, links):
+        """Add each row's sum into its parents' rows, children first."""
+        is_float = values.dtype.kind == "f"
+        if is_float:
+            present = ~np.isnan(values)
+            counts = present.astype(np.int64)
+            values = np.where(present, values, 0)
+        for parents, children in links:
+            np.add.at(values, parents, values[children])
+            if is_float:
+                np.add.at(counts, parents, counts[children])
+        if is_float:
+            values[counts == 0] = np.nan
+        return values
+
+    @staticmethod
+    def _subgraph_row_sums(values, csr, nodes, slices, num_slices):
+        """Sum the rows of all distinct descendants of each row's node.
+
+        The work is proportional to the total size of the descendant sets
+        (see ``CSRGraph.descendants``), done for all slices at once.
+        """
+        is_float = values.dtype.kind == "f"
+        sums = np.empty_like(values)
+        num_columns = values.shape[1]
+        dense = np.zeros((len(csr), num_slices, num_columns), dtype=values.dtype)
+        dense[nodes, slices] = values
+        if is_float:
+            present = np.zeros(dense.shape, dtype=np.int64)
+            present[nodes, slices] = ~np.isnan(values)
+            dense[nodes, slices] = np.where(np.isnan(values), 0, values)
+        # bound the size of the rows gathered at once
+        chunk = max(1, (1 << 22) // (num_slices * max(num_columns, 1)))
+
+        # rows are sorted by node, so the rows of a node are contiguous
+        bounds = np.searchsorted(nodes, np.arange(len(csr) + 1)).tolist()
+        for node, reach in csr.descendants():
+            start, stop = bounds[node], bounds[node + 1]
+            if start == stop:
+                continue
+            total = 0
+            count = 0
+            for i in range(0, len(reach), chunk):
+                part = reach[i : i + chunk]
+                total = total + dense[part].sum(axis=0)
+                if is_float:
+                    count = count + present[part].sum(axis=0)
+            row_slices = slices[start:stop]
+            sums[start:stop] = total[row_slices]
+            if is_float:
+                sums[start:stop][count[row_slices] == 0] = np.nan
+        return sums
+
+    def subtree_sum(self, columns, out_columns=None, function=None):
         """Compute sum of elements in subtrees.  Valid only for trees.
 
         For each row in the graph, ``out_columns`` will contain the
@@ -676,6 +1085,9 @@ class GraphFrame:
         ``subgraph_sum`` (which calls ``subtree_sum`` if it can), unless
         you have a good reason not to.
 
+        By default, all columns and all ranks and threads are summed at
+        once over the graph's array representation, from the leaves up.
+
         Arguments:
             columns (list of str): names of columns to sum (default: all columns)
             out_columns (list of str): names of columns to store results
@@ -685,6 +1097,11 @@ class GraphFrame:
         """
         out_columns = self._init_sum_columns(columns, out_columns)
 
+        if function is None:
+            if self._vectorized_sum(columns, out_columns, subgraph=False):
+                return
+            function = _sum_min_count
+
         # sum over the output columns
         for node in self.graph.traverse(order="post"):
             if node.children:
@@ -722,9 +1139,7 @@ class GraphFrame:
                             self.dataframe.loc[[node] + node.children, col]
                         )
 
-    def subgraph_sum(
-        self, columns, out_columns=None, function=lambda x: x.sum(min_count=1)
-    ):
+    def subgraph_sum(self, columns, out_columns=None, function=None):
         """Compute sum of elements in subgraphs.
 
         For each row in the graph, ``out_columns`` will contain the
@@ -732,9 +1147,10 @@ class GraphFrame:
         and all of its descendants.
 
         This algorithm is worst-case quadratic in the size of the graph,
-        so we try to call ``subtree_sum`` if we can.  In general, there
-        is not a particularly efficient algorithm known for subgraph
-        sums, so this does about as well as we know how.
+        so we try to call ``subtree_sum`` if we can.  Otherwise, by
+        default, the set of distinct descendants of every node is computed
+        once, bottom-up, and the sums are taken over those sets for all
+        columns and all ranks and threads at once.
 
         Arguments:
             columns (list of str):  names of columns to sum (default: all columns)
@@ -748,6 +1164,11 @@ class GraphFrame:
             return
 
         out_columns = self._init_sum_columns(columns, out_columns)
+        if function is None:
+            if self._vectorized_sum(columns, out_columns, subgraph=True):
+                return
+            function = _sum_min_count
+
         for node in self.graph.traverse():
             subgraph_nodes = list(node.traverse())
             # TODO: need a better way of aggregating inclusive metrics when
@@ -824,55 +1245,40 @@ class GraphFrame:
             # suffix) to the generation list.
             else:
                 generation_pairs.append((inc + " (exc)", inc))
+        if generation_pairs:
+            # Link every (node, rank, thread) row to the rows of its children
+            # in the same rank and thread, once for all metrics
+            csr = self.graph.to_csr()
+            layout = self._row_keys(csr)
+            if layout is None:
+                raise ValueError("dataframe index must not have duplicate entries")
+            rows, keys, num_slices = layout
+            parents, children = self._row_links(csr, keys, num_slices)
+            parents = rows[parents]
+            children = rows[children]
+
+            # Rows of nodes outside the graph get NaN with a MultiIndex, and
+            # -1 with a node-only Index
+            is_multi_index = isinstance(self.dataframe.index, pd.MultiIndex)
+            outside = np.ones(len(self.dataframe), dtype=bool)
+            outside[rows] = False
+
         # Consider each new exclusive metric and its corresponding inclusive metric
         for exc, inc in generation_pairs:
-            # Process of obtaining inclusive data for a node differs if the DataFrame has an Index vs a MultiIndex
-            if isinstance(self.dataframe.index, pd.MultiIndex):
-                new_data = {}
-                # Traverse every node in the Graph
-                for node in self.graph.traverse():
-                    # Consider each unique portion of the MultiIndex corresponding to the current node
-                    for non_node_idx in self.dataframe.loc[(node)].index.unique():
-                        # If there's only 1 index level besides "node", add it to a 1-element list to ensure consistent typing
-                        if not isinstance(non_node_idx, tuple) and not isinstance(
-                            non_node_idx, list
-                        ):
-                            non_node_idx = [non_node_idx]
-                        # Build the full index
-                        # TODO: Replace the full_idx assignment with the following when 2.7 support
-                        # is dropped:
-                        # full_idx = (node, *non_node_idx)
-                        full_idx = tuple([node]) + tuple(non_node_idx)
-                        # Iterate over the children of the current node and add up
-                        # their values for the inclusive metric
-                        inc_sum = 0
-                        for child in node.children:
-                            # TODO: See note about full_idx above
-                            child_idx = tuple([child]) + tuple(non_node_idx)
-                            inc_sum += np.nan_to_num(self.dataframe.loc[child_idx, inc])
-                        # Subtract the current node's inclusive metric from the previously calculated sum to
-                        # get the exclusive metric value for the node
-                        new_data[full_idx] = self.dataframe.loc[full_idx, inc] - inc_sum
-                # Add the exclusive metric as a new column in the DataFrame
-                self.dataframe = self.dataframe.assign(
-                    **{exc: pd.Series(data=new_data)}
-                )
-            else:
-                # Create a basic Node-metric dict for the new exclusive metric
-                new_data = {n: -1 for n in self.dataframe.index.values}
-                # Traverse the graph
-                for node in self.graph.traverse():
-                    # Sum up the inclusive metric values of the current node's children
-                    inc_sum = 0
-                    for child in node.children:
-                        inc_sum += np.nan_to_num(self.dataframe.loc[child, inc])
-                    # Subtract the current node's inclusive metric from the previously calculated sum to
-                    # get the exclusive metric value for the node
-                    new_data[node] = self.dataframe.loc[node, inc] - inc_sum
-                # Add the exclusive metric as a new column in the DataFrame
-                self.dataframe = self.dataframe.assign(
-                    **{exc: pd.Series(data=new_data)}
-                )
+            inc_values = self.dataframe[inc].to_numpy()
+            # Sum up the inclusive metric values of each row's children, and
+            # subtract them from the row's inclusive metric value
+            child_sums = np.zeros(len(inc_values), dtype=inc_values.dtype)
+            np.add.at(child_sums, parents, np.nan_to_num(inc_values[children]))
+            new_data = inc_values - child_sums
+            if outside.any():
+                if is_multi_index:
+                    new_data = new_data.astype(np.float64)
+                    new_data[outside] = np.nan
+                else:
+                    new_data[outside] = -1
+            # Add the exclusive metric as a new column in the DataFrame
+            self.dataframe = self.dataframe.assign(**{exc: new_data})
         # Add the newly created metrics to self.exc_metrics
         self.exc_metrics.extend([metric_tuple[0] for metric_tuple in generation_pairs])
         self.exc_metrics = list(set(self.exc_metrics))
@@ -925,19 +1331,29 @@ class GraphFrame:
         if self.graph is other.graph:
             return
 
-        node_map = {}
-        union_graph = self.graph.union(other.graph, node_map)
+        union = self._union_by_call_path(other)
 
         self_index_names = self.dataframe.index.names
         other_index_names = other.dataframe.index.names
 
+        self.query_engine.invalidate_cache(self.dataframe)
+        other.query_engine.invalidate_cache(other.dataframe)
         self.dataframe.reset_index(inplace=True)
         other.dataframe.reset_index(inplace=True)
 
-        self.dataframe["node"] = self.dataframe["node"].apply(lambda x: node_map[id(x)])
-        other.dataframe["node"] = other.dataframe["node"].apply(
-            lambda x: node_map[id(x)]
-        )
+        if union is not None:
+            union_graph, self_nodes, other_nodes = union
+            self.dataframe["node"] = self_nodes
+            other.dataframe["node"] = other_nodes
+        else:
+            node_map = {}
+            union_graph = self.graph.union(other.graph, node_map)
+            self.dataframe["node"] = self.dataframe["node"].apply(
+                lambda x: node_map[id(x)]
+            )
+            other.dataframe["node"] = other.dataframe["node"].apply(
+                lambda x: node_map[id(x)]
+            )
 
         # add missing rows to copy of self's dataframe in preparation for
         # operation
@@ -1050,68 +1466,75 @@ class GraphFrame:
             self.graph.roots, self.dataframe, metric, name, rank, thread, threshold
         )
 
-    def to_flamegraph(self, metric=None, name="name", rank=0, thread=0, threshold=0.0):
+    def to_flamegraph(
+        self, metric=None, name="name", rank=0, thread=0, threshold=0.0, stream=None
+    ):
         """Write the graph in the folded stack output required by FlameGraph
         http://www.brendangregg.com/flamegraphs.html
-        """
-        folded_stack = ""
-        if metric is None:
-            metric = self.default_metric
-
-        for root in self.graph.roots:
-            for hnode in root.traverse():
-                callpath = hnode.path()
-                for i in range(0, len(callpath) - 1):
-                    if (
-                        "rank" in self.dataframe.index.names
-                        and "thread" in self.dataframe.index.names
-                    ):
-                        df_index = (callpath[i], rank, thread)
-                    elif "rank" in self.dataframe.index.names:
-                        df_index = (callpath[i], rank)
-                    elif "thread" in self.dataframe.index.names:
-                        df_index = (callpath[i], thread)
-                    else:
-                        df_index = callpath[i]
-                    folded_stack = (
-                        folded_stack + str(self.dataframe.loc[df_index, "name"]) + "; "
-                    )
 
-                if (
-                    "rank" in self.dataframe.index.names
-                    and "thread" in self.dataframe.index.names
-                ):
-                    df_index = (callpath[-1], rank, thread)
-                elif "rank" in self.dataframe.index.names:
-                    df_index = (callpath[-1], rank)
-                elif "thread" in self.dataframe.index.names:
-                    df_index = (callpath[-1], thread)
-                else:
-                    df_index = callpath[-1]
-                folded_stack = (
-                    folded_stack + str(self.dataframe.loc[df_index, "name"]) + " "
-                )
+        The folded stack of each node is built from the cached stack of its
+        parent, and names and metric values are read once for the selected
+        rank and thread.
 
-                # set dataframe index based on if rank and thread are part of the index
-                if (
-                    "rank" in self.dataframe.index.names
-                    and "thread" in self.dataframe.index.names
-                ):
-                    df_index = (hnode, rank, thread)
-                elif "rank" in self.dataframe.index.names:
-                    df_index = (hnode, rank)
-                elif "thread" in self.dataframe.index.names:
-                    df_index = (hnode, thread)
-                else:
-                    df_index = hnode
+        Arguments:
+            metric (str, optional): column to use as the sample count
+                (default: the default metric)
+            name (str, optional): column with the name of each frame
+            rank (int, optional): rank to take the data from
+            thread (int, optional): thread to take the data from
+            stream (file, optional): text file to write the output to
+                instead of returning it
 
-                folded_stack = (
-                    folded_stack
-                    + str(round(self.dataframe.loc[df_index, metric]))
-                    + "\n"
-                )
+        Returns:
+            (str): the folded stacks, if no stream was given
+        """
+        if metric is None:
+            metric = self.default_metric
 
-        return folded_stack
+        csr = self.graph.to_csr()
+        if len(csr) and csr.in_degree().max() > 1:
+            raise MultiplePathError("Folded stacks require a graph that is a tree")
+
+        # one row per node for the selected rank and thread
+        index = self.dataframe.index
+        selected = np.ones(len(self.dataframe), dtype=bool)
+        for level, value in (("rank", rank), ("thread", thread)):
+            if level in index.names:
+                selected &= index.get_level_values(level) == value
+        dframe = self.dataframe[selected]
+        row_positions = _node_positions(dframe, csr)
+        rows = np.full(len(csr), -1, dtype=np.int64)
+        if row_positions is not None:
+            rows[row_positions] = np.arange(len(dframe))
+        if (rows < 0).any():
+            missing = csr.nodes[int(np.flatnonzero(rows < 0)[0])]
+            raise KeyError(
+                "No data for rank %s, thread %s of %s" % (rank, thread, missing)
+            )
+        names = [str(n) for n in dframe[name].to_numpy()[rows].tolist()]
+        counts = [str(round(v)) for v in dframe[metric].to_numpy()[rows].tolist()]
+
+        # nodes are in preorder, so a node's parent always comes before it
+        parents = csr.link_parents().tolist()
+        stacks = names[:]
+        for i, parent in enumerate(parents):
+            if parent >= 0:
+                stacks[i] = stacks[parent] + "; " + names[i]
+
+        # each root's subtree is a contiguous range of positions
+        positions = {id(node): i for i, node in enumerate(csr.nodes)}
+        starts = sorted(positions[id(root)] for root in self.graph.roots)
+        ends = dict(zip(starts, starts[1:] + [len(csr)]))
+
+        def lines():
+            for root in self.graph.roots:
+                start = positions[id(root)]
+                for i in range(start, ends[start]):
+                    yield stacks[i] + " " + counts[i] + "\n"
+
+        if stream is None:
+            return "".join(lines())
+        stream.writelines(lines())
 
     def to_literal(self, name="name", rank=0, thread=0, cat_columns=[]):
         """Format this graph as a list of dictionaries for Roundtrip
@@ -1195,36 +1618,40 @@ class GraphFrame:
 
         return graph_literal
 
-    def to_dict(self):
-        hatchet_dict = {}
+    def to_dict(self, columnar=False):
+        """Convert the GraphFrame to a dictionary of JSON-compatible values.
 
+        Arguments:
+            columnar (bool, optional): store the graph as arrays and the
+                dataframe as one list per column, rather than node by node
+                and row by row
+
+        Returns:
+            (dict): dictionary that ``from_json`` can read back once encoded
         """
-        Nodes: {hatchet_nid: {node data, children:[by-id]}}
-        """
-        graphs = []
-        for root in self.graph.roots:
-            formatted_graph_dict = {}
-            for n in root.traverse():
-                formatted_graph_dict[n._hatchet_nid] = {
-                    "data": n.frame.attrs,
-                    "children": [c._hatchet_nid for c in n.children],
-                }
-            graphs.append(formatted_graph_dict)
+        # import this lazily to avoid circular dependencies
+        from .writers.json_writer import JsonWriter
 
-        hatchet_dict["graph"] = graphs
+        return JsonWriter("json").to_dict(self, columnar=columnar)
 
-        hatchet_dict["dataframe_indices"] = list(self.dataframe.index.names)
-        ef = self.dataframe.reset_index()
-        ef["node"] = ef["node"].apply(lambda n: n._hatchet_nid)
-        hatchet_dict["dataframe"] = ef.replace({np.nan: None}).to_dict("records")
+    def to_json(self, stream=None, columnar=False, backend=None):
+        """Encode the GraphFrame as JSON (see ``to_dict``).
 
-        hatchet_dict["inclusive_metrics"] = self.inc_metrics
-        hatchet_dict["exclusive_metrics"] = self.exc_metrics
+        Arguments:
+            stream (file, optional): text or binary file to write the JSON to
+                instead of returning it
+            columnar (bool, optional): use the columnar layout of ``to_dict``,
+                which is written to ``stream`` one column at a time
+            backend (str, optional): "orjson", "ujson", or "json" (default:
+                the first of these that is installed)
 
-        return hatchet_dict
+        Returns:
+            (str): the JSON document, if no stream was given
+        """
+        # import this lazily to avoid circular dependencies
+        from .writers.json_writer import JsonWriter
 
-    def to_json(self):
-        return json.dumps(self.to_dict())
+        return JsonWriter(backend).write(self, stream, columnar=columnar)
 
     def _operator(self, other, op):
         """Generic function to apply operator to two dataframes and store
@@ -1233,7 +1660,7 @@ class GraphFrame:
         Arguments:
             self (graphframe): self's graphframe
             other (graphframe): other's graphframe
-            op (operator): pandas arithmetic operator
+            op (function): pandas arithmetic operator, e.g., pd.DataFrame.add
 
         Return:
             (GraphFrame): self's graphframe modified
@@ -1245,10 +1672,63 @@ class GraphFrame:
             )
         )
 
-        self.dataframe.update(op(other.dataframe[all_metrics]))
+        # nodes are equal if their node ids are, so align rows on integer
+        # node ids rather than on Node objects
+        self.query_engine.invalidate_cache(self.dataframe)
+        index = self.dataframe.index
+        self_keyed = self.dataframe.set_axis(_node_id_index(index), axis=0)
+        other_keyed = other.dataframe[all_metrics].set_axis(
+            _node_id_index(other.dataframe.index), axis=0
+        )
+        self_keyed.update(op(self_keyed, other_keyed))
+        self.dataframe = self_keyed.set_axis(index, axis=0)
 
         return self
 
+    def _union_by_call_path(self, other):
+        """Union the graphs of self and other by aligning call paths.
+
+        Every node of both graphs gets the id of its call path (see
+        ``call_path_ids``), and the union graph has one node per distinct
+        call path. Siblings with equal frames are paired up in order, so
+        this matches ``Graph.union`` whenever each node has at most one
+        parent.
+
+        Return:
+            (Graph, numpy.ndarray, numpy.ndarray): the union graph, and the
+                union node of every row of self's and other's DataFrames;
+                or None if the graphs must be merged with ``Graph.union``
+        """
+        csrs = [self.graph.to_csr(), other.graph.to_csr()]
+        if any(len(csr) and csr.in_degree().max() > 1 for csr in csrs):
+            return None
+        row_positions = [
+            _node_positions(gf.dataframe, csr) for gf, csr in zip((self, other), csrs)
+        ]
+        if any(positions is None for positions in row_positions):
+            return None
+        ranks = [
+            csr.sibling_ranks(gf.graph.roots) for gf, csr in zip((self, other), csrs)
+        ]
+        paths = call_path_ids(csrs, ranks)
+        if paths is None:
+            return None
+        path_ids, path_parents, path_frames, frames = paths
+
+        union_csr, preorder = CSRGraph.from_parents(
+            path_parents, path_frames, [frame.copy() for frame in frames]
+        )
+        union_nodes = np.empty(len(union_csr), dtype=object)
+        union_nodes[:] = union_csr.nodes
+        path_nodes = np.empty(len(preorder), dtype=object)
+        path_nodes[preorder] = union_nodes
+
+        self_nodes, other_nodes = (
+            path_nodes[ids[positions]]
+            for ids, positions in zip(path_ids, row_positions)
+        )
+        return Graph.from_csr(union_csr), self_nodes, other_nodes
+
     def _insert_missing_rows(self, other):
         """Helper function to add rows that exist in other, but not in self.
 
@@ -1270,17 +1750,13 @@ class GraphFrame:
         # large intermediary datasets
         self_hsh_ndx = np.vstack(
             (
-                np.array(
-                    [x.__hash__() for x in self.dataframe["node"]], dtype=np.uint64
-                ),
+                _node_ids(self.dataframe["node"]).astype(np.uint64),
                 self.dataframe.index.values.astype(np.uint64),
             )
         ).T
         other_hsh_ndx = np.vstack(
             (
-                np.array(
-                    [x.__hash__() for x in other.dataframe["node"]], dtype=np.uint64
-                ),
+                _node_ids(other.dataframe["node"]).astype(np.uint64),
                 other.dataframe.index.values.astype(np.uint64),
             )
         ).T
@@ -1491,7 +1967,7 @@ class GraphFrame:
         # unify copies of graphframes
         self_copy.unify(other_copy)
 
-        return self_copy._operator(other_copy, self_copy.dataframe.add)
+        return self_copy._operator(other_copy, pd.DataFrame.add)
 
     def sub(self, other):
         """Returns the column-wise difference of two graphframes as a new
@@ -1510,7 +1986,7 @@ class GraphFrame:
         # unify copies of graphframes
         self_copy.unify(other_copy)
 
-        return self_copy._operator(other_copy, self_copy.dataframe.sub)
+        return self_copy._operator(other_copy, pd.DataFrame.sub)
 
     def div(self, other):
         """Returns the column-wise float division of two graphframes as a new graphframe.
@@ -1528,7 +2004,7 @@ class GraphFrame:
         # unify copies of graphframes
         self_copy.unify(other_copy)
 
-        return self_copy._operator(other_copy, self_copy.dataframe.divide)
+        return self_copy._operator(other_copy, pd.DataFrame.divide)
 
     def mul(self, other):
         """Returns the column-wise float multiplication of two graphframes as a new graphframe.
@@ -1546,7 +2022,7 @@ class GraphFrame:
         # unify copies of graphframes
         self_copy.unify(other_copy)
 
-        return self_copy._operator(other_copy, self_copy.dataframe.multiply)
+        return self_copy._operator(other_copy, pd.DataFrame.multiply)
 
     def __iadd__(self, other):
         """Computes column-wise sum of two graphframes and stores the result in
@@ -1565,7 +2041,7 @@ class GraphFrame:
         # unify self graphframe and copy of other graphframe
         self.unify(other_copy)
 
-        return self._operator(other_copy, self.dataframe.add)
+        return self._operator(other_copy, pd.DataFrame.add)
 
     def __add__(self, other):
         """Returns the column-wise sum of two graphframes as a new graphframe.
@@ -1606,7 +2082,7 @@ class GraphFrame:
         # unify self graphframe and other graphframe
         self.unify(other_copy)
 
-        return self._operator(other_copy, self.dataframe.sub)
+        return self._operator(other_copy, pd.DataFrame.sub)
 
     def __sub__(self, other):
         """Returns the column-wise difference of two graphframes as a new
@@ -1637,7 +2113,7 @@ class GraphFrame:
         # unify self graphframe and other graphframe
         self.unify(other_copy)
 
-        return self._operator(other_copy, self.dataframe.div)
+        return self._operator(other_copy, pd.DataFrame.div)
 
     def __truediv__(self, other):
         """Returns the column-wise float division of two graphframes as a new
@@ -1668,7 +2144,7 @@ class GraphFrame:
         # unify self graphframe and other graphframe
         self.unify(other_copy)
 
-        return self._operator(other_copy, self.dataframe.mul)
+        return self._operator(other_copy, pd.DataFrame.mul)
 
 
 class InvalidFilter(Exception):
@@ -8,6 +8,23 @@ from functools import total_ordering
 from .frame import Frame
 
 
+# number of changes to the links and frames of nodes and to the roots of
+# graphs, which lets array snapshots of a graph (see CSRGraph.is_current)
+# tell that they may no longer describe it
+_mutations = 0
+
+
+def mutation_count():
+    """Number of changes to the links and frames of nodes so far."""
+    return _mutations
+
+
+def record_mutation():
+    """Count a change that array snapshots of graphs may not reflect."""
+    global _mutations
+    _mutations += 1
+
+
 def traversal_order(node):
     """Deterministic key function for sorting nodes in traversals."""
     return (node.frame, id(node))
@@ -24,24 +41,61 @@ class Node:
     """A node in the graph. The node only stores its frame."""
 
     def __init__(self, frame_obj, parent=None, hnid=-1, depth=-1):
-        self.frame = frame_obj
+        # a new node is not part of any graph yet, so nothing is recorded
+        self._frame = frame_obj
         self._depth = depth
         self._hatchet_nid = hnid
 
-        self.parents = []
+        self._parents = []
         if parent is not None:
             self.add_parent(parent)
-        self.children = []
+        self._children = []
+
+    def __setstate__(self, state):
+        # nodes pickled before links and frames were properties
+        for name in ("frame", "parents", "children"):
+            if name in state:
+                state["_" + name] = state.pop(name)
+        self.__dict__.update(state)
+
+    @property
+    def frame(self):
+        return self._frame
+
+    @frame.setter
+    def frame(self, frame_obj):
+        self._frame = frame_obj
+        record_mutation()
+
+    @property
+    def parents(self):
+        return self._parents
+
+    @parents.setter
+    def parents(self, parents):
+        self._parents = parents
+        record_mutation()
+
+    @property
+    def children(self):
+        return self._children
+
+    @children.setter
+    def children(self, children):
+        self._children = children
+        record_mutation()
 
     def add_parent(self, node):
         """Adds a parent to this node's list of parents."""
         assert isinstance(node, Node)
-        self.parents.append(node)
+        self._parents.append(node)
+        record_mutation()
 
     def add_child(self, node):
         """Adds a child to this node's list of children."""
         assert isinstance(node, Node)
-        self.children.append(node)
+        self._children.append(node)
+        record_mutation()
 
     def paths(self):
         """List of tuples, one for each path from this node to any root.
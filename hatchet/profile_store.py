@@ -0,0 +1,193 @@
+# Copyright 2017-2023 Lawrence Livermore National Security, LLC and other
+# Hatchet Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import copy
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from .readers.parquet_reader import ParquetReader
+from .writers.parquet_writer import ParquetWriter
+
+
+class ProfileStore:
+    """An on-disk collection of GraphFrames (runs) that can be appended to.
+
+    Each run is stored once, in the Parquet format of ``to_parquet``, under
+    a key and a dictionary of metadata. Frames are shared by all runs: a
+    frame that occurs in several runs is stored only once. Loading runs back
+    does not reparse the original profiles. Requires pyarrow.
+
+    The store is a directory containing::
+
+        runs.json         keys, metadata, and partitions of the runs
+        frames.parquet    the frames of all runs
+        runs/<partition>  graph and dataframe of one run
+
+    Arguments:
+        dirname (str): directory of the store (created on the first append)
+    """
+
+    def __init__(self, dirname):
+        self.dirname = dirname
+        self._runs = []
+        self._frames = None
+        self._frame_ids = None
+
+        runs_file = os.path.join(dirname, "runs.json")
+        if os.path.exists(runs_file):
+            with open(runs_file, "r") as f:
+                self._runs = json.load(f)
+
+    def __len__(self):
+        return len(self._runs)
+
+    def __contains__(self, key):
+        return any(run["key"] == key for run in self._runs)
+
+    def keys(self):
+        """Keys of the runs, in the order in which they were appended."""
+        return [run["key"] for run in self._runs]
+
+    @property
+    def runs(self):
+        """DataFrame with the metadata of every run, indexed by key."""
+        return pd.DataFrame(
+            [run["metadata"] for run in self._runs],
+            index=pd.Index(self.keys(), name="key"),
+        )
+
+    def _read_frames(self):
+        """The table of shared frames, and the row of each frame in it."""
+        if self._frames is None:
+            if os.path.exists(os.path.join(self.dirname, "frames.parquet")):
+                self._frames = ParquetReader(self.dirname).read_frames()
+            else:
+                self._frames = []
+            self._frame_ids = {frame: i for i, frame in enumerate(self._frames)}
+        return self._frames, self._frame_ids
+
+    def _replace_file(self, name, write):
+        """Write a file of the store through a temporary file, so that a
+        failed write leaves the previous version in place.
+        """
+        tmpdir = tempfile.mkdtemp(dir=self.dirname)
+        try:
+            write(tmpdir)
+            os.replace(os.path.join(tmpdir, name), os.path.join(self.dirname, name))
+        finally:
+            shutil.rmtree(tmpdir)
+
+    def append(self, gf, key=None, metadata=None, **kwargs):
+        """Add a GraphFrame to the store.
+
+        Arguments:
+            gf (GraphFrame): the GraphFrame to add
+            key (str or int, optional): key of the run (default: the number
+                of runs appended before it); other types raise TypeError, as
+                they would not be read back unchanged from runs.json
+            metadata (dict, optional): metadata of the run, added to the
+                metadata of ``gf``; values are stored as JSON, and values
+                that JSON cannot represent are stored as strings
+            kwargs: passed on to ``pyarrow.parquet.write_table``
+
+        Returns:
+            (str or int): the key of the run
+        """
+        if key is None:
+            key = len(self._runs)
+        if not isinstance(key, (str, int)):
+            raise TypeError("Run keys must be str or int, not %s" % type(key).__name__)
+        if key in self:
+            raise ValueError("Run %s is already in the store" % repr(key))
+        run_metadata = json.loads(
+            json.dumps(dict(gf.metadata, **(metadata or {})), default=str)
+        )
+
+        frames, frame_ids = self._read_frames()
+        num_frames = len(frames)
+        csr = gf.graph.to_csr()
+        shared_ids = np.empty(len(csr.frames), dtype=np.int32)
+        for i, frame in enumerate(csr.frames):
+            fid = frame_ids.get(frame)
+            if fid is None:
+                fid = frame_ids[frame] = len(frames)
+                frames.append(frame)
+            shared_ids[i] = fid
+
+        partition = str(max([int(run["partition"]) for run in self._runs] + [-1]) + 1)
+        writer = ParquetWriter(os.path.join(self.dirname, "runs", partition))
+        os.makedirs(writer.dirname, exist_ok=True)
+        writer.write_graph(csr, shared_ids[csr.frame_ids], **kwargs)
+        writer.write_dataframe(gf, csr, **kwargs)
+
+        # the run only becomes part of the store once runs.json lists it
+        if len(frames) > num_frames:
+            self._replace_file(
+                "frames.parquet",
+                lambda tmpdir: ParquetWriter(tmpdir).write_frames(frames, **kwargs),
+            )
+        runs = self._runs + [
+            {"key": key, "partition": partition, "metadata": run_metadata}
+        ]
+
+        def write_runs(tmpdir):
+            with open(os.path.join(tmpdir, "runs.json"), "w") as f:
+                json.dump(runs, f)
+
+        self._replace_file("runs.json", write_runs)
+        self._runs = runs
+        return key
+
+    def select(self, keys=None, **metadata):
+        """Keys of the runs that are in ``keys`` and have the given metadata.
+
+        Arguments:
+            keys (list, optional): keys to choose from (default: all runs)
+            metadata: metadata values the runs must have
+
+        Returns:
+            (list): the keys, in the order in which the runs were appended
+        """
+        if keys is not None:
+            keys = set(keys)
+        return [
+            run["key"]
+            for run in self._runs
+            if (keys is None or run["key"] in keys)
+            and all(
+                k in run["metadata"] and run["metadata"][k] == v
+                for k, v in metadata.items()
+            )
+        ]
+
+    def load(self, keys=None, columns=None, **metadata):
+        """Read a subset of the runs back as GraphFrames.
+
+        Arguments:
+            keys (list, optional): keys of the runs to read (default: all)
+            columns (list, optional): dataframe columns to read (default: all)
+            metadata: only read runs that have these metadata values
+
+        Returns:
+            (list): a GraphFrame for every selected run, in the order in
+                which the runs were appended
+        """
+        selected = set(self.select(keys, **metadata))
+        frames, _ = self._read_frames()
+
+        gfs = []
+        for run in self._runs:
+            if run["key"] not in selected:
+                continue
+            reader = ParquetReader(os.path.join(self.dirname, "runs", run["partition"]))
+            gf = reader.read(columns=columns, frames=frames)
+            gf.metadata = copy.deepcopy(run["metadata"])
+            gfs.append(gf)
+        return gfs
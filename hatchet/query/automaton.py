@@ -0,0 +1,179 @@
+# Copyright 2017-2023 Lawrence Livermore National Security, LLC and other
+# Hatchet Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import numpy as np
+
+from .errors import InvalidQueryFilter
+
+
+def _levels(keys, num_levels):
+    """Group the positions of an array by its (non-negative) values.
+
+    Returns:
+        (list): for each value, the positions holding it
+    """
+    order = np.argsort(keys, kind="stable")
+    bounds = np.searchsorted(keys[order], np.arange(num_levels + 1))
+    return [order[bounds[h] : bounds[h + 1]] for h in range(num_levels)]
+
+
+class PathAutomaton(object):
+    """Matches a query path against a graph as an automaton over
+    (node, query index) states, without enumerating paths.
+
+    The states reproduce the matching rules of the path-enumerating
+    QueryEngine:
+
+    * ``A(v, k)``: a partial match ends at node ``v`` and the next query
+      node to match is ``k`` (the match is complete when ``k`` is the
+      length of the query).
+    * ``S(v, k)``: node ``v`` was just consumed by the ``"*"`` query node
+      ``k``, which may consume more of ``v``'s descendants.
+
+    A ``"."`` query node moves from ``A(v, k)`` to ``A(c, k + 1)`` for every
+    child ``c`` of ``v`` that matches ``k``. A ``"*"`` query node lazily
+    consumes children that match it, stopping before the first child that
+    matches the next query node. Every state is computed for all nodes of
+    a height level at once: first whether a complete match is reachable
+    from it (leaves up), then whether it is reachable from a starting
+    state (roots down). A node belongs to the result if one of its states
+    is both.
+    """
+
+    def __init__(self, csr, wildcards, matched):
+        """Create the automaton.
+
+        Arguments:
+            csr (CSRGraph): array representation of the graph being queried
+            wildcards (list): the quantifier ("." or "*") of each query node
+            matched (numpy.ndarray): boolean array of shape (number of nodes,
+                number of query nodes); True where a node satisfies the
+                predicate of a query node
+        """
+        for wcard in wildcards:
+            if wcard not in (".", "*"):
+                raise InvalidQueryFilter(
+                    'Query wildcards must (internally) be one of "." or "*"'
+                )
+        self.csr = csr
+        self.wildcards = list(wildcards)
+        num_nodes = len(csr)
+        length = len(self.wildcards)
+
+        height = csr.heights()
+        if (height < 0).any():
+            raise ValueError("the automaton can only match acyclic graphs")
+        num_levels = int(height.max()) + 1 if num_nodes else 0
+
+        # "is matched" per node and query node, with an extra all-False
+        # column for the (nonexistent) query node after the last one
+        self.matched = np.zeros((num_nodes, length + 1), dtype=bool)
+        self.matched[:, :length] = matched
+        self.is_leaf = np.diff(csr.child_offsets) == 0
+
+        is_last = np.arange(length) == length - 1
+        # a child that ends the "*" query node k of its parent, either
+        # because it matches query node k + 1, or because k is the last
+        # query node and the child does not match k
+        self.stops = self.matched[:, 1:] | (~self.matched[:, :length] & is_last)
+        # a child that is consumed by the "*" query node k
+        self.enters = self.matched[:, :length] & ~self.matched[:, 1:]
+
+        self.parents, self.children = csr.edges()
+        self.nodes_by_height = _levels(height, num_levels)
+        self.edges_by_parent = _levels(height[self.parents], num_levels)
+        self.edges_by_child = _levels(height[self.children], num_levels)
+        self._scratch = np.zeros(num_nodes, dtype=bool)
+
+    def _any(self, owners, values, nodes):
+        """For each of ``nodes``, whether any of its edges has a True value.
+
+        Arguments:
+            owners (numpy.ndarray): the node each edge belongs to
+            values (numpy.ndarray): a boolean per edge
+            nodes (numpy.ndarray): the nodes to return results for
+        """
+        scratch = self._scratch
+        scratch[nodes] = False
+        np.logical_or.at(scratch, owners, values)
+        return scratch[nodes]
+
+    def _live(self):
+        """States from which a complete match can be reached."""
+        length = len(self.wildcards)
+        num_nodes = len(self.csr)
+        live_a = np.zeros((num_nodes, length + 1), dtype=bool)
+        live_a[:, length] = True
+        live_s = np.zeros((num_nodes, length), dtype=bool)
+
+        for nodes, edges in zip(self.nodes_by_height, self.edges_by_parent):
+            parents = self.parents[edges]
+            children = self.children[edges]
+            leaf = self.is_leaf[nodes]
+            for k in range(length - 1, -1, -1):
+                if self.wildcards[k] == ".":
+                    values = self.matched[children, k] & live_a[children, k + 1]
+                    live_a[nodes, k] = self._any(parents, values, nodes)
+                    continue
+                values = (self.stops[children, k] & live_a[parents, k + 1]) | (
+                    self.enters[children, k] & live_s[children, k]
+                )
+                star = self._any(parents, values, nodes)
+                live_a[nodes, k] = np.where(leaf, live_a[nodes, k + 1], star)
+                live_s[nodes, k] = np.where(leaf, k == length - 1, star)
+        return live_a, live_s
+
+    def _reachable(self):
+        """States that can be reached from a starting state."""
+        length = len(self.wildcards)
+        num_nodes = len(self.csr)
+        reach_a = np.zeros((num_nodes, length + 1), dtype=bool)
+        reach_s = np.zeros((num_nodes, length), dtype=bool)
+
+        # A match can start at any node that matches the first query node,
+        # or that matches the second one if the first is a "*"
+        if length > 1 and self.wildcards[0] == "*":
+            start = 0 if self.wildcards[1] == "*" else 2
+            reach_a[self.matched[:, 1], start] = True
+        if length > 0:
+            start = 0 if self.wildcards[0] == "*" else 1
+            reach_a[self.matched[:, 0], start] = True
+
+        has_stop_child = np.zeros((num_nodes, length), dtype=bool)
+        np.logical_or.at(has_stop_child, self.parents, self.stops[self.children])
+
+        for nodes, edges in zip(self.nodes_by_height[::-1], self.edges_by_child[::-1]):
+            parents = self.parents[edges]
+            children = self.children[edges]
+            leaf = self.is_leaf[nodes]
+            for k in range(length + 1):
+                if k > 0 and self.wildcards[k - 1] == ".":
+                    values = reach_a[parents, k - 1] & self.matched[children, k - 1]
+                    reach_a[nodes, k] |= self._any(children, values, nodes)
+                elif k > 0:
+                    # a "*" ends at the node itself
+                    prev_a = reach_a[nodes, k - 1]
+                    prev_s = reach_s[nodes, k - 1]
+                    reach_a[nodes, k] |= np.where(
+                        leaf,
+                        prev_a | (prev_s & (k == length)),
+                        (prev_a | prev_s) & has_stop_child[nodes, k - 1],
+                    )
+                if k < length and self.wildcards[k] == "*":
+                    values = (reach_a[parents, k] | reach_s[parents, k]) & (
+                        self.enters[children, k]
+                    )
+                    reach_s[nodes, k] |= self._any(children, values, nodes)
+        return reach_a, reach_s
+
+    def match(self):
+        """Find the nodes that are part of a complete match.
+
+        Returns:
+            (numpy.ndarray): boolean array that is True for matched nodes
+        """
+        live_a, live_s = self._live()
+        reach_a, reach_s = self._reachable()
+        return (live_a & reach_a).any(axis=1) | (live_s & reach_s).any(axis=1)
@@ -0,0 +1,112 @@
+# Copyright 2017-2023 Lawrence Livermore National Security, LLC and other
+# Hatchet Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+from collections import OrderedDict
+import weakref
+
+import pandas as pd
+
+
+def dataframe_token(dframe):
+    """Fingerprint of the columns of a DataFrame and of the values in them.
+
+    Arguments:
+        dframe (pandas.DataFrame): the DataFrame
+
+    Returns:
+        (tuple): a hashable value that changes when the DataFrame does
+    """
+    row_hashes = pd.util.hash_pandas_object(dframe, index=False).to_numpy()
+    return tuple(dframe.columns), len(dframe), hash(row_hashes.tobytes())
+
+
+class PredicateCache(object):
+    """Least-recently-used cache of the nodes matched by query predicates.
+
+    Entries are keyed by the identity of the Graph and DataFrame a predicate
+    was evaluated on, and by the predicate's fingerprint (see
+    ``Query.predicate_keys``). Each entry holds weak references to its Graph
+    and DataFrame, so an entry is never reused for a different object that
+    happens to get the same ``id``, and the ``dataframe_token`` of the
+    DataFrame, so an entry is not reused after the DataFrame is modified in
+    place.
+    """
+
+    def __init__(self, max_entries=128):
+        """Create an empty cache.
+
+        Arguments:
+            max_entries (int, optional): number of predicate results to keep
+                before evicting the least recently used ones
+        """
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+
+    def __len__(self):
+        """Number of predicate results in the cache."""
+        return len(self._entries)
+
+    def get(self, graph, dframe, predicate_key, token):
+        """Return the cached result of a predicate, or None if it is missing.
+
+        Arguments:
+            graph (Graph): the Graph the predicate was applied to
+            dframe (pandas.DataFrame): the DataFrame the predicate was applied to
+            predicate_key (hashable): the fingerprint of the predicate
+            token (hashable): the ``dataframe_token`` of ``dframe``
+
+        Returns:
+            (frozenset): the node ids of the nodes matched by the predicate
+        """
+        key = (id(graph), id(dframe), predicate_key)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        graph_ref, dframe_ref, entry_token, nids = entry
+        if (
+            graph_ref() is not graph
+            or dframe_ref() is not dframe
+            or entry_token != token
+        ):
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return nids
+
+    def put(self, graph, dframe, predicate_key, token, nids):
+        """Store the result of a predicate.
+
+        Arguments:
+            graph (Graph): the Graph the predicate was applied to
+            dframe (pandas.DataFrame): the DataFrame the predicate was applied to
+            predicate_key (hashable): the fingerprint of the predicate
+            token (hashable): the ``dataframe_token`` of ``dframe``
+            nids (iterable): the node ids of the nodes matched by the predicate
+        """
+        if self.max_entries <= 0:
+            return
+        key = (id(graph), id(dframe), predicate_key)
+        self._entries[key] = (
+            weakref.ref(graph),
+            weakref.ref(dframe),
+            token,
+            frozenset(nids),
+        )
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, dframe=None):
+        """Drop the cached results for a DataFrame, or all results.
+
+        Arguments:
+            dframe (pandas.DataFrame, optional): the DataFrame whose results
+                are dropped; if None, the whole cache is cleared
+        """
+        if dframe is None:
+            self._entries.clear()
+            return
+        for key in [k for k in self._entries if k[1] == id(dframe)]:
+            del self._entries[key]
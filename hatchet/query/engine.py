@@ -4,6 +4,7 @@
 # SPDX-License-Identifier: MIT
 
 from itertools import groupby
+import numpy as np
 import pandas as pd
 
 from .errors import InvalidQueryFilter
@@ -12,15 +13,39 @@ from .query import Query
 from .compound import CompoundQuery
 from .object_dialect import ObjectQuery
 from .string_dialect import parse_string_dialect
+from .vectorized import NodeTable, UnvectorizablePredicate
+from .automaton import PathAutomaton
+from .cache import PredicateCache, dataframe_token
+from .parallel import apply_in_pool, query_tasks, root_tasks
 
 
 class QueryEngine:
 
     """Class for applying queries to GraphFrames."""
 
-    def __init__(self):
-        """Creates the QueryEngine."""
+    def __init__(self, vectorize=True, matcher="path", cache_size=128, num_procs=1):
+        """Creates the QueryEngine.
+
+        Arguments:
+            vectorize (bool, optional): evaluate predicates that have a
+                vectorized form over the whole DataFrame at once, instead
+                of one node at a time
+            matcher (str, optional): how query paths are matched against the
+                graph; "path" enumerates every matching path, "automaton"
+                finds the matched nodes directly with a PathAutomaton
+            cache_size (int, optional): number of predicate results kept
+                across queries (0 disables the predicate cache)
+            num_procs (int, optional): number of worker processes used to
+                apply the subqueries of compound queries, or to match a
+                query from the roots of multi-rooted graphs, concurrently
+        """
+        if matcher not in ("path", "automaton"):
+            raise ValueError("matcher must be one of 'path' or 'automaton'")
         self.search_cache = {}
+        self.vectorize = vectorize
+        self.matcher = matcher
+        self.predicate_cache = PredicateCache(cache_size)
+        self.num_procs = num_procs
 
     def reset_cache(self):
         """Resets the cache in the QueryEngine."""
@@ -39,27 +64,185 @@ class QueryEngine:
         """
         if issubclass(type(query), Query):
             self.reset_cache()
-            matches = []
+            self._cache_predicates(query, graph, dframe)
+            if self.matcher == "automaton":
+                matched_node_set = self._apply_automaton(query, dframe, graph)
+                if matched_node_set is not None:
+                    return matched_node_set
+            if self.num_procs > 1 and len(graph.roots) > 1:
+                results = apply_in_pool(
+                    graph,
+                    dframe,
+                    root_tasks(query, self.search_cache, self.num_procs),
+                    self.num_procs,
+                    self._worker_options(),
+                )
+                if results is not None:
+                    return list(set().union(*results))
             visited = set()
-            for root in sorted(graph.roots, key=traversal_order):
-                self._apply_impl(query, dframe, root, visited, matches)
+            roots = sorted(graph.roots, key=traversal_order)
+            matched_node_set = list(self._match_roots(query, dframe, roots, visited))
             assert len(visited) == len(graph)
-            matched_node_set = list(set().union(*matches))
-            # return matches
             return matched_node_set
         elif issubclass(type(query), CompoundQuery):
-            results = []
+            subqueries = []
             for subq in query.subqueries:
                 subq_obj = subq
                 if isinstance(subq, list):
                     subq_obj = ObjectQuery(subq)
                 elif isinstance(subq, str):
                     subq_obj = parse_string_dialect(subq)
-                results.append(self.apply(subq_obj, graph, dframe))
+                subqueries.append(subq_obj)
+            results = None
+            if self.num_procs > 1 and len(subqueries) > 1:
+                results = apply_in_pool(
+                    graph,
+                    dframe,
+                    query_tasks(subqueries),
+                    self.num_procs,
+                    self._worker_options(),
+                )
+            if results is None:
+                results = [self.apply(subq, graph, dframe) for subq in subqueries]
             return query._apply_op_to_results(results, graph)
         else:
             raise TypeError("Invalid query data type ({})".format(str(type(query))))
 
+    def _worker_options(self):
+        """Arguments for the (serial) QueryEngines of worker processes."""
+        return {"vectorize": self.vectorize, "matcher": self.matcher}
+
+    def _match_roots(self, query, dframe, roots, visited):
+        """Collect the nodes of all paths that match the query in the subgraphs
+        of some roots.
+
+        Arguments:
+            query (Query): the query being applied
+            dframe (pandas.DataFrame): the DataFrame containing the metrics for the queried GraphFrame
+            roots (list): the roots of the subgraphs that are being queried
+            visited (set): a set that keeps track of what nodes have been visited in the traversal
+
+        Returns:
+            (set): the set of nodes from paths that match the query
+        """
+        matches = []
+        for root in roots:
+            self._apply_impl(query, dframe, root, visited, matches)
+        return set().union(*matches)
+
+    def _cache_predicates(self, query, graph, dframe):
+        """Cache (Memoize) the parts of the query that every node matches.
+
+        Each distinct predicate of the query is evaluated once: it is looked
+        up in the predicate cache first, then evaluated over the whole
+        DataFrame if it has a vectorized form, and otherwise one node at a
+        time. The results of predicates with a fingerprint are stored in the
+        predicate cache, so they can be reused by later queries.
+
+        Arguments:
+            query (Query): the query being applied
+            graph (Graph): the Graph to which the query is being applied
+            dframe (pandas.DataFrame): the DataFrame containing node metrics and other data
+        """
+        keys = []
+        matched = {}
+        pending = {}
+        table = None
+        token = None
+        if self.predicate_cache.max_entries > 0 and any(
+            key is not None for key in query.predicate_keys
+        ):
+            token = dataframe_token(dframe)
+        for i, (node_query, vectorized_predicate, predicate_key) in enumerate(
+            zip(query.query_pattern, query.vectorized_predicates, query.predicate_keys)
+        ):
+            _, filter_func = node_query
+            # Predicates without a fingerprint are only shared within the query
+            key = (
+                ("predicate", id(filter_func))
+                if predicate_key is None
+                else predicate_key
+            )
+            keys.append(key)
+            if key in matched or key in pending:
+                continue
+            if predicate_key is not None:
+                nids = self.predicate_cache.get(graph, dframe, key, token)
+                if nids is not None:
+                    matched[key] = nids
+                    continue
+            if self.vectorize and vectorized_predicate is not None:
+                if table is None:
+                    table = NodeTable(dframe)
+                try:
+                    mask = vectorized_predicate(table)
+                except UnvectorizablePredicate:
+                    pass
+                else:
+                    matched[key] = frozenset(
+                        table.nodes[j]._hatchet_nid for j in np.flatnonzero(mask)
+                    )
+                    continue
+            pending[key] = filter_func
+
+        nodes = list(graph.traverse())
+        if pending:
+            pending_matches = {key: [] for key in pending}
+            for node in nodes:
+                row = self._node_row(node, dframe)
+                for key, filter_func in pending.items():
+                    if filter_func(row):
+                        pending_matches[key].append(node._hatchet_nid)
+            for key, nids in pending_matches.items():
+                matched[key] = frozenset(nids)
+
+        for key, predicate_key in zip(keys, query.predicate_keys):
+            if predicate_key is not None:
+                self.predicate_cache.put(graph, dframe, key, token, matched[key])
+        for node in nodes:
+            nid = node._hatchet_nid
+            self.search_cache[nid] = [
+                i for i, key in enumerate(keys) if nid in matched[key]
+            ]
+
+    def invalidate_cache(self, dframe=None):
+        """Drop cached predicate results, e.g. for a DataFrame that is modified
+        in place. Results are never reused for a modified DataFrame, so this
+        only frees them early.
+
+        Arguments:
+            dframe (pandas.DataFrame, optional): the modified DataFrame; if
+                None, all cached predicate results are dropped
+        """
+        self.predicate_cache.invalidate(dframe)
+
+    def _apply_automaton(self, query, dframe, graph):
+        """Find the nodes from paths that match the query with a PathAutomaton.
+
+        Arguments:
+            query (Query): the query being applied
+            dframe (pandas.DataFrame): the DataFrame containing node metrics and other data
+            graph (Graph): the Graph to which the query is being applied
+
+        Returns:
+            (list): the set of nodes from paths that match the query, or None
+                if the graph has cycles and the paths must be enumerated
+        """
+        csr = graph.to_csr()
+        nodes = csr.nodes
+        matched = np.zeros((len(nodes), len(query)), dtype=bool)
+        for i, node in enumerate(nodes):
+            if node._hatchet_nid not in self.search_cache:
+                self._cache_node(node, query, dframe)
+            matched[i, self.search_cache[node._hatchet_nid]] = True
+        wildcards = [wcard for wcard, _ in query.query_pattern]
+        try:
+            automaton = PathAutomaton(csr, wildcards, matched)
+        except ValueError:
+            return None
+        node_mask = automaton.match()
+        return [nodes[i] for i in np.flatnonzero(node_mask).tolist()]
+
     def _cache_node(self, node, query, dframe):
         """Cache (Memoize) the parts of the query that the node matches.
 
@@ -70,19 +253,22 @@ class QueryEngine:
         """
         assert isinstance(node, Node)
         matches = []
+        row = self._node_row(node, dframe)
         # Applies each filtering function to the node to cache which
         # query nodes the current node matches.
         for i, node_query in enumerate(query):
             _, filter_func = node_query
-            row = None
-            if isinstance(dframe.index, pd.MultiIndex):
-                row = pd.concat([dframe.loc[node]], keys=[node], names=["node"])
-            else:
-                row = dframe.loc[node]
             if filter_func(row):
                 matches.append(i)
         self.search_cache[node._hatchet_nid] = matches
 
+    @staticmethod
+    def _node_row(node, dframe):
+        """The row(s) of the DataFrame that predicates are applied to for a node."""
+        if isinstance(dframe.index, pd.MultiIndex):
+            return pd.concat([dframe.loc[node]], keys=[node], names=["node"])
+        return dframe.loc[node]
+
     def _match_0_or_more(self, query, dframe, node, wcard_idx):
         """Process a "*" predicate in the query on a subgraph.
 
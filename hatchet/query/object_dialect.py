@@ -15,6 +15,12 @@ import sys
 
 from .errors import InvalidQueryPath, InvalidQueryFilter, MultiIndexModeMismatch
 from .query import Query
+from .vectorized import (
+    UnvectorizablePredicate,
+    eval_comparison,
+    match_all,
+    regex_mask,
+)
 
 
 def _process_multi_index_mode(apply_result, multi_index_mode):
@@ -207,6 +213,90 @@ def _process_predicate(attr_filter, multi_index_mode):
     return filter_choice if attr_filter != {} else lambda row: True
 
 
+def _process_vectorized_predicate(attr_filter, multi_index_mode):
+    """Converts high-level API attribute filter to a vectorized predicate
+    with the same semantics as the lambda from _process_predicate"""
+    compops = ("<", ">", "==", ">=", "<=", "<>", "!=")  # ,
+
+    def is_comparison(value):
+        return isinstance(value, str) and value.lower().startswith(compops)
+
+    def filter_node_attr(table, key, single_value):
+        values = table.node_attr("_depth" if key == "depth" else "_hatchet_nid")
+        if is_comparison(single_value):
+            return eval_comparison(values, single_value)
+        if isinstance(single_value, Real):
+            # If the value for "depth" is -1, check if the node is a leaf
+            # (only when each node has a single row)
+            if key == "depth" and single_value == -1 and not table.multi_index:
+                return table.is_leaf()
+            return values == single_value
+        raise UnvectorizablePredicate("invalid filter for {}".format(key))
+
+    def filter_rows(table, key, single_value):
+        kind = table.column_kind(key)
+        values = table.column(key)
+        if kind == "string" and isinstance(single_value, str):
+            return regex_mask(values, single_value + r"\Z")
+        if kind == "real" and is_comparison(single_value):
+            finite = np.isfinite(values)
+            if table.multi_index:
+                # the per-row path fails on NaN and inf with multi-indexed data
+                if not finite.all():
+                    raise UnvectorizablePredicate("non-finite values in {}".format(key))
+                return eval_comparison(values, single_value)
+            result = np.zeros(len(values), dtype=bool)
+            result[finite] = eval_comparison(values[finite], single_value)
+            # compare nan metric value to numeric query (e.g. np.nan > 5),
+            # or to nan query (e.g., np.nan == np.nan)
+            if "np.nan" in single_value:
+                result[np.isnan(values)] = True
+            else:
+                result[np.isnan(values)] = eval("np.nan {}".format(single_value))
+            # same for inf metric values
+            if "np.inf" in single_value:
+                result[np.isinf(values)] = True
+            else:
+                result[np.isinf(values)] = eval("np.inf {}".format(single_value))
+            return result
+        if kind == "real" and isinstance(single_value, Real):
+            return values == single_value
+        raise UnvectorizablePredicate("invalid filter for {}".format(key))
+
+    def filter_single(table, key, single_value):
+        if key in ("depth", "node_id"):
+            return filter_node_attr(table, key, single_value)
+        if key not in table.dframe.columns:
+            return table.constant(False)
+        row_mask = filter_rows(table, key, single_value)
+        if not table.multi_index:
+            return row_mask
+        if table.column_kind(key) == "real" and isinstance(single_value, Real):
+            # numeric equality matches if any row matches, in every mode
+            return table.any(row_mask)
+        return table.reduce(row_mask, multi_index_mode)
+
+    def filter_table(table):
+        if table.multi_index and multi_index_mode == "off":
+            raise UnvectorizablePredicate("multi_index_mode is off")
+        if not table.unique_rows and not table.multi_index:
+            raise UnvectorizablePredicate("several rows for one node")
+        matches = table.constant(True)
+        for k, v in attr_filter.items():
+            if isinstance(v, str) or not hasattr(v, "__iter__"):
+                v = [v]
+            for single_value in v:
+                matches &= filter_single(table, k, single_value)
+        return matches
+
+    return filter_table if attr_filter != {} else match_all
+
+
+def _predicate_key(attr_filter, multi_index_mode):
+    """Fingerprint of the predicate built from an attribute filter."""
+    return ("object", multi_index_mode, repr(sorted(attr_filter.items())))
+
+
 class ObjectQuery(Query):
 
     """Class for representing and parsing queries using the Object-based dialect."""
@@ -225,14 +315,23 @@ class ObjectQuery(Query):
         assert multi_index_mode in ["off", "all", "any"]
         for qnode in query:
             if isinstance(qnode, dict):
-                self._add_node(predicate=_process_predicate(qnode, multi_index_mode))
+                self._add_node(
+                    predicate=_process_predicate(qnode, multi_index_mode),
+                    vectorized_predicate=_process_vectorized_predicate(
+                        qnode, multi_index_mode
+                    ),
+                    predicate_key=_predicate_key(qnode, multi_index_mode),
+                )
             elif isinstance(qnode, str) or isinstance(qnode, int):
                 self._add_node(quantifer=qnode)
             elif isinstance(qnode, tuple):
                 assert isinstance(qnode[1], dict)
                 if isinstance(qnode[0], str) or isinstance(qnode[0], int):
                     self._add_node(
-                        qnode[0], _process_predicate(qnode[1], multi_index_mode)
+                        qnode[0],
+                        _process_predicate(qnode[1], multi_index_mode),
+                        _process_vectorized_predicate(qnode[1], multi_index_mode),
+                        _predicate_key(qnode[1], multi_index_mode),
                     )
                 else:
                     raise InvalidQueryPath(
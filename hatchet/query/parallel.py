@@ -0,0 +1,166 @@
+# Copyright 2017-2023 Lawrence Livermore National Security, LLC and other
+# Hatchet Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import dill
+import numpy as np
+import pandas as pd
+
+from ..graph import Graph
+from ..util.executor import SharedState, get_executor, has_shared_memory, worker_state
+
+
+def _replace_node_level(dframe, node_values):
+    """Copy of a DataFrame with new values in its "node" index level."""
+    frame = dframe.copy(deep=False)
+    if isinstance(dframe.index, pd.MultiIndex):
+        levels = [
+            node_values if name == "node" else dframe.index.get_level_values(name)
+            for name in dframe.index.names
+        ]
+        frame.index = pd.MultiIndex.from_arrays(levels, names=dframe.index.names)
+    else:
+        frame.index = pd.Index(node_values, name="node")
+    return frame
+
+
+def encode_graphframe(graph, dframe):
+    """Encode a Graph and its DataFrame without Node objects.
+
+    The Graph is sent as its CSRGraph arrays, and the "node" level of the
+    DataFrame is replaced with the position of each node in the CSRGraph,
+    so neither has to be pickled node by node.
+
+    Returns:
+        (CSRGraph, pandas.DataFrame): the encoded graph and DataFrame, or
+            None if the DataFrame has nodes that are not in the Graph
+    """
+    csr = graph.to_csr()
+    positions = {id(node): i for i, node in enumerate(csr.nodes)}
+    if isinstance(dframe.index, pd.MultiIndex):
+        node_level = dframe.index.get_level_values("node")
+    else:
+        node_level = dframe.index
+    codes, uniques = pd.factorize(node_level)
+    unique_positions = np.array([positions.get(id(node), -1) for node in uniques])
+    if (unique_positions < 0).any():
+        return None
+    return csr, _replace_node_level(dframe, unique_positions[codes])
+
+
+def _init_worker(state):
+    """Decode the Graph and DataFrame sent to a worker process.
+
+    Returns:
+        (dict): the nodes by position, the position of each node, and the
+            Graph, DataFrame and QueryEngine of the worker
+    """
+    # import this lazily to avoid circular dependencies
+    from .engine import QueryEngine
+
+    csr, frame, engine_options = state
+    nodes = np.empty(len(csr), dtype=object)
+    nodes[:] = csr.nodes
+    if isinstance(frame.index, pd.MultiIndex):
+        node_level = frame.index.get_level_values("node")
+    else:
+        node_level = frame.index
+    return {
+        "nodes": csr.nodes,
+        "positions": {id(node): i for i, node in enumerate(csr.nodes)},
+        "graph": Graph.from_csr(csr),
+        "dframe": _replace_node_level(frame, nodes[np.asarray(node_level)]),
+        "engine": QueryEngine(cache_size=0, **engine_options),
+    }
+
+
+def _apply_query(worker, query):
+    """Apply a whole query in a worker process."""
+    return worker["engine"].apply(query, worker["graph"], worker["dframe"])
+
+
+def _match_roots(worker, task):
+    """Match a query from some of the roots of the graph in a worker process."""
+    query, roots, search_cache = task
+    engine = worker["engine"]
+    engine.search_cache = search_cache
+    nodes = worker["nodes"]
+    roots = [nodes[r] for r in roots]
+    return engine._match_roots(query, worker["dframe"], roots, set())
+
+
+def _run_task(task):
+    """Run a task in a worker process, and encode the matched nodes.
+
+    The Graph and DataFrame of a call of apply_in_pool are sent to the
+    workers once, through shared memory, and decoded by each worker the
+    first time it runs a task of the call; tasks only carry their query.
+    """
+    ref, task = task
+    worker = worker_state(ref, _init_worker)
+    function, argument = dill.loads(task)
+    positions = worker["positions"]
+    return sorted(positions[id(node)] for node in function(worker, argument))
+
+
+def apply_in_pool(graph, dframe, make_tasks, num_procs, engine_options):
+    """Run query tasks in the shared pool of worker processes.
+
+    Arguments:
+        graph (Graph): the Graph to which the queries are applied
+        dframe (pandas.DataFrame): the DataFrame associated with the graph
+        make_tasks (callable): takes the CSRGraph of the graph and returns
+            a list of tasks (see query_tasks and root_tasks)
+        num_procs (int): number of worker processes
+        engine_options (dict): arguments of the QueryEngine of each worker
+
+    Returns:
+        (list): for each task, the list of matched nodes (or None if the
+            Graph, DataFrame or queries cannot be sent to worker processes,
+            or shared memory is not available)
+    """
+    if not has_shared_memory():
+        return None
+    encoded = encode_graphframe(graph, dframe)
+    if encoded is None:
+        return None
+    csr, frame = encoded
+    nodes = csr.nodes
+    try:
+        tasks = [dill.dumps(task, recurse=True) for task in make_tasks(csr)]
+        state = SharedState((csr, frame, engine_options))
+    except Exception:
+        # e.g., a predicate that closes over an object that cannot be pickled
+        return None
+    try:
+        results = get_executor(num_procs).map(
+            _run_task, [(state.ref, task) for task in tasks], chunksize=1
+        )
+    finally:
+        state.close()
+    return [[nodes[i] for i in result] for result in results]
+
+
+def query_tasks(queries):
+    """Tasks that apply whole queries (see apply_in_pool)."""
+    return lambda csr: [(_apply_query, query) for query in queries]
+
+
+def root_tasks(query, search_cache, num_tasks):
+    """Tasks that match a query from disjoint sets of roots (see apply_in_pool).
+
+    Arguments:
+        query (Query): the query being applied
+        search_cache (dict): the query nodes matched by every node
+        num_tasks (int): number of tasks to split the roots into
+    """
+
+    def make_tasks(csr):
+        roots = csr.roots.tolist()
+        return [
+            (_match_roots, (query, roots[i::num_tasks], search_cache))
+            for i in range(min(num_tasks, len(roots)))
+        ]
+
+    return make_tasks
@@ -4,6 +4,12 @@
 # SPDX-License-Identifier: MIT
 
 from .errors import InvalidQueryPath
+from .vectorized import match_all
+
+
+def _match_any_row(row):
+    """Default predicate, which matches every node."""
+    return True
 
 
 class Query(object):
@@ -12,8 +18,15 @@ class Query(object):
     def __init__(self):
         """Create new Query"""
         self.query_pattern = []
-
-    def match(self, quantifier=".", predicate=lambda row: True):
+        # optional vectorized counterparts of the predicates in query_pattern
+        # (see hatchet.query.vectorized), or None where there is none
+        self.vectorized_predicates = []
+        # hashable fingerprints that identify what the predicates in
+        # query_pattern compute, or None for arbitrary callables whose
+        # results cannot be reused across queries
+        self.predicate_keys = []
+
+    def match(self, quantifier=".", predicate=_match_any_row):
         """Start a query with a root node described by the arguments.
 
         Arguments:
@@ -25,10 +38,12 @@ class Query(object):
         """
         if len(self.query_pattern) != 0:
             self.query_pattern = []
+            self.vectorized_predicates = []
+            self.predicate_keys = []
         self._add_node(quantifier, predicate)
         return self
 
-    def rel(self, quantifier=".", predicate=lambda row: True):
+    def rel(self, quantifier=".", predicate=_match_any_row):
         """Add a new node to the end of the query.
 
         Arguments:
@@ -45,7 +60,7 @@ class Query(object):
         self._add_node(quantifier, predicate)
         return self
 
-    def relation(self, quantifer=".", predicate=lambda row: True):
+    def relation(self, quantifer=".", predicate=_match_any_row):
         """Alias to Query.rel. Add a new node to the end of the query.
 
         Arguments:
@@ -65,21 +80,41 @@ class Query(object):
         """Allows users to iterate over the Query like a list."""
         return iter(self.query_pattern)
 
-    def _add_node(self, quantifer=".", predicate=lambda row: True):
+    def _add_node(
+        self,
+        quantifer=".",
+        predicate=_match_any_row,
+        vectorized_predicate=None,
+        predicate_key=None,
+    ):
         """Add a node to the query.
 
         Arguments:
             quantifier (".", "*", "+", or int, optional): the quantifier for this node (tells how many graph nodes to match)
             predicate (Callable, optional): the predicate for this node (used to determine whether a graph node matches this query node)
+            vectorized_predicate (Callable, optional): an equivalent of "predicate" that takes a NodeTable and returns a boolean array with one entry per node
+            predicate_key (hashable, optional): a fingerprint that is equal for predicates that always match the same nodes of the same data
         """
         assert isinstance(quantifer, int) or isinstance(quantifer, str)
         assert callable(predicate)
+        if predicate is _match_any_row:
+            if vectorized_predicate is None:
+                vectorized_predicate = match_all
+            if predicate_key is None:
+                predicate_key = ("match_all",)
+        node = (predicate, vectorized_predicate, predicate_key)
         if isinstance(quantifer, int):
             for _ in range(quantifer):
-                self.query_pattern.append((".", predicate))
+                self._append_node(".", *node)
         elif quantifer == "+":
-            self.query_pattern.append((".", predicate))
-            self.query_pattern.append(("*", predicate))
+            self._append_node(".", *node)
+            self._append_node("*", *node)
         else:
             assert quantifer == "." or quantifer == "*"
-            self.query_pattern.append((quantifer, predicate))
+            self._append_node(quantifer, *node)
+
+    def _append_node(self, wcard, predicate, vectorized_predicate, predicate_key):
+        """Append a single wildcard/predicate pair to the query pattern."""
+        self.query_pattern.append((wcard, predicate))
+        self.vectorized_predicates.append(vectorized_predicate)
+        self.predicate_keys.append(predicate_key)
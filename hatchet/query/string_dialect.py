@@ -15,6 +15,7 @@ import warnings
 
 from .errors import InvalidQueryPath, InvalidQueryFilter, RedundantQueryFilterWarning
 from .query import Query
+from .vectorized import UnvectorizablePredicate, regex_mask
 
 
 # PEG grammar for the String-based dialect
@@ -115,14 +116,15 @@ class StringQuery(Query):
         self.wcard_pos = {}
         self._parse_path(model.path_expr)
         self.filters = [[] for _ in self.wcards]
+        self.vectorized_filters = [[] for _ in self.wcards]
         self._parse_conditions(model.cond_expr)
         self.lambda_filters = [None for _ in self.wcards]
         self._build_lambdas()
         self._build_query()
 
     def _build_query(self):
-        """Builds the entire query using 'match' and 'rel' using
-        the pre-parsed quantifiers and predicates.
+        """Builds the entire query from the pre-parsed quantifiers and
+        predicates.
         """
         for i in range(0, len(self.wcards)):
             wcard = self.wcards[i][0]
@@ -131,15 +133,14 @@ class StringQuery(Query):
                 wcard = wcard.encode("ascii", "ignore")
             filt_str = self.lambda_filters[i]
             if filt_str is None:
-                if i == 0:
-                    self.match(quantifier=wcard)
-                else:
-                    self.rel(quantifier=wcard)
+                self._add_node(wcard)
             else:
-                if i == 0:
-                    self.match(quantifier=wcard, predicate=eval(filt_str))
-                else:
-                    self.rel(quantifier=wcard, predicate=eval(filt_str))
+                self._add_node(
+                    wcard,
+                    eval(filt_str),
+                    self._build_vectorized_predicate(i),
+                    ("string", filt_str),
+                )
 
     def _build_lambdas(self):
         """Constructs the final predicate lambdas from the pre-parsed
@@ -167,6 +168,170 @@ class StringQuery(Query):
                 )
                 self.lambda_filters[i] = bool_expr
 
+    def _split_unary_cond(self, obj):
+        """Gets whether a (possibly AND/OR-prefixed) predicate is negated,
+        and the single condition it tests.
+        """
+        if self._is_binary_cond(obj):
+            obj = obj.subcond
+        if cname(obj) == "NotCond":
+            return [True, obj.subcond]
+        return [False, obj]
+
+    def _build_vectorized_predicate(self, i):
+        """Constructs a vectorized predicate (see hatchet.query.vectorized)
+        with the same semantics as the predicate lambda of a query node.
+        """
+        terms = []
+        type_checks = []
+        for op, negate, obj in self.vectorized_filters[i]:
+            evaluate, type_check = self._vectorize_single_cond(obj)
+            terms.append((op, negate, evaluate))
+            if type_check is not None:
+                type_checks.append(type_check)
+        multi_index_mode = self.multi_index_mode
+
+        def evaluate_term(table, negate, evaluate):
+            # A missing column makes the whole predicate false, but only
+            # if the term is reached (like a KeyError in the lambda).
+            # Return the value and "error" masks of the term.
+            try:
+                value = evaluate(table)
+            except KeyError:
+                return table.constant(False), table.constant(True)
+            if negate:
+                value = ~value
+            return value, table.constant(False)
+
+        def vectorized_predicate(table):
+            if table.multi_index != (multi_index_mode != "off"):
+                raise UnvectorizablePredicate("multi_index_mode does not match data")
+            if not table.multi_index and not table.unique_rows:
+                raise UnvectorizablePredicate("several rows for one node")
+            for prop, kind in type_checks:
+                if prop not in table.dframe.columns:
+                    return table.constant(False)
+                actual_kind = table.column_kind(prop)
+                if actual_kind is None:
+                    raise UnvectorizablePredicate("cannot check type of " + prop)
+                if actual_kind != kind and len(table) > 0:
+                    raise InvalidQueryFilter("Type mismatch in filter")
+
+            # Combine terms with Python's precedence (AND before OR) and
+            # short-circuiting
+            value, error = None, None
+            group_value, group_error = None, None
+            for op, negate, evaluate in terms:
+                term_value, term_error = evaluate_term(table, negate, evaluate)
+                if op == "and":
+                    group_error = group_error | (group_value & term_error)
+                    group_value = group_value & term_value & ~term_error
+                    continue
+                if group_value is not None:
+                    if value is None:
+                        value, error = group_value, group_error
+                    else:
+                        error = error | (~value & group_error)
+                        value = value | (~error & group_value)
+                group_value, group_error = term_value, term_error
+            if value is None:
+                value, error = group_value, group_error
+            else:
+                error = error | (~value & group_error)
+                value = value | (~error & group_value)
+            return value & ~error
+
+        return vectorized_predicate
+
+    def _vectorize_single_cond(self, obj):
+        """Converts a single condition of the WHERE statement into a function
+        computing a boolean per node from a NodeTable.
+
+        Returns:
+            (Callable, tuple): the function, and the (property, "string" or
+                "real") type check that must pass first, or None
+        """
+        kind = cname(obj)
+        multi_index_mode = self.multi_index_mode
+
+        if kind in ("LeafCond", "NotLeafCond"):
+            is_leaf = kind == "LeafCond"
+            return (lambda table: table.is_leaf() == is_leaf), None
+
+        prop = obj.prop
+        if kind in ("NoneCond", "NotNoneCond"):
+            is_none = kind == "NoneCond"
+            if prop in ("depth", "node_id"):
+                return (lambda table: table.constant(not is_none)), None
+
+            def evaluate_none(table):
+                values = table.column(prop)
+                rows = np.fromiter(
+                    (v is None for v in values), dtype=bool, count=len(values)
+                )
+                if not is_none:
+                    rows = ~rows
+                if table.multi_index:
+                    return table.reduce(rows, multi_index_mode)
+                return rows
+
+            return evaluate_none, None
+
+        if self._is_str_cond(obj):
+            try:
+                # the lambdas embed the value in a string literal
+                val = eval('"{}"'.format(obj.val))
+            except Exception:
+
+                def unvectorizable(table):
+                    raise UnvectorizablePredicate("cannot evaluate " + obj.val)
+
+                return unvectorizable, None
+            test_rows = {
+                "StringEq": lambda values: values == val,
+                "StringStartsWith": lambda values: pd.Series(values)
+                .str.startswith(val)
+                .to_numpy(dtype=bool),
+                "StringEndsWith": lambda values: pd.Series(values)
+                .str.endswith(val)
+                .to_numpy(dtype=bool),
+                "StringContains": lambda values: pd.Series(values)
+                .str.contains(val, regex=False)
+                .to_numpy(dtype=bool),
+                "StringMatch": lambda values: regex_mask(values, val),
+            }[kind]
+            type_check = (prop, "string")
+        else:
+            test_rows = {
+                "NumEq": lambda values: values == obj.val,
+                "NumLt": lambda values: values < obj.val,
+                "NumGt": lambda values: values > obj.val,
+                "NumLte": lambda values: values <= obj.val,
+                "NumGte": lambda values: values >= obj.val,
+                "NumNan": lambda values: np.isnan(values),
+                "NumNotNan": lambda values: ~np.isnan(values),
+                "NumInf": lambda values: np.isinf(values),
+                "NumNotInf": lambda values: ~np.isinf(values),
+            }[kind]
+            if prop in ("depth", "node_id"):
+                attr = "_depth" if prop == "depth" else "_hatchet_nid"
+                if prop == "depth" and kind == "NumEq" and obj.val == -1:
+                    return (lambda table: table.is_leaf()), None
+
+                def evaluate_node_attr(table):
+                    return test_rows(table.node_attr(attr).astype(np.float64))
+
+                return evaluate_node_attr, None
+            type_check = (prop, "real")
+
+        def evaluate_rows(table):
+            rows = np.asarray(test_rows(table.column(prop)), dtype=bool)
+            if table.multi_index:
+                return table.reduce(rows, multi_index_mode)
+            return rows
+
+        return evaluate_rows, type_check
+
     def _parse_path(self, path_obj):
         """Parses the MATCH statement of a String-based query."""
         nodes = path_obj.path.nodes
@@ -196,10 +361,14 @@ class StringQuery(Query):
             self.filters[self.wcard_pos[converted_condition[1]]].append(
                 [converted_condition[0], converted_condition[2], converted_condition[3]]
             )
+            self.vectorized_filters[self.wcard_pos[converted_condition[1]]].append(
+                [converted_condition[0]] + self._split_unary_cond(cond)
+            )
         for i in range(0, len(self.filters)):
             if len(self.filters[i]) > 0:
                 if self.filters[i][0][0] != "not":
                     self.filters[i][0][0] = None
+                    self.vectorized_filters[i][0][0] = None
 
     def _is_unary_cond(self, obj):
         """Detect whether a predicate is unary or not."""
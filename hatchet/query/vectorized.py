@@ -0,0 +1,146 @@
+# Copyright 2017-2023 Lawrence Livermore National Security, LLC and other
+# Hatchet Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import re
+
+import numpy as np
+import pandas as pd
+
+
+class UnvectorizablePredicate(Exception):
+    """Raised by a vectorized predicate that cannot be evaluated over a
+    whole DataFrame at once. The query engine then falls back to
+    evaluating the original predicate one node at a time."""
+
+
+class NodeTable(object):
+    """Column-at-a-time view of a DataFrame for vectorized query predicates.
+
+    Vectorized predicates receive a NodeTable and return a boolean array
+    with one entry per node in ``nodes``. Row-level results (one entry per
+    row of the DataFrame) are reduced to node-level results with ``any``
+    and ``all``, which group rows by their node in the "node" index level.
+    """
+
+    def __init__(self, dframe):
+        """Create a NodeTable.
+
+        Arguments:
+            dframe (pandas.DataFrame): the DataFrame associated with the graph
+        """
+        self.dframe = dframe
+        self.multi_index = isinstance(dframe.index, pd.MultiIndex)
+        if self.multi_index:
+            node_level = dframe.index.get_level_values("node")
+        else:
+            node_level = dframe.index
+        # each row's position in "nodes"
+        self.row_nodes, uniques = pd.factorize(node_level)
+        self.nodes = list(uniques)
+        self.unique_rows = len(self.nodes) == len(dframe)
+        self._node_attrs = {}
+
+    def __len__(self):
+        """Number of nodes in the table."""
+        return len(self.nodes)
+
+    def node_attr(self, attr):
+        """Array of a Node attribute (e.g., "_depth") for every node."""
+        if attr not in self._node_attrs:
+            self._node_attrs[attr] = np.array(
+                [getattr(node, attr) for node in self.nodes]
+            )
+        return self._node_attrs[attr]
+
+    def is_leaf(self):
+        """Boolean array that is True for nodes without children."""
+        if "is_leaf" not in self._node_attrs:
+            self._node_attrs["is_leaf"] = np.array(
+                [len(node.children) == 0 for node in self.nodes], dtype=bool
+            )
+        return self._node_attrs["is_leaf"]
+
+    def column(self, name):
+        """Values of a column for every row (raises KeyError if missing)."""
+        values = self.dframe[name]
+        if isinstance(values, pd.DataFrame):
+            raise UnvectorizablePredicate("duplicate column {}".format(name))
+        return values.to_numpy()
+
+    def column_kind(self, name):
+        """Classify a column as "string" or "real" data, or None if its
+        values cannot be treated uniformly (e.g., mixed objects)."""
+        values = self.column(name)
+        if values.dtype.kind in "iuf":
+            return "real"
+        if (
+            values.dtype.kind == "O"
+            and pd.api.types.infer_dtype(values, skipna=False) == "string"
+        ):
+            return "string"
+        return None
+
+    def any(self, row_mask):
+        """True for each node where any of its rows is True."""
+        counts = np.bincount(self.row_nodes, weights=row_mask, minlength=len(self))
+        return counts > 0
+
+    def all(self, row_mask):
+        """True for each node where all of its rows are True."""
+        counts = np.bincount(self.row_nodes, weights=~row_mask, minlength=len(self))
+        return counts == 0
+
+    def reduce(self, row_mask, multi_index_mode):
+        """Reduce a row-level mask to nodes with "any" or "all"."""
+        if multi_index_mode == "any":
+            return self.any(row_mask)
+        if multi_index_mode == "all":
+            return self.all(row_mask)
+        raise UnvectorizablePredicate(
+            "multi-index mode {} cannot be reduced".format(multi_index_mode)
+        )
+
+    def constant(self, value):
+        """Node-level array with the same value for every node."""
+        return np.full(len(self), value, dtype=bool)
+
+
+def match_all(table):
+    """Vectorized counterpart of a predicate that accepts every node."""
+    return table.constant(True)
+
+
+def eval_comparison(values, expression):
+    """Evaluate an expression like "> 5" element-wise on an array.
+
+    Arguments:
+        values (numpy.ndarray): left-hand side of the comparison
+        expression (str): a comparison operator followed by an operand,
+            as accepted by ``eval`` for a single value
+
+    Returns:
+        (numpy.ndarray): boolean result for each value
+    """
+    try:
+        result = eval(
+            "values {}".format(expression), {"np": np, "pd": pd}, {"values": values}
+        )
+    except Exception:
+        raise UnvectorizablePredicate("cannot evaluate '{}'".format(expression))
+    result = np.asarray(result)
+    if result.dtype != bool or result.shape != values.shape:
+        raise UnvectorizablePredicate("'{}' is not a comparison".format(expression))
+    return result
+
+
+def regex_mask(values, pattern):
+    """Test ``re.match`` of a pattern against an array of strings.
+
+    Each distinct string is only matched once.
+    """
+    codes, uniques = pd.factorize(values)
+    regex = re.compile(pattern)
+    matched = np.array([regex.match(u) is not None for u in uniques], dtype=bool)
+    return matched[codes]
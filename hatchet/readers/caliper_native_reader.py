@@ -45,6 +45,14 @@ class CaliperNativeReader:
         ),
     }
 
+    # numeric types, whose values are converted a column at a time
+    __cali_numeric_types = {
+        "int": np.int64,
+        "uint": np.uint64,
+        "addr": np.uint64,
+        "double": np.float64,
+    }
+
     def __init__(self, filename_or_caliperreader, native, string_attributes):
         """Read in a native cali using Caliper's python reader.
 
@@ -62,6 +70,8 @@ class CaliperNativeReader:
         self.df_nodes = {}
         self.metric_cols = []
         self.record_data_cols = []
+        # type of each attribute of the records, or None if it is ignored
+        self.attribute_types = {}
         self.node_dicts = []
         self.callpath_to_node = {}
         self.idx_to_node = {}
@@ -81,38 +91,171 @@ class CaliperNativeReader:
         if isinstance(self.string_attributes, str):
             self.string_attributes = [self.string_attributes]
 
-    def _create_metric_df(self, metrics):
-        """Make a list of metric columns and create a dataframe, group by node"""
+    def _create_metric_df(self, columns, num_rows, timesteps=None, num_timesteps=0):
+        """Make a list of metric columns and create a dataframe, group by node
+
+        Arguments:
+            columns (dict): row numbers and values of each column (see
+                read_metrics)
+            num_rows (int): number of records
+            timesteps (array, optional): the timestep of each record, if the
+                file is read as a timeseries
+            num_timesteps (int, optional): number of timesteps
+
+        Returns:
+            (pandas.DataFrame): the first non-null metrics of each node (and
+                timestep)
+        """
         for col in self.record_data_cols:
             if self.filename_or_caliperreader.attribute(col).is_value():
                 self.metric_cols.append(col)
-        df_metrics = pd.DataFrame.from_dict(data=metrics)
-        df_new = df_metrics.groupby(df_metrics["nid"]).aggregate("first").reset_index()
-        return df_new
-
-    def _reset_metrics(self, metrics):
-        """Since the initial functions (i.e. main) are only called once, this keeps a small subset
-        of the timeseries data and resets the rest so future iterations will be filled with nans"""
-        new_mets = []
+        df_metrics = pd.DataFrame(
+            {
+                name: self._column_array(name, rows, values, num_rows)
+                for name, (rows, values) in columns.items()
+            },
+            index=pd.RangeIndex(num_rows),
+        )
+        if timesteps is None:
+            return (
+                df_metrics.groupby(df_metrics["nid"]).aggregate("first").reset_index()
+            )
+
+        timestep = pd.Series(np.asarray(timesteps, dtype=np.int64), name="timestep")
+        df_new = df_metrics.groupby([timestep, df_metrics["nid"]]).aggregate("first")
+        carried = self._carried_metrics(df_metrics, timestep, num_timesteps)
+        if carried is not None:
+            df_new = carried.combine_first(df_new)[df_new.columns]
+        return df_new.reset_index()
+
+    def _column_array(self, name, rows, values, num_rows):
+        """Convert the values of an attribute to an array with a row per
+        record, and NaN in the records without the attribute.
+
+        Numeric attributes are converted all at once. The dtypes are the
+        ones pandas infers for a dataframe created from one dict per record.
+        """
+        attr_type = self.attribute_types.get(name)
+        converted = None
+        if attr_type in self.__cali_numeric_types:
+            try:
+                converted = np.array(values, dtype=self.__cali_numeric_types[attr_type])
+            except ValueError:
+                converted = None
+            if converted is not None and converted.ndim != 1:
+                converted = None
+            if converted is not None and len(rows) < num_rows:
+                array = np.full(num_rows, np.nan)
+                array[rows] = converted
+                return array
+        if converted is None and attr_type is not None:
+            rows, values = self._convert_values(name, attr_type, rows, values)
+
+        if converted is not None and len(rows) == num_rows:
+            return converted
+        array = np.full(num_rows, np.nan, dtype=object)
+        array[rows] = values if converted is None else converted
+        return pd.Series(array, copy=False).infer_objects().to_numpy()
+
+    def _convert_values(self, name, attr_type, rows, values):
+        """Convert the values of an attribute one by one, and skip the values
+        that cannot be converted."""
+        convert = self.__cali_type_dict[attr_type]
+        kept_rows = []
+        converted = []
+        for row, value in zip(rows, values):
+            try:
+                converted.append(convert(value))
+                kept_rows.append(row)
+            except ValueError as e:
+                if attr_type not in ("ptr", "inv"):
+                    print("Ignoring attribute {}:\n    {}".format(name, str(e)))
+                else:
+                    raise e
+        return kept_rows, converted
+
+    def _carried_metrics(self, df_metrics, timestep, num_timesteps):
+        """Since the initial functions (i.e. main) are only called once, a small
+        subset of their timeseries data (the records with a zero
+        timeseries.snapshot) is carried over to all the later timesteps, and
+        the rest of the metrics of these functions are filled with nans
+
+        Arguments:
+            df_metrics (pandas.DataFrame): the metrics of each record
+            timestep (pandas.Series): the timestep of each record
+            num_timesteps (int): number of timesteps
+
+        Returns:
+            (pandas.DataFrame): the carried over metrics, indexed by timestep
+                and nid, or None if there are none
+        """
         cols_to_keep = [
-            "nid",
             "loop.iterations",
             "loop.start_iteration",
             "timeseries.snapshot",
         ]
-        for node_dict in metrics:
-            if node_dict.get("timeseries.snapshot") == 0.0:
-                new_mets.append({k: node_dict.get(k, np.nan) for k in cols_to_keep})
-        return new_mets
+        if "timeseries.snapshot" not in df_metrics.columns:
+            return None
+        kept = (df_metrics["timeseries.snapshot"] == 0.0) & df_metrics["nid"].notna()
+        if not kept.any():
+            return None
+        snapshots = df_metrics.loc[kept]
+        snapshot_timestep = timestep[kept]
+
+        # the records of a node are carried over to every timestep after the
+        # first one in which the node has a snapshot record
+        first = snapshot_timestep.groupby(snapshots["nid"]).min()
+        counts = num_timesteps - 1 - first.to_numpy()
+        nids = np.repeat(first.index.to_numpy(), counts)
+        offsets = np.repeat(np.cumsum(counts) - counts, counts)
+        timesteps = (
+            np.arange(len(nids)) - offsets + np.repeat(first.to_numpy() + 1, counts)
+        )
+
+        carried = {}
+        for col in cols_to_keep:
+            if col not in snapshots.columns:
+                continue
+            # the earliest value of a node is carried over to the timesteps
+            # after the one it was recorded in
+            values = snapshots[col]
+            present = values.notna()
+            by_nid = snapshots.loc[present, "nid"]
+            value = values[present].groupby(by_nid).first().reindex(nids)
+            since = snapshot_timestep[present].groupby(by_nid).min().reindex(nids)
+            carried[col] = value.where(timesteps > since.to_numpy()).to_numpy()
+        return pd.DataFrame(
+            carried,
+            index=pd.MultiIndex.from_arrays(
+                [timesteps, nids], names=["timestep", "nid"]
+            ),
+        )
 
     def read_metrics(self, ctx="path"):
+        """Read the metrics of all the records into a single table, with a
+        timestep column if the records are split on timeseries_level
 
-        """append each metrics table to a list and return the list, split on timeseries_level if exists"""
-        metric_dfs = []
-        all_metrics = []
+        The values of the records are collected column by column: each
+        column has the row numbers of the records that have the attribute,
+        and the unconverted values, which are converted when the dataframe
+        is created.
+        """
+        columns = {}
+        num_rows = 0
+        timesteps = []
+        timestep = 0
         next_timestep = 0
         cur_timestep = 0
         records = self.filename_or_caliperreader.records
+        string_attributes = set(self.string_attributes)
+        attribute_types = self.attribute_types
+
+        def add_value(name, value):
+            column = columns.get(name)
+            if column is None:
+                column = columns[name] = ([], [])
+            column[0].append(num_rows)
+            column[1].append(value)
 
         # read metadata from the caliper reader
         for record in records:
@@ -120,14 +263,10 @@ class CaliperNativeReader:
             if self.timeseries_level in record:
                 next_timestep = int(record[self.timeseries_level])
                 if cur_timestep != next_timestep:
-                    # make a dataframe for the current profile before we continue reading metrics
-                    df_new = self._create_metric_df(all_metrics)
-                    metric_dfs.append(df_new)
-                    # reset the metrics for the next df, and update the timestep
-                    all_metrics = self._reset_metrics(all_metrics)
+                    # the records that follow belong to the next profile
+                    timestep += 1
                     cur_timestep = next_timestep
 
-            node_dict = {}
             if ctx in record:
                 # only parse records that have spot.channel=regionprofile or no
                 # spot.channel attribute
@@ -153,44 +292,39 @@ class CaliperNativeReader:
                         node_callpath = tuple([record[ctx]])
 
                     if "spot.channel" in record:
-                        node_dict["spot.channel"] = record["spot.channel"]
+                        add_value("spot.channel", record["spot.channel"])
 
                     # get node nid based on callpath
-                    node_dict["nid"] = self.callpath_to_idx.get(node_callpath)
+                    add_value("nid", self.callpath_to_idx.get(node_callpath))
 
-                    for item in record.keys():
-                        if item != ctx:
+                    for item, value in record.items():
+                        if item == ctx:
+                            continue
+                        if item not in attribute_types:
+                            # resolve the type of each attribute only once
                             attr_type = self.filename_or_caliperreader.attribute(
                                 item
                             ).attribute_type()
-                            if attr_type in self.__cali_type_dict:
-                                if (
-                                    attr_type != "string"
-                                    or item in self.string_attributes
-                                ):
-                                    try:
-                                        node_dict[item] = self.__cali_type_dict[
-                                            attr_type
-                                        ](record[item])
-                                        if item not in self.record_data_cols:
-                                            self.record_data_cols.append(item)
-                                    except ValueError as e:
-                                        if attr_type not in ("ptr", "inv"):
-                                            print(
-                                                "Ignoring attribute {}:\n    {}".format(
-                                                    item, str(e)
-                                                )
-                                            )
-                                        else:
-                                            raise e
-
-                    all_metrics.append(node_dict)
-
-        # create the dataframe, if a single profile (or last one if the timeseries)
-        df_new = self._create_metric_df(all_metrics)
-        metric_dfs.append(df_new)
-        # will return a list with only one element unless it is a timeseries
-        return metric_dfs
+                            if attr_type not in self.__cali_type_dict or (
+                                attr_type == "string" and item not in string_attributes
+                            ):
+                                attr_type = None
+                            elif item not in self.record_data_cols:
+                                self.record_data_cols.append(item)
+                            attribute_types[item] = attr_type
+                        if attribute_types[item] is None:
+                            continue
+                        if item == "spot.channel":
+                            # already added above
+                            continue
+                        add_value(item, value)
+
+                    timesteps.append(timestep)
+                    num_rows += 1
+
+        if self.timeseries_level is None:
+            return self._create_metric_df(columns, num_rows)
+        return self._create_metric_df(columns, num_rows, timesteps, timestep + 1)
 
     def create_graph(self, ctx="path"):
         list_roots = []
@@ -408,179 +542,246 @@ class CaliperNativeReader:
         metadata = self.filename_or_caliperreader.globals
         parsed_metadata = self._parse_metadata(metadata)
 
-        # Get a list of metrics (split by timeseries level if it exists)
+        # Get the metrics (with a timestep column if it is a timeseries)
         with self.timer.phase("read metrics"):
-            metrics_list = self.read_metrics()
-
-        # If not a timeseries there will just be one element in the list
-        for df_fixed_data in metrics_list:
+            df_fixed_data = self.read_metrics()
 
-            metrics = pd.DataFrame.from_dict(data=df_fixed_data)
-
-            # add missing intermediate nodes to the df_fixed_data dataframe
-            if "mpi.rank" in df_fixed_data.columns:
-                num_ranks = metrics["mpi.rank"].max() + 1
-                rank_list = range(0, num_ranks)
-
-            # create a standard dict to be used for filling all missing rows
-            default_metric_dict = {}
-            for idx, col in enumerate(self.record_data_cols):
-                if self.filename_or_caliperreader.attribute(col).is_value():
-                    default_metric_dict[list(self.record_data_cols)[idx]] = 0
-                else:
-                    default_metric_dict[list(self.record_data_cols)[idx]] = None
-            default_metric_dict["nid"] = np.nan
-
-            # create a list of dicts, one dict for each missing row
-            missing_nodes = []
-            for iteridx, row in self.df_nodes.iterrows():
-                # check if df_nodes row exists in df_fixed_data
-                metric_rows = df_fixed_data.loc[metrics["nid"] == row["nid"]]
-                if "mpi.rank" not in self.metric_cols:
-                    if metric_rows.empty:
-                        # add a single row
-                        node_dict = dict(default_metric_dict)
-                        missing_nodes.append(node_dict)
-                else:
-                    if metric_rows.empty:
-                        # add a row per MPI rank
-                        for rank in rank_list:
-                            node_dict = dict(default_metric_dict)
-                            node_dict["nid"] = row["nid"]
-                            node_dict["mpi.rank"] = rank
-                            missing_nodes.append(node_dict)
-                    elif len(metric_rows) < num_ranks:
-                        # add a row for each missing MPI rank
-                        present_ranks = metric_rows["mpi.rank"].values
-                        missing_ranks = [x for x in rank_list if x not in present_ranks]
-                        for rank in missing_ranks:
-                            node_dict = dict(default_metric_dict)
-                            node_dict["nid"] = row["nid"]
-                            node_dict["mpi.rank"] = rank
-                            missing_nodes.append(node_dict)
-
-            df_missing = pd.DataFrame.from_dict(data=missing_nodes)
+        # add missing intermediate nodes to the df_fixed_data dataframe
+        with self.timer.phase("missing rows"):
+            df_missing = self._missing_rows(df_fixed_data)
+        if len(df_missing):
             df_metrics = pd.concat([df_fixed_data, df_missing], sort=False)
+        else:
+            df_metrics = df_fixed_data.copy()
 
-            # rename columns to user-readable metric names (i.e., aliases)
-            if not self.use_native_metric_names:
-                for col in df_metrics.columns:
-                    if col == "nid":
-                        continue
-                    alias = self.filename_or_caliperreader.attribute(col).get(
-                        "attribute.alias"
-                    )
-                    if alias:
-                        # update column name in metrics dataframe
-                        df_metrics.rename(columns={col: alias}, inplace=True)
-
-                        # also update list of metric columns
-                        self.metric_cols = [
-                            alias if item == col else item for item in self.metric_cols
-                        ]
-
-            # dict mapping old to new column names to make columns consistent with
-            # other readers
-            old_to_new = {
-                "mpi.rank": "rank",
-                "module#cali.sampler.pc": "module",
-                "sum#time.duration": "time",
-                "sum#avg#sum#time.duration": "time",
-                "inclusive#sum#time.duration": "time (inc)",
-                "sum#avg#inclusive#sum#time.duration": "time (inc)",
-            }
-
-            # change column names
-            new_cols = []
+        # rename columns to user-readable metric names (i.e., aliases)
+        if not self.use_native_metric_names:
             for col in df_metrics.columns:
-                if col in old_to_new:
-                    new_cols.append(old_to_new[col])
-                else:
-                    new_cols.append(col)
-            df_metrics.columns = new_cols
-
-            # create list of exclusive and inclusive metric columns
-            ignore_columns = [
-                "mpi.rank",
-                "aggregate.slot",
-                "Node order",
-                "loop.start_iteration",
-            ]
-            exc_metrics = []
-            inc_metrics = []
-            for column in self.metric_cols:
-                # ignore rank as an exc or inc metric
-                if column in ignore_columns:
+                if col in ("nid", "timestep"):
                     continue
+                alias = self.filename_or_caliperreader.attribute(col).get(
+                    "attribute.alias"
+                )
+                if alias:
+                    # update column name in metrics dataframe
+                    df_metrics.rename(columns={col: alias}, inplace=True)
+
+                    # also update list of metric columns
+                    self.metric_cols = [
+                        alias if item == col else item for item in self.metric_cols
+                    ]
+
+        # dict mapping old to new column names to make columns consistent with
+        # other readers
+        old_to_new = {
+            "mpi.rank": "rank",
+            "module#cali.sampler.pc": "module",
+            "sum#time.duration": "time",
+            "sum#avg#sum#time.duration": "time",
+            "inclusive#sum#time.duration": "time (inc)",
+            "sum#avg#inclusive#sum#time.duration": "time (inc)",
+        }
+
+        # change column names
+        new_cols = []
+        for col in df_metrics.columns:
+            if col in old_to_new:
+                new_cols.append(old_to_new[col])
+            else:
+                new_cols.append(col)
+        df_metrics.columns = new_cols
+
+        # create list of exclusive and inclusive metric columns
+        ignore_columns = [
+            "mpi.rank",
+            "aggregate.slot",
+            "Node order",
+            "loop.start_iteration",
+        ]
+        exc_metrics = []
+        inc_metrics = []
+        for column in self.metric_cols:
+            # ignore rank as an exc or inc metric
+            if column in ignore_columns:
+                continue
 
-                # add new column names to list of metrics if inc or inclusive in
-                # old column names
-                if "(inc)" in column or "inclusive" in column:
-                    if column in old_to_new:
-                        column = old_to_new[column]
-                    inc_metrics.append(column)
-                else:
-                    if column in old_to_new:
-                        column = old_to_new[column]
-                    exc_metrics.append(column)
-
-            with self.timer.phase("data frame"):
-                # merge the metrics and node dataframes on the nid column
-                dataframe = pd.merge(df_metrics, self.df_nodes, on="nid")
-                dataframe["nid"] = dataframe["nid"].astype(pd.Int64Dtype())
-
-                # set the index to be a MultiIndex
-                indices = ["node"]
-                if "rank" in dataframe.columns:
-                    indices.append("rank")
-                dataframe.set_index(indices, inplace=True)
-                dataframe.sort_index(inplace=True)
-
-            # set the default metric
-            if self.default_metric is None:
-                if "time (inc)" in dataframe.columns:
-                    self.default_metric = "time"
-                elif "avg#inclusive#sum#time.duration" in dataframe.columns:
-                    self.default_metric = "avg#inclusive#sum#time.duration"
-                elif len(inc_metrics) > 0:
-                    self.default_metric = inc_metrics[0]
-                elif len(exc_metrics) > 0:
-                    self.default_metric = exc_metrics[0]
-
-            # remove the "Node order" (or unaliased "aggregate.slot")
-            if "Node order" in dataframe.columns:
-                dataframe = dataframe.drop(columns="Node order")
-            if "aggregate.slot" in dataframe.columns:
-                dataframe = dataframe.drop(columns="aggregate.slot")
-
-            # add the gf to the list
-            self.gf_list.append(
-                hatchet.graphframe.GraphFrame(
-                    graph,
-                    dataframe,
-                    exc_metrics,
-                    inc_metrics,
-                    self.default_metric,
-                    metadata=parsed_metadata,
+            # add new column names to list of metrics if inc or inclusive in
+            # old column names
+            if "(inc)" in column or "inclusive" in column:
+                if column in old_to_new:
+                    column = old_to_new[column]
+                inc_metrics.append(column)
+            else:
+                if column in old_to_new:
+                    column = old_to_new[column]
+                exc_metrics.append(column)
+
+        with self.timer.phase("data frame"):
+            # merge the metrics and node dataframes on the nid column
+            dataframe = pd.merge(df_metrics, self.df_nodes, on="nid")
+            dataframe["nid"] = dataframe["nid"].astype(pd.Int64Dtype())
+
+            # set the index to be a MultiIndex
+            indices = ["node"]
+            if "rank" in dataframe.columns:
+                indices.append("rank")
+            if self.timeseries_level is not None:
+                indices.append("timestep")
+            dataframe.set_index(indices, inplace=True)
+            dataframe.sort_index(inplace=True)
+
+        # set the default metric
+        if self.default_metric is None:
+            if "time (inc)" in dataframe.columns:
+                self.default_metric = "time"
+            elif "avg#inclusive#sum#time.duration" in dataframe.columns:
+                self.default_metric = "avg#inclusive#sum#time.duration"
+            elif len(inc_metrics) > 0:
+                self.default_metric = inc_metrics[0]
+            elif len(exc_metrics) > 0:
+                self.default_metric = exc_metrics[0]
+
+        # remove the "Node order" (or unaliased "aggregate.slot")
+        if "Node order" in dataframe.columns:
+            dataframe = dataframe.drop(columns="Node order")
+        if "aggregate.slot" in dataframe.columns:
+            dataframe = dataframe.drop(columns="aggregate.slot")
+
+        gf = hatchet.graphframe.GraphFrame(
+            graph,
+            dataframe,
+            exc_metrics,
+            inc_metrics,
+            self.default_metric,
+            metadata=parsed_metadata,
+        )
+        if self.timeseries_level is None:
+            self.gf_list.append(gf)
+            return gf
+
+        # split the timeseries into one graphframe per timestep, which share
+        # the graph of the timeseries
+        with self.timer.phase("split timesteps"):
+            for _, df_timestep in dataframe.groupby(level="timestep", sort=True):
+                self.gf_list.append(
+                    hatchet.graphframe.GraphFrame(
+                        graph,
+                        df_timestep.droplevel("timestep"),
+                        exc_metrics,
+                        inc_metrics,
+                        self.default_metric,
+                        metadata=parsed_metadata,
+                    )
                 )
-            )
+        return gf
+
+    def _missing_rows(self, metrics):
+        """Create the placeholder rows of the nodes without metrics.
+
+        Without MPI ranks, there is one row per node that has no metrics.
+        With MPI ranks, there is one row per missing (node, rank) pair of the
+        nodes that have fewer rows than there are ranks. The missing pairs
+        are found with an anti-join of the (nid x rank) cartesian product
+        against the pairs in the metrics. In a timeseries, the rows are
+        created for each timestep.
 
-        # If not a timeseries this will return the single profile expected
-        #  othewise we'll have populated the timeseries list of gfs attribute and can ignore the return value
-        return self.gf_list[0]
+        Arguments:
+            metrics (pandas.DataFrame): the metrics of a profile, or of all
+                the timesteps of a timeseries
 
-    def read_timeseries(self, level="loop.start_iteration"):
+        Returns:
+            (pandas.DataFrame): the placeholder rows, with a zero for value
+                attributes and None for the other attributes
+        """
+        nids = self.df_nodes["nid"].to_numpy()
+        missing_timesteps = None
+        missing_ranks = None
+        if "mpi.rank" not in self.metric_cols:
+            if self.timeseries_level is not None:
+                missing_nids = np.empty(0)
+                missing_timesteps = np.empty(0, dtype=np.int64)
+            else:
+                missing = ~np.isin(nids, metrics["nid"].to_numpy())
+                # these rows have no nid, so they are not matched by any node
+                # when the metrics are merged with the nodes
+                missing_nids = np.full(np.count_nonzero(missing), np.nan)
+        else:
+            if self.timeseries_level is not None:
+                timesteps = metrics["timestep"].to_numpy()
+            else:
+                timesteps = np.zeros(len(metrics), dtype=np.int64)
+            num_ranks = metrics["mpi.rank"].groupby(timesteps).max() + 1
+            counts = metrics.groupby([timesteps, metrics["nid"].to_numpy()]).size()
+
+            # the (timestep, nid) pairs of the nodes with missing ranks
+            pair_timesteps = np.repeat(num_ranks.index.to_numpy(), len(nids))
+            pair_nids = np.tile(nids, len(num_ranks))
+            pair_ranks = np.repeat(num_ranks.to_numpy(), len(nids)).astype(np.int64)
+            have = counts.reindex(
+                pd.MultiIndex.from_arrays([pair_timesteps, pair_nids]), fill_value=0
+            ).to_numpy()
+            incomplete = have < pair_ranks
+            pair_timesteps = pair_timesteps[incomplete]
+            pair_nids = pair_nids[incomplete]
+            pair_ranks = pair_ranks[incomplete]
+
+            # every rank of these pairs, minus the ones in the metrics
+            offsets = np.repeat(np.cumsum(pair_ranks) - pair_ranks, pair_ranks)
+            pairs = pd.MultiIndex.from_arrays(
+                [
+                    np.repeat(pair_timesteps, pair_ranks),
+                    np.repeat(pair_nids, pair_ranks),
+                    np.arange(pair_ranks.sum()) - offsets,
+                ]
+            )
+            present = pd.MultiIndex.from_arrays(
+                [
+                    timesteps,
+                    metrics["nid"].to_numpy(),
+                    metrics["mpi.rank"].to_numpy(),
+                ]
+            )
+            pairs = pairs[~pairs.isin(present)]
+            missing_nids = pairs.get_level_values(1).to_numpy()
+            missing_ranks = pairs.get_level_values(2).to_numpy()
+            if self.timeseries_level is not None:
+                missing_timesteps = pairs.get_level_values(0).to_numpy()
+
+        num_missing = len(missing_nids)
+        columns = {}
+        for col in self.record_data_cols:
+            if self.filename_or_caliperreader.attribute(col).is_value():
+                columns[col] = np.zeros(num_missing, dtype=np.int64)
+            else:
+                columns[col] = np.full(num_missing, None, dtype=object)
+        columns["nid"] = missing_nids
+        if missing_ranks is not None:
+            columns["mpi.rank"] = missing_ranks
+        if missing_timesteps is not None:
+            columns["timestep"] = missing_timesteps
+        return pd.DataFrame(columns)
+
+    def read_timeseries(self, level="loop.start_iteration", combined=False):
         """Read in a timeseries Cali file. We need to intercept the read function
         so we can get a list of profiles for thicket
 
+        The records of all the timesteps are read into a single dataframe,
+        with a "timestep" index level, which is split into a graph frame per
+        timestep that share the same graph. Every timestep therefore has the
+        columns of the whole file, in the order in which they first appear,
+        and a column has the same dtype in every timestep.
+
         Args:
             level (str): column name to split the Cali file on, default
+            combined (bool, optional): return the graph frame of all the
+                timesteps instead of the list of graph frames
 
         Return:
             (list[GraphFrame]): A list of graph frames to be loaded into thicket
         """
         self.timeseries_level = level
-        # we don't need the return gf from read as we want the list that has been populated
-        _ = self.read()
+        gf = self.read()
+        if combined:
+            return gf
         # return the list of graph frames that has been split per timestep
         return self.gf_list
@@ -3,7 +3,6 @@
 #
 # SPDX-License-Identifier: MIT
 
-import json
 import sys
 import re
 import subprocess
@@ -19,6 +18,7 @@ from hatchet.graph import Graph
 from hatchet.frame import Frame
 from hatchet.util.timer import Timer
 from hatchet.util.executable import which
+from hatchet.util.json_stream import JSONStream
 
 unknown_label_counter = 0
 
@@ -68,19 +68,24 @@ class CaliperReader:
             self.filename_or_stream = cali_json.stdout
 
         # if filename_or_stream is a str, then open the file, otherwise
-        # directly load the file-like object
+        # directly read the file-like object
         if isinstance(self.filename_or_stream, str):
-            with open(self.filename_or_stream) as cali_json:
-                json_obj = json.load(cali_json)
+            with open(self.filename_or_stream, "rb") as cali_json:
+                json_obj = self.read_json_stream(cali_json)
         else:
-            json_obj = json.loads(self.filename_or_stream.read().decode("utf-8"))
+            json_obj = self.read_json_stream(self.filename_or_stream)
 
         # read various sections of the Caliper JSON file
-        self.json_data = json_obj["data"]
         self.json_cols = json_obj["columns"]
         self.json_cols_mdata = json_obj["column_metadata"]
         self.json_nodes = json_obj["nodes"]
 
+        # the data section has one list per column
+        self.json_data = pd.DataFrame(
+            {idx: column for idx, column in enumerate(json_obj["data"])},
+            columns=range(len(self.json_cols)),
+        )
+
         # read run metadata: all top-level elements in the json object that aren't
         # one of the above sections are run metadata
         skip = ["data", "columns", "column_metadata", "nodes"]
@@ -88,34 +93,19 @@ class CaliperReader:
         self.metadata = {k: json_obj[k] for k in keys}
 
         # decide which column to use as the primary path hierarchy
-        # first preference to callpath if available
-        if "source.function#callpath.address" in self.json_cols:
-            self.path_col_name = "source.function#callpath.address"
+        self.path_col_name = self.path_column(self.json_cols)
+        if self.path_col_name == "source.function#callpath.address":
             self.node_type = "function"
             if "path" in self.json_cols:
                 self.both_hierarchies = True
             else:
                 self.both_hierarchies = False
-        elif "path" in self.json_cols:
-            self.path_col_name = "path"
+        elif self.path_col_name == "path":
             self.node_type = "region"
             self.both_hierarchies = False
         else:
             sys.exit("No hierarchy column in input file")
 
-        # remove data entries containing None in `path` column (null in json file)
-        # first, get column where `path` data is
-        # then, parse json_data list of lists to identify lists containing None in
-        # `path` column
-        path_col = self.json_cols.index(self.path_col_name)
-        entries_to_remove = []
-        for sublist in self.json_data:
-            if sublist[path_col] is None:
-                entries_to_remove.append(sublist)
-        # then, remove them from the json_data list
-        for i in entries_to_remove:
-            self.json_data.remove(i)
-
         # change column names
         for idx, item in enumerate(self.json_cols):
             if item == self.path_col_name:
@@ -140,6 +130,73 @@ class CaliperReader:
             if self.json_cols[idx] != "rank" and item["is_value"] is True:
                 self.metric_columns.append(self.json_cols[idx])
 
+    @staticmethod
+    def path_column(columns):
+        """Name of the column of the primary path hierarchy, or None.
+
+        Args:
+            columns (list): the columns section of the split JSON
+        """
+        # first preference to callpath if available
+        if "source.function#callpath.address" in columns:
+            return "source.function#callpath.address"
+        elif "path" in columns:
+            return "path"
+        return None
+
+    def read_json_stream(self, stream):
+        """Read the sections of a split JSON document from a stream.
+
+        The rows of the data section are appended to one list per column as
+        they are parsed. The entries containing None in the `path` column
+        (null in json file) are dropped as they are read if the columns
+        section comes first, or once all the rows are read otherwise.
+
+        Args:
+            stream (file-like): stream of the split JSON document
+
+        Returns:
+            (dict): the sections of the document, with the data section as
+                one list per column
+        """
+        json_obj = {}
+        data = None
+        filtered = False
+        for key, value in JSONStream(stream).items():
+            if key != "data":
+                json_obj[key] = value
+                continue
+
+            path_col = None
+            if "columns" in json_obj:
+                path_name = self.path_column(json_obj["columns"])
+                if path_name is not None:
+                    path_col = json_obj["columns"].index(path_name)
+                    filtered = True
+            for row in value:
+                if data is None:
+                    data = [[] for _ in row]
+                if path_col is not None and row[path_col] is None:
+                    continue
+                for column, item in zip(data, row):
+                    column.append(item)
+
+        columns = json_obj.get("columns", [])
+        path_name = self.path_column(columns)
+        if data is None:
+            data = [[] for _ in columns]
+        elif not filtered and path_name is not None:
+            keep = np.array(
+                [item is not None for item in data[columns.index(path_name)]],
+                dtype=bool,
+            )
+            if not keep.all():
+                data = [
+                    np.array(column, dtype=object)[keep].tolist() for column in data
+                ]
+        json_obj["data"] = data
+        return json_obj
+
     def create_graph(self):
         list_roots = []
 
@@ -158,7 +215,7 @@ class CaliperReader:
                 # If there is a node orderering, assign to the _hatchet_nid
                 if "Node order" in self.json_cols:
                     self.node_ordering = True
-                    order = self.json_data[idx][0]
+                    order = self.json_data.iat[idx, 0]
                 if "parent" not in node:
                     # since this node does not have a parent, this is a root
                     graph_root = Node(
@@ -198,7 +255,7 @@ class CaliperReader:
             list_roots = self.create_graph()
 
         # create a dataframe of metrics from the data section
-        self.df_json_data = pd.DataFrame(self.json_data, columns=self.json_cols)
+        self.df_json_data = self.json_data.set_axis(self.json_cols, axis=1)
 
         # when an nid has multiple entries due to the secondary hierarchy
         # we need to aggregate them for each (nid, rank)
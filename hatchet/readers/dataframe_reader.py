@@ -3,7 +3,11 @@
 #
 # SPDX-License-Identifier: MIT
 
+import numpy as np
+import pandas as pd
+
 import hatchet.graphframe
+from hatchet.csr_graph import CSRGraph
 from hatchet.node import Node
 from hatchet.graph import Graph
 
@@ -57,6 +61,54 @@ def _reconstruct_graph(df, rel_dict):
     return Graph(roots)
 
 
+def _restore_child_order(csr, order):
+    """Reorder the children lists of the nodes of ``csr`` to match ``order``.
+
+    Arguments:
+        csr (CSRGraph): graph with materialized nodes
+        order (numpy.ndarray): position of every child link of ``csr`` in its
+            parent's children list
+    """
+    counts = np.diff(csr.child_offsets)
+    in_traversal_order = np.arange(len(order)) - np.repeat(
+        csr.child_offsets[:-1], counts
+    )
+    nodes = csr.nodes
+    for i in np.unique(csr.edges()[0][order != in_traversal_order]).tolist():
+        start, end = csr.child_offsets[i], csr.child_offsets[i + 1]
+        children = [None] * (end - start)
+        for child, k in zip(
+            csr.child_indices[start:end].tolist(), order[start:end].tolist()
+        ):
+            children[k] = nodes[child]
+        nodes[i].children = children
+    # the arrays keep listing children in traversal order
+    csr.mark_current()
+
+
+def _graph_from_arrays(arrays):
+    """Rebuild a graph stored by DataframeWriter in one pass over its arrays.
+
+    Return:
+        (Graph, numpy.ndarray): the graph, and its nodes by position
+    """
+    csr = CSRGraph.from_edges(
+        arrays["parents"],
+        arrays["children"],
+        arrays["frame_ids"],
+        arrays["frames"],
+        arrays["depth"],
+        arrays["roots"],
+        arrays["nids"],
+        # not stored by older versions
+        arrays.get("parent_links"),
+    )
+    _restore_child_order(csr, arrays["order"])
+    nodes = np.empty(len(csr), dtype=object)
+    nodes[:] = csr.nodes
+    return Graph.from_csr(csr), nodes
+
+
 class DataframeReader(ABC):
     """Abstract Base Class for reading in checkpointing files."""
 
@@ -69,20 +121,27 @@ class DataframeReader(ABC):
 
     def read(self, **kwargs):
         df = self._read_dataframe_from_file(**kwargs)
-        rel_dict = _get_parents_and_children(df)
-        graph = _reconstruct_graph(df, rel_dict)
-        graph.enumerate_traverse()
+        if "graph" in df.columns:
+            graph, nodes = _graph_from_arrays(df.iat[0, df.columns.get_loc("graph")])
+            if isinstance(df.index, pd.MultiIndex):
+                level = df.index.names.index("node")
+                df.index = df.index.set_levels(
+                    nodes[df.index.levels[level].to_numpy()], level=level
+                )
+            else:
+                df.index = pd.Index(nodes[df.index.to_numpy()], name="node")
+            stored_columns = ["graph"]
+        else:
+            # checkpoints written before the graph was stored as arrays
+            rel_dict = _get_parents_and_children(df)
+            graph = _reconstruct_graph(df, rel_dict)
+            graph.enumerate_traverse()
+            stored_columns = ["children", "parents"]
         exc_metrics = df.iloc[0, df.columns.get_loc("exc_metrics")]
         inc_metrics = df.iloc[0, df.columns.get_loc("inc_metrics")]
         default_metric = df.iloc[0, df.columns.get_loc("default_metric")]
         df.drop(
-            columns=[
-                "children",
-                "parents",
-                "exc_metrics",
-                "inc_metrics",
-                "default_metric",
-            ],
+            columns=stored_columns + ["exc_metrics", "inc_metrics", "default_metric"],
             inplace=True,
         )
         return hatchet.graphframe.GraphFrame(
@@ -7,7 +7,7 @@ import glob
 import struct
 import re
 import os
-import traceback
+from array import array
 
 import numpy as np
 import pandas as pd
@@ -19,18 +19,6 @@ try:
 except ImportError:
     import xml.etree.ElementTree as ET
 
-# cython imports
-try:
-    import hatchet.cython_modules.libs.reader_modules as _crm
-except ImportError:
-    print("-" * 80)
-    print(
-        """Error: Shared object (.so) not found for cython module.\n\tPlease run install.sh from the hatchet root directory to build modules."""
-    )
-    print("-" * 80)
-    traceback.print_exc()
-    raise
-
 
 import hatchet.graphframe
 from hatchet.node import Node
@@ -39,53 +27,53 @@ from hatchet.util.timer import Timer
 from hatchet.frame import Frame
 
 
-src_file = 0
-
-
 def init_shared_array(buf_):
     """Initialize shared array."""
     global shared_metrics
     shared_metrics = buf_
 
 
+def metricdb_rank_thread(filename):
+    """MPI rank and thread id of a metric-db file, from its name."""
+    match = re.search(r"\-(\d+)\-(\d+)\-([\w\d]+)\-(\d+)\-\d.metric-db$", filename)
+    return int(match.group(1)), int(match.group(2))
+
+
 def read_metricdb_file(args):
-    """Read a single metricdb file into a 1D array."""
+    """Copy the selected metrics of a single metricdb file into its block of
+    rows of the shared 2D array.
+
+    The file is memory-mapped, so only the data that is copied is read.
+    """
     (
         filename,
         num_nodes,
-        num_threads_per_rank,
-        num_cpu_threads_per_rank,
         num_metrics,
+        metric_indices,
+        block,
+        rank,
+        thread,
         shape,
     ) = args
-    rank = int(
-        re.search(r"\-(\d+)\-(\d+)\-([\w\d]+)\-(\d+)\-\d.metric-db$", filename).group(1)
-    )
-    thread = int(
-        re.search(r"\-(\d+)\-(\d+)\-([\w\d]+)\-(\d+)\-\d.metric-db$", filename).group(2)
-    )
 
-    with open(filename, "rb") as metricdb:
-        metricdb.seek(32)
-        arr1d = np.fromfile(
-            metricdb, dtype=np.dtype(">f8"), count=num_nodes * num_metrics
-        )
+    metricdb = np.memmap(
+        filename,
+        dtype=np.dtype(">f8"),
+        mode="r",
+        offset=32,
+        shape=(num_nodes, num_metrics),
+    )
 
     arr = np.frombuffer(shared_metrics).reshape(shape)
 
     # copy the data in the right place in the larger 2D array of metrics
-    if thread < 500:
-        rank_offset = (rank * num_threads_per_rank + thread) * num_nodes
-    else:
-        # GPU streams in hpctoolkit 2021.05.15 start at thread id 500
-        rank_offset = (
-            rank * num_threads_per_rank + num_cpu_threads_per_rank + (thread - 500)
-        ) * num_nodes
-
-    arr[rank_offset : rank_offset + num_nodes, :num_metrics].flat = arr1d.flat
-    arr[rank_offset : rank_offset + num_nodes, num_metrics] = range(1, num_nodes + 1)
-    arr[rank_offset : rank_offset + num_nodes, num_metrics + 1] = rank
-    arr[rank_offset : rank_offset + num_nodes, num_metrics + 2] = thread
+    rows = slice(block * num_nodes, (block + 1) * num_nodes)
+    num_selected = len(metric_indices)
+    arr[rows, :num_selected] = metricdb[:, metric_indices]
+    arr[rows, num_selected] = np.arange(1, num_nodes + 1)
+    arr[rows, num_selected + 1] = rank
+    arr[rows, num_selected + 2] = thread
+    del metricdb
 
 
 class HPCToolkitReader:
@@ -93,17 +81,28 @@ class HPCToolkitReader:
     metric-db files.
     """
 
-    def __init__(self, dir_name):
+    def __init__(self, dir_name, ranks=None, threads=None, metrics=None):
+        """Create a reader for an HPCToolkit database directory.
+
+        Arguments:
+            dir_name (str): the database directory, which contains an
+                experiment.xml file and some metric-db files
+            ranks (list, optional): MPI ranks to read (default: all)
+            threads (list, optional): thread ids to read (default: all)
+            metrics (list, optional): names of the metrics to read, either as
+                listed in experiment.xml or as renamed by hatchet (e.g.,
+                "time" and "time (inc)") (default: all)
+        """
         # this is the name of the HPCToolkit database directory. The directory
         # contains an experiment.xml and some metric-db files
         self.dir_name = dir_name
+        self.ranks = ranks
+        self.threads = threads
+        self.metrics_filter = metrics
 
-        root = ET.parse(self.dir_name + "/experiment.xml").getroot()
-        self.loadmodule_table = next(root.iter("LoadModuleTable"))
-        self.file_table = next(root.iter("FileTable"))
-        self.procedure_table = next(root.iter("ProcedureTable"))
-        self.metricdb_table = next(root.iter("MetricDBTable"))
-        self.callpath_profile = next(root.iter("SecCallPathProfileData"))
+        # experiment.xml is parsed incrementally, since it can be much larger
+        # than the graph that is built from it
+        self.xml_filename = self.dir_name + "/experiment.xml"
 
         # For a parallel run, there should be one metric-db file per MPI
         # process
@@ -141,28 +140,50 @@ class HPCToolkitReader:
         self.procedure_names = {}
         self.metric_names = {}
 
-        # this list of dicts will hold all the node information such as
-        # procedure name, load module, filename, etc. for all the nodes
-        self.node_dicts = []
+        # these columns hold all the node information such as procedure
+        # name, load module, filename, etc. for all the nodes
+        self.node_columns = {
+            "nid": array("q"),
+            "name": [],
+            "type": [],
+            "file": [],
+            "line": array("q"),
+            "module": [],
+            "node": [],
+        }
+
+        # node ids of the statement nodes and of their parents, whose
+        # exclusive metric values are adjusted after parsing
+        self.statement_nids = array("q")
+        self.statement_parent_nids = array("q")
 
         self.timer = Timer()
 
     def fill_tables(self):
         """Read certain sections of the experiment.xml file to create dicts of load
         modules, src_files, procedure_names, and metric_names.
-        """
-        for loadm in (self.loadmodule_table).iter("LoadModule"):
-            self.load_modules[loadm.get("i")] = loadm.get("n")
-
-        for filename in (self.file_table).iter("File"):
-            self.src_files[filename.get("i")] = filename.get("n")
 
-        for procedure in (self.procedure_table).iter("Procedure"):
-            self.procedure_names[procedure.get("i")] = procedure.get("n")
-
-        # store the keys as ints because we sort on keys later
-        for metric in (self.metricdb_table).iter("MetricDB"):
-            self.metric_names[int(metric.get("i"))] = metric.get("n")
+        Only the header of the file is parsed: parsing stops where the calling
+        context tree starts.
+        """
+        tables = {
+            "LoadModule": self.load_modules,
+            "File": self.src_files,
+            "Procedure": self.procedure_names,
+        }
+        with open(self.xml_filename, "rb") as xml_file:
+            for event, elem in ET.iterparse(xml_file, events=("start", "end")):
+                if event == "start":
+                    if elem.tag == "SecCallPathProfileData":
+                        break
+                    continue
+
+                if elem.tag in tables:
+                    tables[elem.tag][elem.get("i")] = elem.get("n")
+                elif elem.tag == "MetricDB":
+                    # store the keys as ints because we sort on keys later
+                    self.metric_names[int(elem.get("i"))] = elem.get("n")
+                elem.clear()
 
         return (
             self.load_modules,
@@ -172,51 +193,99 @@ class HPCToolkitReader:
         )
 
     def read_all_metricdb_files(self):
-        """Read all the metric-db files and create a dataframe with num_nodes X
+        """Read the metric-db files and create a dataframe with num_nodes X
         num_metricdb_files rows and num_metrics columns. Three additional columns
         store the node id, MPI process rank, and thread id (if applicable).
+
+        Only the files of the selected ranks and threads, and the columns of
+        the selected metrics, are read; the files are memory-mapped, so the
+        rest of the data is never loaded.
         """
-        metricdb_files = glob.glob(self.dir_name + "/*.metric-db")
+        metricdb_files = []
+        for filename in sorted(glob.glob(self.dir_name + "/*.metric-db")):
+            rank, thread = metricdb_rank_thread(filename)
+            if self.ranks is not None and rank not in self.ranks:
+                continue
+            if self.threads is not None and thread not in self.threads:
+                continue
+            if thread < 500:
+                position = rank * self.num_threads_per_rank + thread
+            else:
+                # GPU streams in hpctoolkit 2021.05.15 start at thread id 500
+                position = (
+                    rank * self.num_threads_per_rank
+                    + self.num_cpu_threads_per_rank
+                    + (thread - 500)
+                )
+            metricdb_files.append((position, filename, rank, thread))
+        if not metricdb_files:
+            raise ValueError(
+                "No metric-db files in %s match the selected ranks and threads"
+                % self.dir_name
+            )
         metricdb_files.sort()
 
-        # All the metric data per node and per process is read into the metrics
-        # array below. The three additional columns are for storing the implicit
-        # node id (nid), MPI process rank, and thread id (if applicable).
-        shape = [self.num_nodes * self.num_metricdb_files, self.num_metrics + 3]
+        metric_names = [
+            self.metric_names[key] for key in sorted(self.metric_names.keys())
+        ]
+        for idx, name in enumerate(metric_names):
+            if name == "CPUTIME (usec) (E)" or name == "CPUTIME (sec) (E)":
+                metric_names[idx] = "time"
+            if name == "CPUTIME (usec) (I)" or name == "CPUTIME (sec) (I)":
+                metric_names[idx] = "time (inc)"
+
+        metric_indices = list(range(len(metric_names)))
+        if self.metrics_filter is not None:
+            raw_names = [
+                self.metric_names[key] for key in sorted(self.metric_names.keys())
+            ]
+            metric_indices = [
+                i
+                for i in metric_indices
+                if metric_names[i] in self.metrics_filter
+                or raw_names[i] in self.metrics_filter
+            ]
+            unknown = set(self.metrics_filter) - set(metric_names) - set(raw_names)
+            if unknown:
+                raise ValueError(
+                    "Unknown metrics %s; the database has metrics %s"
+                    % (sorted(unknown), metric_names)
+                )
+
+        # All the selected metric data per node and per process is read into
+        # the metrics array below. The three additional columns are for
+        # storing the implicit node id (nid), MPI process rank, and thread id
+        # (if applicable).
+        shape = [self.num_nodes * len(metricdb_files), len(metric_indices) + 3]
         size = int(np.prod(shape))
 
         # shared memory buffer for multiprocessing
         shared_buffer = mp.sharedctypes.RawArray("d", size)
 
-        pool = mp.Pool(initializer=init_shared_array, initargs=(shared_buffer,))
         self.metrics = np.frombuffer(shared_buffer).reshape(shape)
         args = [
             (
                 filename,
                 self.num_nodes,
-                self.num_threads_per_rank,
-                self.num_cpu_threads_per_rank,
                 self.num_metrics,
+                metric_indices,
+                block,
+                rank,
+                thread,
                 shape,
             )
-            for filename in metricdb_files
+            for block, (_, filename, rank, thread) in enumerate(metricdb_files)
         ]
-        try:
+        # the workers receive the shared buffer when they start, so they
+        # cannot come from the shared executor; they are stopped and waited
+        # for before returning, even if reading fails
+        with mp.Pool(initializer=init_shared_array, initargs=(shared_buffer,)) as pool:
             pool.map(read_metricdb_file, args)
-        finally:
             pool.close()
+            pool.join()
 
         # once all files have been read, create a dataframe of metrics
-        metric_names = [
-            self.metric_names[key] for key in sorted(self.metric_names.keys())
-        ]
-        for idx, name in enumerate(metric_names):
-            if name == "CPUTIME (usec) (E)" or name == "CPUTIME (sec) (E)":
-                metric_names[idx] = "time"
-            if name == "CPUTIME (usec) (I)" or name == "CPUTIME (sec) (I)":
-                metric_names[idx] = "time (inc)"
-
-        self.metric_columns = metric_names
+        self.metric_columns = [metric_names[i] for i in metric_indices]
         df_columns = self.metric_columns + ["nid", "rank", "thread"]
         self.df_metrics = pd.DataFrame(self.metrics, columns=df_columns)
         self.df_metrics["nid"] = self.df_metrics["nid"].astype(int, copy=False)
@@ -227,12 +296,9 @@ class HPCToolkitReader:
         if self.num_threads_per_rank == 1:
             del self.df_metrics["thread"]
 
-        # used to speedup parse_xml_node
-        self.np_metrics = self.df_metrics[self.metric_columns].values
-
-        # getting the number of execution threads for our stride in
-        # subtract_exclusive_metric_vals/ num nodes is already calculated
-        self.total_execution_threads = self.num_threads_per_rank * self.num_ranks
+        # number of blocks of num_nodes rows in the metrics array, used by
+        # subtract_statement_metrics
+        self.total_execution_threads = len(metricdb_files)
 
     def read(self):
         """Read the experiment.xml file to extract the calling context tree and create
@@ -248,51 +314,24 @@ class HPCToolkitReader:
         with self.timer.phase("read metric db"):
             self.read_all_metricdb_files()
 
-        list_roots = []
-
-        # parse the ElementTree to generate a calling context tree
-        for root in self.callpath_profile.findall("PF"):
-            global src_file
-
-            nid = int(root.get("i"))
-            src_file = root.get("f")
-
-            # start with the root and create the callpath and node for the root
-            # also a corresponding node_dict to be inserted into the dataframe
-            graph_root = Node(
-                Frame(
-                    {"type": "function", "name": self.procedure_names[root.get("n")]}
-                ),
-                None,
-            )
-            node_dict = self.create_node_dict(
-                nid,
-                graph_root,
-                self.procedure_names[root.get("n")],
-                "PF",
-                self.src_files[src_file],
-                int(root.get("l")),
-                self.load_modules[root.get("lm")],
-            )
-
-            self.node_dicts.append(node_dict)
-            list_roots.append(graph_root)
-
-            # start graph construction at the root
-            with self.timer.phase("graph construction"):
-                self.parse_xml_children(root, graph_root)
+        # stream the calling context tree out of experiment.xml
+        with self.timer.phase("graph construction"):
+            list_roots = self.parse_callpath_profile()
 
-            # put updated metrics back in dataframe
-            for i, column in enumerate(self.metric_columns):
-                if "(inc)" not in column and "(I)" not in column:
-                    self.df_metrics[column] = self.np_metrics.T[i]
+        with self.timer.phase("subtract statement metrics"):
+            self.subtract_statement_metrics()
 
         with self.timer.phase("graph construction"):
             graph = Graph(list_roots)
             graph.enumerate_traverse()
 
         # create a dataframe for all the nodes in the graph
-        self.df_nodes = pd.DataFrame.from_dict(data=self.node_dicts)
+        self.df_nodes = pd.DataFrame(
+            {
+                key: np.array(values) if isinstance(values, array) else values
+                for key, values in self.node_columns.items()
+            }
+        )
 
         # merge the metrics and node dataframes
         with self.timer.phase("data frame"):
@@ -318,126 +357,197 @@ class HPCToolkitReader:
 
         return hatchet.graphframe.GraphFrame(graph, dataframe, exc_metrics, inc_metrics)
 
-    def parse_xml_children(self, xml_node, hnode):
-        """Parses all children of an XML node."""
-        for xml_child in xml_node:
-            if xml_child.tag != "M":
-                nid = int(xml_node.get("i"))
-                line = int(xml_node.get("l"))
-                self.parse_xml_node(xml_child, nid, line, hnode)
-
-    def parse_xml_node(self, xml_node, parent_nid, parent_line, hparent):
-        """Parses an XML node and its children recursively."""
-        nid = int(xml_node.get("i"))
-
-        global src_file
-        xml_tag = xml_node.tag
-
-        if xml_tag == "PF" or xml_tag == "Pr":
-            # procedure
-            name = self.procedure_names[xml_node.get("n")]
-            if parent_line != 0:
-                name = str(parent_line) + ":" + name
-            src_file = xml_node.get("f")
-            line = int(xml_node.get("l"))
-
-            hnode = Node(Frame({"type": "function", "name": name}), hparent)
-            node_dict = self.create_node_dict(
-                nid,
-                hnode,
-                name,
-                xml_tag,
-                self.src_files[src_file],
-                line,
-                self.load_modules[xml_node.get("lm")],
-            )
+    def parse_callpath_profile(self):
+        """Build the calling context tree while streaming experiment.xml.
 
-        elif xml_tag == "L":
-            # loop
-            src_file = xml_node.get("f")
-            line = int(xml_node.get("l"))
-            name = (
-                "Loop@" + os.path.basename(self.src_files[src_file]) + ":" + str(line)
-            )
-
-            hnode = Node(
-                Frame({"type": "loop", "file": self.src_files[src_file], "line": line}),
-                hparent,
-            )
-            node_dict = self.create_node_dict(
-                nid, hnode, name, xml_tag, self.src_files[src_file], line, None
-            )
+        Elements are handled as soon as they start, using an explicit stack
+        of open elements instead of recursion, and are cleared when they end,
+        so memory use is bounded by the depth of the tree rather than the
+        size of the file.
 
-        elif xml_tag == "S":
-            # statement
-            line = int(xml_node.get("l"))
-            # this might not be required for resolving conflicts
-            name = os.path.basename(self.src_files[src_file]) + ":" + str(line)
-
-            hnode = Node(
-                Frame(
-                    {
-                        "type": "statement",
-                        "file": self.src_files[src_file],
-                        "line": line,
-                    }
-                ),
-                hparent,
-            )
-            node_dict = self.create_node_dict(
-                nid, hnode, name, xml_tag, self.src_files[src_file], line, None
-            )
+        Return:
+            (list): the root nodes of the graph
+        """
+        list_roots = []
 
-            # when we reach statement nodes, we subtract their exclusive
-            # metric values from the parent's values
-            for i, column in enumerate(self.metric_columns):
-                if "(inc)" not in column and "(I)" not in column:
-                    _crm.subtract_exclusive_metric_vals(
+        # for each open element: its nid and line, which its children need,
+        # and the node that its children are attached to (or None if its
+        # subtree is skipped)
+        stack = []
+        xml_stack = []
+        profile_data = None
+        src_file = None
+
+        with open(self.xml_filename, "rb") as xml_file:
+            for event, elem in ET.iterparse(xml_file, events=("start", "end")):
+                xml_tag = elem.tag
+                if profile_data is None:
+                    if xml_tag == "SecCallPathProfileData" and event == "start":
+                        profile_data = elem
+                    elif event == "end":
+                        elem.clear()
+                    continue
+
+                if event == "end":
+                    if elem is profile_data:
+                        break
+                    stack.pop()
+                    xml_stack.pop()
+                    # drop the element, and the parent's reference to it
+                    elem.clear()
+                    (xml_stack[-1] if xml_stack else profile_data).clear()
+                    continue
+
+                xml_stack.append(elem)
+                parent = stack[-1] if stack else None
+                if xml_tag == "M" or (stack and parent is None):
+                    stack.append(None)
+                    continue
+
+                nid = int(elem.get("i"))
+                if not stack:
+                    # only PF elements are roots of the calling context tree
+                    if xml_tag != "PF":
+                        stack.append(None)
+                        continue
+                    src_file = elem.get("f")
+                    line = int(elem.get("l"))
+                    name = self.procedure_names[elem.get("n")]
+                    graph_root = Node(Frame({"type": "function", "name": name}), None)
+                    self.append_node_row(
                         nid,
-                        parent_nid,
-                        self.np_metrics.T[i],
-                        self.total_execution_threads,
-                        self.num_nodes,
+                        graph_root,
+                        name,
+                        xml_tag,
+                        self.src_files[src_file],
+                        line,
+                        self.load_modules[elem.get("lm")],
+                    )
+                    list_roots.append(graph_root)
+                    stack.append((nid, line, graph_root))
+                    continue
+
+                parent_nid, parent_line, hparent = parent
+                line = int(elem.get("l"))
+
+                if xml_tag == "PF" or xml_tag == "Pr":
+                    # procedure
+                    procedure = self.procedure_names[elem.get("n")]
+                    src_file = elem.get("f")
+                    if xml_tag == "Pr" and procedure == "":
+                        # do not add procedures with no name to the graph;
+                        # the preceding Pr has the calling line number
+                        stack.append((nid, line, hparent))
+                        continue
+                    name = procedure
+                    if parent_line != 0:
+                        name = str(parent_line) + ":" + name
+                    frame = Frame({"type": "function", "name": name})
+                    module = self.load_modules[elem.get("lm")]
+
+                elif xml_tag == "L":
+                    # loop
+                    src_file = elem.get("f")
+                    name = (
+                        "Loop@"
+                        + os.path.basename(self.src_files[src_file])
+                        + ":"
+                        + str(line)
+                    )
+                    frame = Frame(
+                        {"type": "loop", "file": self.src_files[src_file], "line": line}
                     )
+                    module = None
+
+                elif xml_tag == "S":
+                    # statement
+                    # this might not be required for resolving conflicts
+                    name = os.path.basename(self.src_files[src_file]) + ":" + str(line)
+                    frame = Frame(
+                        {
+                            "type": "statement",
+                            "file": self.src_files[src_file],
+                            "line": line,
+                        }
+                    )
+                    module = None
+
+                    # the exclusive metric values of statement nodes are
+                    # subtracted from the parent's values after parsing
+                    self.statement_nids.append(nid)
+                    self.statement_parent_nids.append(parent_nid)
+
+                elif xml_tag == "C":
+                    # do not add callsites to the graph; for PFs, the
+                    # preceding C has the calling line number
+                    stack.append((nid, line, hparent))
+                    continue
+
+                else:
+                    stack.append(None)
+                    continue
+
+                hnode = Node(frame, hparent)
+                hparent.add_child(hnode)
+                self.append_node_row(
+                    nid,
+                    hnode,
+                    name,
+                    xml_tag,
+                    self.src_files[src_file],
+                    line,
+                    module,
+                )
+                stack.append((nid, line, hnode))
 
-        if xml_tag == "C" or (
-            xml_tag == "Pr" and self.procedure_names[xml_node.get("n")] == ""
-        ):
-            # do not add a node to the graph if the xml_tag is a callsite
-            # or if its a procedure with no name
-            # for Prs, the preceding Pr has the calling line number and for
-            # PFs, the preceding C has the line number
-            line = int(xml_node.get("l"))
-            self.parse_xml_children(xml_node, hparent)
-        else:
-            self.node_dicts.append(node_dict)
-            hparent.add_child(hnode)
-            self.parse_xml_children(xml_node, hnode)
-
-    def create_node_dict(self, nid, hnode, name, node_type, src_file, line, module):
-        """Create a dict with all the node attributes."""
-        node_dict = {
-            "nid": nid,
-            "name": name,
-            "type": node_type,
-            "file": src_file,
-            "line": line,
-            "module": module,
-            "node": hnode,
-        }
+        return list_roots
 
-        return node_dict
+    def subtract_statement_metrics(self):
+        """Subtract the exclusive metric values of statement nodes from the
+        values of their parents.
+
+        This is done for all ranks, threads and exclusive metrics at once.
+        The subtractions are applied in the order in which the statements
+        appear in experiment.xml, so the results do not depend on the
+        floating-point summation order.
+        """
+        exc_columns = [
+            column
+            for column in self.metric_columns
+            if "(inc)" not in column and "(I)" not in column
+        ]
+        if not exc_columns or not self.statement_nids:
+            return
+
+        # row of each (statement, block) pair in the metrics array; blocks of
+        # num_nodes rows hold the values of each rank and thread
+        offsets = np.arange(self.total_execution_threads) * self.num_nodes
+        nids = np.frombuffer(self.statement_nids, dtype=np.int64) - 1
+        parent_nids = np.frombuffer(self.statement_parent_nids, dtype=np.int64) - 1
+        rows = (nids[:, None] + offsets).ravel()
+        parent_rows = (parent_nids[:, None] + offsets).ravel()
+
+        values = self.df_metrics[exc_columns].to_numpy(copy=True)
+        np.subtract.at(values, parent_rows, values[rows])
+        self.df_metrics[exc_columns] = values
+
+    def append_node_row(self, nid, hnode, name, node_type, src_file, line, module):
+        """Append the attributes of a node to the node columns."""
+        columns = self.node_columns
+        columns["nid"].append(nid)
+        columns["name"].append(name)
+        columns["type"].append(node_type)
+        columns["file"].append(src_file)
+        columns["line"].append(line)
+        columns["module"].append(module)
+        columns["node"].append(hnode)
 
     def count_cpu_threads_per_rank(self):
         metricdb_files = glob.glob(self.dir_name + "/*.metric-db")
         cpu_thread_ids = set()
 
         for filename in metricdb_files:
-            thread = int(
-                re.search(
-                    r"\-(\d+)\-(\d+)\-([\w\d]+)\-(\d+)\-\d.metric-db$", filename
-                ).group(2)
-            )
+            _, thread = metricdb_rank_thread(filename)
             if thread < 500:
                 cpu_thread_ids.add(thread)
 
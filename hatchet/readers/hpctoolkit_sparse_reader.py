@@ -0,0 +1,489 @@
+# Copyright 2017-2023 Lawrence Livermore National Security, LLC and other
+# Hatchet Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import mmap
+import os
+import struct
+
+import numpy as np
+import pandas as pd
+
+import hatchet.graphframe
+from hatchet.node import Node
+from hatchet.graph import Graph
+from hatchet.util.timer import Timer
+from hatchet.frame import Frame
+
+
+# layout of the (packed, little-endian) records of the sparse value blocks
+# of profile.db: the metric values of a profile, and the index of the first
+# value of each calling context
+value_dtype = np.dtype([("metric", "<u2"), ("value", "<f8")])
+ctx_index_dtype = np.dtype([("ctx", "<u4"), ("start", "<u8")])
+
+# types of the propagation scopes of a metric: "point" values are the values
+# of a context itself, "execution" values include all the descendants of the
+# context, and "function" values include its lexical (non-call) descendants
+point_scope = 1
+execution_scope = 2
+
+# lexical types of the contexts of meta.db
+context_types = ["function", "loop", "line", "instruction"]
+
+
+def check_header(buf, format_id, filename):
+    """Check the format identifier and version of a database file.
+
+    Arguments:
+        buf (mmap.mmap): contents of the file
+        format_id (bytes): "meta", "prof" or "ctxt"
+        filename (str): name of the file, for error messages
+    """
+    if buf[:10] != b"HPCTOOLKIT" or buf[10:14] != format_id:
+        raise ValueError("%s is not an HPCToolkit database file" % filename)
+    if buf[14] != 4:
+        raise ValueError(
+            "%s has an unsupported format version %d.%d" % (filename, buf[14], buf[15])
+        )
+
+
+def read_string(buf, offset, cache):
+    """Read the null-terminated string at an offset of meta.db."""
+    if offset not in cache:
+        cache[offset] = buf[offset : buf.find(b"\0", offset)].decode("utf-8")
+    return cache[offset]
+
+
+class HPCToolkitSparseReader:
+    """Read an HPCToolkit database in the sparse format of HPCToolkit 2022 and
+    later, which has a meta.db, a profile.db and a cct.db file.
+
+    meta.db describes the calling context tree and the metrics, and
+    profile.db stores the non-zero metric values of each profile (i.e., of
+    each rank, thread or GPU stream). cct.db stores the same values ordered by
+    context instead of by profile, so it is not needed here.
+
+    The dataframe only has rows for the (node, profile) pairs that have a
+    non-zero value, plus rows of zeros for the nodes without a value in the
+    profile of the lowest rank and thread, so that every node of the graph
+    is in the dataframe.
+    """
+
+    def __init__(self, dir_name, ranks=None, threads=None, metrics=None):
+        """Create a reader for a sparse HPCToolkit database directory.
+
+        Arguments:
+            dir_name (str): the database directory, which contains the
+                meta.db and profile.db files
+            ranks (list, optional): MPI ranks to read (default: all)
+            threads (list, optional): thread ids to read (default: all);
+                GPU streams are numbered from 500, as in HPCToolkit's older
+                database format
+            metrics (list, optional): names of the metrics to read, either as
+                listed in meta.db or as renamed by hatchet (e.g., "time" and
+                "time (inc)") (default: all)
+        """
+        self.dir_name = dir_name
+        self.meta_filename = os.path.join(dir_name, "meta.db")
+        self.profile_filename = os.path.join(dir_name, "profile.db")
+        self.ranks = ranks
+        self.threads = threads
+        self.metrics_filter = metrics
+
+        # maps the metric ids of profile.db to the metric columns
+        self.metric_columns = []
+        self.metric_ids = {}
+        self.exc_metrics = []
+        self.inc_metrics = []
+
+        # these columns hold all the node information such as procedure
+        # name, load module, filename, etc. for all the nodes
+        self.node_columns = {
+            "nid": [],
+            "name": [],
+            "type": [],
+            "file": [],
+            "line": [],
+            "module": [],
+            "node": [],
+        }
+        self.kind_names = []
+
+        self.timer = Timer()
+
+    def read_meta_db(self):
+        """Read the metric descriptions and the calling context tree from
+        meta.db.
+
+        Returns:
+            (list): the roots of the calling context tree
+        """
+        with open(self.meta_filename, "rb") as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                check_header(buf, b"meta", self.meta_filename)
+                # the header has the size and pointer of each section
+                sections = struct.unpack_from("<16Q", buf, 16)
+                p_id_names, p_metrics, p_context = sections[3], sections[5], sections[7]
+                strings = {}
+
+                pp_names, num_kinds = struct.unpack_from("<QB", buf, p_id_names)
+                self.kind_names = [
+                    read_string(buf, p, strings)
+                    for p in struct.unpack_from("<%dQ" % num_kinds, buf, pp_names)
+                ]
+
+                self.read_metrics(buf, p_metrics, strings)
+                return self.read_context_tree(buf, p_context, strings)
+
+    def read_metrics(self, buf, p_metrics, strings):
+        """Create a column for the point and execution scopes of each metric
+        (i.e., its exclusive and inclusive values)."""
+        (
+            p_descriptions,
+            num_metrics,
+            sz_metric,
+            sz_scope_inst,
+        ) = struct.unpack_from("<QIBB", buf, p_metrics)
+
+        selected = self.metrics_filter
+        available = set()
+        for i in range(num_metrics):
+            p_name, p_scope_insts, _, num_scope_insts = struct.unpack_from(
+                "<QQQH", buf, p_descriptions + i * sz_metric
+            )
+            metric = read_string(buf, p_name, strings)
+            available.add(metric)
+            name = metric
+            if metric == "CPUTIME (usec)" or metric == "CPUTIME (sec)":
+                name = "time"
+
+            for j in range(num_scope_insts):
+                p_scope, metric_id = struct.unpack_from(
+                    "<QH", buf, p_scope_insts + j * sz_scope_inst
+                )
+                scope_type = struct.unpack_from("<B", buf, p_scope + 8)[0]
+                if scope_type == point_scope:
+                    column = name
+                elif scope_type == execution_scope:
+                    column = name + " (inc)"
+                else:
+                    continue
+                available.add(column)
+                if selected is not None and not (
+                    metric in selected or column in selected
+                ):
+                    continue
+                self.metric_ids[metric_id] = len(self.metric_columns)
+                self.metric_columns.append(column)
+                if scope_type == point_scope:
+                    self.exc_metrics.append(column)
+                else:
+                    self.inc_metrics.append(column)
+
+        if selected is not None:
+            unknown = set(selected) - available
+            if unknown:
+                raise ValueError(
+                    "Unknown metrics %s; the database has metrics %s"
+                    % (sorted(unknown), sorted(available))
+                )
+
+    def read_context_tree(self, buf, p_context, strings):
+        """Create a Node for each entry point and context of meta.db."""
+        p_entry_points, num_entry_points, sz_entry_point = struct.unpack_from(
+            "<QHB", buf, p_context
+        )
+        modules = {}
+        files = {}
+        functions = {}
+
+        def path(p_spec, cache):
+            # load module and source file specifications hold a flags word
+            # followed by a pointer to the path
+            if p_spec not in cache:
+                cache[p_spec] = read_string(
+                    buf, struct.unpack_from("<Q", buf, p_spec + 8)[0], strings
+                )
+            return cache[p_spec]
+
+        def function(p_function):
+            if p_function not in functions:
+                p_name, p_module, _, p_file, line = struct.unpack_from(
+                    "<QQQQI", buf, p_function
+                )
+                functions[p_function] = (
+                    read_string(buf, p_name, strings) if p_name else None,
+                    path(p_module, modules) if p_module else None,
+                    path(p_file, files) if p_file else None,
+                    line,
+                )
+            return functions[p_function]
+
+        list_roots = []
+        stack = []
+        for i in range(num_entry_points):
+            (
+                sz_children,
+                p_children,
+                ctx_id,
+                _,
+                p_pretty_name,
+            ) = struct.unpack_from("<QQIH2xQ", buf, p_entry_points + i * sz_entry_point)
+            name = read_string(buf, p_pretty_name, strings)
+            root = Node(Frame({"type": "function", "name": name}), None)
+            self.append_node_row(ctx_id, root, name, "entry", None, 0, None)
+            list_roots.append(root)
+            stack.append((p_children, p_children + sz_children, root))
+
+        while stack:
+            p_ctx, end, hparent = stack.pop()
+            if p_ctx >= end:
+                continue
+            (
+                sz_children,
+                p_children,
+                ctx_id,
+                flags,
+                _,
+                lexical_type,
+                num_flex_words,
+            ) = struct.unpack_from("<QQIBBBB", buf, p_ctx)
+            flex = struct.unpack_from("<%dQ" % num_flex_words, buf, p_ctx + 0x18)
+            # the next sibling follows the flex words of this context
+            stack.append((p_ctx + 0x18 + 8 * num_flex_words, end, hparent))
+
+            # the flex words are, in order and if present: a function, a
+            # source location (file and line) and a point (load module and
+            # offset)
+            func_name = module = src_file = None
+            line = offset = 0
+            k = 0
+            if flags & 1:
+                func_name, module, src_file, line = function(flex[k])
+                k += 1
+            if flags & 2:
+                src_file = path(flex[k], files)
+                line = flex[k + 1] & 0xFFFFFFFF
+                k += 2
+            if flags & 4:
+                module = path(flex[k], modules)
+                offset = flex[k + 1]
+
+            node_type = context_types[lexical_type]
+            if node_type == "function":
+                name = func_name if func_name is not None else "<unknown procedure>"
+                frame = Frame({"type": "function", "name": name})
+            elif node_type == "loop":
+                name = "Loop@%s:%d" % (os.path.basename(src_file or ""), line)
+                frame = Frame({"type": "loop", "file": src_file, "line": line})
+            elif node_type == "line":
+                name = "%s:%d" % (os.path.basename(src_file or ""), line)
+                frame = Frame({"type": "statement", "file": src_file, "line": line})
+            else:
+                name = "%s+0x%x" % (os.path.basename(module or ""), offset)
+                frame = Frame(
+                    {"type": "instruction", "module": module, "offset": offset}
+                )
+
+            hnode = Node(frame, hparent)
+            hparent.add_child(hnode)
+            self.append_node_row(ctx_id, hnode, name, node_type, src_file, line, module)
+            stack.append((p_children, p_children + sz_children, hnode))
+
+        return list_roots
+
+    def read_profile_db(self):
+        """Read the non-zero values of the selected profiles and metrics from
+        profile.db.
+
+        Returns:
+            (tuple): the rank and thread of each selected profile, and the
+                node position, profile, metric column and value of each
+                non-zero value
+        """
+        nids = np.asarray(self.node_columns["nid"], dtype=np.int64)
+        # position of each context id in the node columns
+        positions = np.full(nids.max() + 1, -1, dtype=np.int64)
+        positions[nids] = np.arange(len(nids))
+        # metric column of each metric id of profile.db
+        columns = np.full(1 << 16, -1, dtype=np.int64)
+        for metric_id, column in self.metric_ids.items():
+            columns[metric_id] = column
+
+        ranks = []
+        threads = []
+        triples = []
+        # the values are read through numpy arrays over the mapped file, so
+        # the mapping is released when the last of them is
+        with open(self.profile_filename, "rb") as f:
+            buf = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        check_header(buf, b"prof", self.profile_filename)
+        _, p_profile_infos = struct.unpack_from("<QQ", buf, 16)
+        p_profiles, num_profiles, sz_profile = struct.unpack_from(
+            "<QIB", buf, p_profile_infos
+        )
+        for i in range(num_profiles):
+            (
+                num_values,
+                p_values,
+                num_ctxs,
+                p_ctx_indices,
+                p_id_tuple,
+                flags,
+            ) = struct.unpack_from("<QQI4xQQI", buf, p_profiles + i * sz_profile)
+            if flags & 1:
+                # summary profile
+                continue
+            rank, thread = self.read_id_tuple(buf, p_id_tuple)
+            if self.ranks is not None and rank not in self.ranks:
+                continue
+            if self.threads is not None and thread not in self.threads:
+                continue
+
+            profile = len(ranks)
+            ranks.append(rank)
+            threads.append(thread)
+            triples.append(
+                self.read_values(
+                    buf,
+                    (num_values, p_values, num_ctxs, p_ctx_indices),
+                    profile,
+                    positions,
+                    columns,
+                )
+            )
+
+        if not ranks:
+            raise ValueError(
+                "No profiles in %s match the selected ranks and threads"
+                % self.profile_filename
+            )
+        triples = [np.concatenate(arrays) for arrays in zip(*triples)]
+        return np.array(ranks), np.array(threads), triples
+
+    def read_id_tuple(self, buf, p_id_tuple):
+        """Return the MPI rank and thread id of a profile from its
+        hierarchical identifier tuple."""
+        num_ids = struct.unpack_from("<H", buf, p_id_tuple)[0]
+        ids = {}
+        for i in range(num_ids):
+            kind, _, logical_id = struct.unpack_from(
+                "<BxHI", buf, p_id_tuple + 8 + 16 * i
+            )
+            ids[self.kind_names[kind]] = logical_id
+        if "THREAD" in ids:
+            thread = ids["THREAD"]
+        elif "GPUSTREAM" in ids:
+            thread = 500 + ids["GPUSTREAM"]
+        else:
+            thread = 0
+        return ids.get("RANK", 0), thread
+
+    def read_values(self, buf, value_block, profile, positions, columns):
+        """Return the non-zero values of a sparse value block of profile.db.
+
+        Returns:
+            (tuple): the node position, profile, metric column and value of
+                each non-zero value of the selected metrics
+        """
+        num_values, p_values, num_ctxs, p_ctx_indices = value_block
+        values = np.frombuffer(buf, value_dtype, num_values, p_values)
+        ctx_indices = np.frombuffer(buf, ctx_index_dtype, num_ctxs, p_ctx_indices)
+
+        # the values of each context run up to the first value of the next
+        # context
+        starts = ctx_indices["start"].astype(np.int64)
+        counts = np.diff(starts, append=num_values)
+        ctx = np.repeat(ctx_indices["ctx"].astype(np.int64), counts)
+        # values of contexts that are not in meta.db are dropped
+        position = np.full(len(ctx), -1, dtype=positions.dtype)
+        known = ctx < len(positions)
+        position[known] = positions[ctx[known]]
+        column = columns[values["metric"]]
+        value = values["value"]
+
+        keep = (position >= 0) & (column >= 0) & (value != 0)
+        return (
+            position[keep],
+            np.full(np.count_nonzero(keep), profile, dtype=np.int64),
+            column[keep],
+            value[keep],
+        )
+
+    def read(self):
+        """Read the calling context tree and the non-zero metric values, and
+        create a dataframe out of them.
+
+        Return:
+            (GraphFrame): new GraphFrame with HPCToolkit data.
+        """
+        with self.timer.phase("graph construction"):
+            list_roots = self.read_meta_db()
+            graph = Graph(list_roots)
+            graph.enumerate_traverse()
+
+        with self.timer.phase("read profile db"):
+            ranks, threads, (position, profile, column, value) = self.read_profile_db()
+
+        with self.timer.phase("data frame"):
+            num_nodes = len(self.node_columns["node"])
+            num_profiles = len(ranks)
+
+            # every node has a row in the profile of the lowest rank and
+            # thread (the one shown by default by tree()), with zeros if the
+            # node has no value in it
+            first = np.lexsort((threads, ranks))[0]
+            missing = np.setdiff1d(np.arange(num_nodes), position[profile == first])
+            pairs = np.concatenate(
+                [position * num_profiles + profile, missing * num_profiles + first]
+            )
+            pairs, inverse = np.unique(pairs, return_inverse=True)
+            metrics = np.zeros((len(pairs), len(self.metric_columns)))
+            metrics[inverse[: len(value)], column] = value
+
+            rows = pairs // num_profiles
+            profiles = pairs % num_profiles
+            data = {}
+            for key, values in self.node_columns.items():
+                if key in ("nid", "line"):
+                    array = np.array(values, dtype=np.int64)
+                else:
+                    array = np.empty(num_nodes, dtype=object)
+                    array[:] = values
+                data[key] = array[rows]
+            data["rank"] = ranks[profiles]
+            data["thread"] = threads[profiles]
+            for i, name in enumerate(self.metric_columns):
+                data[name] = metrics[:, i]
+            dataframe = pd.DataFrame(
+                data,
+                columns=self.metric_columns
+                + ["nid", "rank", "thread", "name", "type", "file", "line"]
+                + ["module", "node"],
+            )
+
+            # if every profile is the only thread of its rank, do not make
+            # thread an index
+            indices = ["node", "rank", "thread"]
+            if len(set(zip(ranks, threads))) == len(set(ranks)):
+                del dataframe["thread"]
+                indices = ["node", "rank"]
+            dataframe.set_index(indices, inplace=True)
+            dataframe.sort_index(inplace=True)
+
+        return hatchet.graphframe.GraphFrame(
+            graph, dataframe, self.exc_metrics, self.inc_metrics
+        )
+
+    def append_node_row(self, nid, hnode, name, node_type, src_file, line, module):
+        """Append the attributes of a node to the node columns."""
+        columns = self.node_columns
+        columns["nid"].append(nid)
+        columns["name"].append(name)
+        columns["type"].append(node_type)
+        columns["file"].append(src_file)
+        columns["line"].append(line)
+        columns["module"].append(module)
+        columns["node"].append(hnode)
@@ -5,6 +5,7 @@
 
 import json
 
+import numpy as np
 import pandas as pd
 
 import hatchet.graphframe
@@ -12,6 +13,26 @@ from hatchet.node import Node
 from hatchet.graph import Graph
 from hatchet.frame import Frame
 
+try:
+    from orjson import loads as _orjson_loads
+except ImportError:
+    _orjson_loads = None
+
+
+def _loads(text):
+    """Decode a JSON document, with orjson if it is installed.
+
+    orjson rejects NaN and Infinity, which the json module writes for
+    non-finite floats, so documents it cannot decode are decoded again by
+    the json module.
+    """
+    if _orjson_loads is not None:
+        try:
+            return _orjson_loads(text)
+        except ValueError:
+            pass
+    return json.loads(text)
+
 
 class JsonReader:
     """Create a GraphFrame from a json string of the following format.
@@ -23,16 +44,54 @@ class JsonReader:
     def __init__(self, json_spec):
         """Read from a json string specification of a graphframe
 
-        json (string): Json specification of a graphframe.
+        json (string): Json specification of a graphframe, in either layout
+            written by ``GraphFrame.to_json``, or a file containing it.
         """
-        self.spec_dict = json.loads(json_spec)
+        if hasattr(json_spec, "read"):
+            json_spec = json_spec.read()
+        self.spec_dict = _loads(json_spec)
+
+    def _read_columnar_graph(self):
+        graph_spec = self.spec_dict["graph"]
+        frames = [Frame(attrs) for attrs in graph_spec["frames"]]
+        nodes = np.empty(len(graph_spec["nodes"]["frame"]), dtype=object)
+        nodes[:] = [
+            Node(frames[f], hnid=nid)
+            for f, nid in zip(graph_spec["nodes"]["frame"], graph_spec["nodes"]["nid"])
+        ]
+        for parent, child in zip(
+            graph_spec["edges"]["parent"], graph_spec["edges"]["child"]
+        ):
+            nodes[parent].add_child(nodes[child])
+            nodes[child].add_parent(nodes[parent])
+
+        graph = Graph([nodes[r] for r in graph_spec["roots"]])
+        graph.enumerate_depth()
+        return graph, nodes
 
     def read(self):
+        if self.spec_dict.get("format") == "columnar":
+            grph, nodes = self._read_columnar_graph()
+            dataframe = pd.DataFrame(self.spec_dict["dataframe"])
+            dataframe["node"] = nodes[dataframe["node"].to_numpy()]
+            dataframe.set_index(self.spec_dict["dataframe_indices"], inplace=True)
+
+            return hatchet.graphframe.GraphFrame(
+                grph,
+                dataframe,
+                self.spec_dict["exclusive_metrics"],
+                self.spec_dict["inclusive_metrics"],
+                self.spec_dict["default_metric"],
+            )
+
         roots = []
+        # the node of each id, from the first graph that contains it
+        nid_to_node = {}
         for graph_spec in self.spec_dict["graph"]:
             # turn frames into nodes
             for nid, value in graph_spec.items():
                 graph_spec[nid]["data"] = Node(Frame(value["data"]), hnid=int(nid))
+                nid_to_node.setdefault(int(nid), graph_spec[nid]["data"])
 
             # connect nodes
             for nid, value in graph_spec.items():
@@ -49,10 +108,7 @@ class JsonReader:
 
         # make the dataframes
         dataframe = pd.DataFrame(self.spec_dict["dataframe"])
-        for graph_spec in self.spec_dict["graph"]:
-            dataframe["node"] = dataframe["node"].map(
-                lambda n: graph_spec[str(n)]["data"] if (str(n) in graph_spec) else n
-            )
+        dataframe["node"] = [nid_to_node.get(n, n) for n in dataframe["node"].tolist()]
         dataframe.set_index(self.spec_dict["dataframe_indices"], inplace=True)
 
         return hatchet.graphframe.GraphFrame(
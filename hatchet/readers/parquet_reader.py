@@ -0,0 +1,133 @@
+# Copyright 2017-2023 Lawrence Livermore National Security, LLC and other
+# Hatchet Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import json
+import os
+
+import numpy as np
+
+import hatchet.graphframe
+from hatchet.csr_graph import CSRGraph
+from hatchet.frame import Frame
+from hatchet.graph import Graph
+
+from .dataframe_reader import _restore_child_order
+
+
+class ParquetReader:
+    """Read a GraphFrame written by ParquetWriter.
+
+    Files are memory-mapped, so numeric columns are not read into memory
+    until they are used, and only the requested dataframe columns are read.
+    """
+
+    def __init__(self, dirname):
+        self.dirname = dirname
+
+    def _path(self, name):
+        return os.path.join(self.dirname, name + ".parquet")
+
+    def read_frames(self):
+        """Read the table of frames written by ``ParquetWriter.write_frames``.
+
+        Returns:
+            (list): Frame objects, one per row
+        """
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(self._path("frames"), memory_map=True)
+        metadata = table.schema.metadata or {}
+        json_columns = set()
+        if b"hatchet" in metadata:
+            json_columns.update(json.loads(metadata[b"hatchet"])["json_columns"])
+
+        return [
+            Frame(
+                {
+                    k: json.loads(v) if k in json_columns else v
+                    for k, v in attrs.items()
+                    if v is not None
+                }
+            )
+            for attrs in table.to_pylist()
+        ]
+
+    def read_graph(self, frames):
+        """Read the graph, whose nodes refer to rows of ``frames``."""
+        import pyarrow.parquet as pq
+
+        nodes = pq.read_table(self._path("nodes"), memory_map=True)
+        edges = pq.read_table(self._path("edges"), memory_map=True)
+        parent_links = None
+        # not written by older versions
+        if os.path.exists(self._path("parents")):
+            parents = pq.read_table(self._path("parents"), memory_map=True)
+            parent_links = (
+                parents.column("child").to_numpy(),
+                parents.column("parent").to_numpy(),
+            )
+
+        csr = CSRGraph.from_edges(
+            edges.column("parent").to_numpy(),
+            edges.column("child").to_numpy(),
+            nodes.column("frame").to_numpy(),
+            frames,
+            nodes.column("depth").to_numpy(),
+            np.flatnonzero(nodes.column("root").to_numpy()),
+            nodes.column("nid").to_numpy(),
+            parent_links,
+        )
+
+        _restore_child_order(csr, edges.column("order").to_numpy())
+        return Graph.from_csr(csr)
+
+    def read(self, columns=None, frames=None):
+        """Read the GraphFrame.
+
+        Arguments:
+            columns (list, optional): dataframe columns to read (default: all);
+                the index is always read
+            frames (list, optional): table of Frame objects the nodes refer
+                to, if it is not stored with the graph
+
+        Returns:
+            (GraphFrame): the GraphFrame, with only the requested columns
+        """
+        import pyarrow.parquet as pq
+
+        schema = pq.read_schema(self._path("metrics"), memory_map=True)
+        metadata = json.loads(schema.metadata[b"hatchet"])
+        index_names = metadata["index"]
+        exc_metrics = metadata["exc_metrics"]
+        inc_metrics = metadata["inc_metrics"]
+        default_metric = metadata["default_metric"]
+        if columns is not None:
+            columns = [c for c in columns if c not in index_names]
+            exc_metrics = [m for m in exc_metrics if m in columns]
+            inc_metrics = [m for m in inc_metrics if m in columns]
+            if default_metric not in columns and exc_metrics + inc_metrics:
+                default_metric = (exc_metrics + inc_metrics)[0]
+            columns = index_names + columns
+
+        if frames is None:
+            frames = self.read_frames()
+        graph = self.read_graph(frames)
+        nodes = np.empty(len(graph.to_csr()), dtype=object)
+        nodes[:] = graph.to_csr().nodes
+
+        dataframe = pq.read_table(
+            self._path("metrics"), columns=columns, memory_map=True
+        ).to_pandas(split_blocks=True)
+        dataframe["node"] = nodes[dataframe["node"].to_numpy()]
+        dataframe.set_index(index_names, inplace=True)
+
+        return hatchet.graphframe.GraphFrame(
+            graph,
+            dataframe,
+            exc_metrics=exc_metrics,
+            inc_metrics=inc_metrics,
+            default_metric=default_metric,
+            metadata=metadata.get("metadata", {}),
+        )
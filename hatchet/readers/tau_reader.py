@@ -13,11 +13,242 @@ from hatchet.graph import Graph
 from hatchet.frame import Frame
 
 
+# Directories with fewer rank/thread profiles than this are read serially,
+# because starting the work in other processes costs more than it saves
+parallel_min_profiles = 64
+
+# Example line: ".TAU application  => foo()" 31 0 155019 155019 0 GROUP="TAU_CALLPATH"
+line_regex = re.compile(r"\"(.*)\"\s(.*)\sG")
+quoted_regex = re.compile(r"\"(.*?)\"")
+
+
+def get_name_file_module(is_parent, node_info, symbol):
+    """This function gets the name, file and module information
+    for a node using the corresponding line in the output file.
+    Example line: [UNWIND] <file> [@] <name> [{<file_or_module>} {<line>}]
+    There are several line formats in TAU and this function gets
+    the node information considering all these formats for which
+    examples are given below.
+    """
+    name, file, module = None, None, None
+    # There are several different formats in TAU outputs.
+    # There might be file, line, and module information.
+    # The following if-else block covers all possible output
+    # formats. Example formats are given in comments.
+    if symbol == " [@] ":
+        # Check if there is a [@] symbol.
+        node_info = node_info.split(symbol)
+        # We don't need file and module information if it's a parent node.
+        if not is_parent:
+            file = node_info[0].split()[1]
+            if "[{" in node_info[1]:
+                # Sometimes we see file and module information inside of [{}]
+                # Example: [UNWIND] <file> [@] <name> [{<file_or_module>} {<line>}]
+                name_and_module = node_info[1].split(" [{")
+                module = name_and_module[1].split()[0].strip("}")
+            else:
+                # Example: [UNWIND] <file> [@] <name> <module>
+                name_and_module = node_info[1].split()
+                module = name_and_module[1]
+
+            # Check if module is in file.
+            # Assign None to file if it's .so.
+            # Assign None to module if it's .c.
+            if module in file:
+                if ".so" in file:
+                    file = None
+                if ".c" in module:
+                    module = None
+            name = "[UNWIND] " + name_and_module[0]
+        else:
+            # We just need to take name if it is a parent
+            name = "[UNWIND] " + node_info[1].split()[0]
+    elif symbol == " C ":
+        # Check if there is a C symbol.
+        # "C" symbol means it's a C function.
+        node_info = node_info.split(symbol)
+        name = node_info[0]
+        # We don't need file and module information if it's a parent node.
+        if not is_parent:
+            if "[{" in node_info[1]:
+                # Example: <name> C [{<file>} {<line>}]
+                node_info = node_info[1].split()
+                file = node_info[0].strip("}[{")
+    else:
+        if "[{" in node_info:
+            # If there isn't C or [@]
+            # Example: [<type>] <name> [{} {}]
+            node_info = node_info.split(" [{")
+            name = node_info[0]
+            # We don't need file and module information if it's a parent node.
+            if not is_parent:
+                file = node_info[1].split()[0].strip("}{")
+        else:
+            # Example 1: [<type>] <name> <module>
+            # Example 2: [<type>] <name>
+            # Example 3: <name>
+            name = node_info
+            node_info = node_info.split()
+            # We need to take module information from the first example.
+            # Another example is "[CONTEXT] .TAU application" which contradicts
+            # with the first example. So we check if there is "\" symbol which
+            # will show the module information in this case.
+            if len(node_info) == 3 and "/" in name:
+                name = node_info[0] + " " + node_info[1]
+                # We don't need file and module information if it's a parent node.
+                if not is_parent:
+                    module = node_info[2]
+    return [name, file, module]
+
+
+def get_line_numbers(node_info):
+    start_line, end_line = 0, 0
+    # There should be [{}] symbols if there is line number information.
+    if "[{" in node_info:
+        tmp_module_or_file_line = re.search(r"\{.*\}\]", node_info).group(0).split()
+        line_numbers = tmp_module_or_file_line[1].strip("}]").replace("{", "")
+        start_line = line_numbers
+        if "-" in line_numbers:
+            # Sometimes there is "-" between start line and end line
+            # Example: {341,1}-{396,1}
+            line_numbers = line_numbers.split("-")
+            start_line = line_numbers[0].split(",")[0]
+            end_line = line_numbers[1].split(",")[0]
+        else:
+            if "," in line_numbers:
+                # Sometimes we don't have "-".
+                # Example: {15,0}
+                start_line = line_numbers.split(",")[0]
+                end_line = line_numbers.split(",")[1]
+    return [start_line, end_line]
+
+
+def get_symbol(node_info):
+    """The symbol that separates the parts of the name of a node."""
+    if " C " in node_info:
+        return " C "
+    elif " [@] " in node_info:
+        return " [@] "
+    return ""
+
+
+def read_rank_profiles(filenames_per_rank):
+    """Read the metric files of a rank (or thread).
+
+    Arguments:
+        filenames_per_rank (tuple): the metric files of the rank, e.g.,
+            (metric1/profile.x.0.0, metric2/profile.x.0.0)
+
+    Returns:
+        (tuple): the rank, the thread, the callpath, name and metric values
+            of the root, and a list of the (callpath, metric values) of the
+            other nodes
+    """
+    file_info = filenames_per_rank[0].split(".")
+    rank, thread = int(file_info[-3]), int(file_info[-1])
+
+    # Load all files represent a different metric for a rank or a thread.
+    # If there are 2 metrics, load metric1\profile.x.0.0 and metric2\profile.x.0.0
+    file_data = []
+    for f_index in range(len(filenames_per_rank)):
+        # Store the lines after metadata.
+        with open(filenames_per_rank[f_index], "r") as f:
+            file_data.append(f.readlines()[2:])
+
+    # Get the root information from only the first file to compare them
+    # with others.
+    # Example: ".TAU application" 1 1 272 15755429 0 GROUP="TAU_DEFAULT"
+    root_line = line_regex.match(file_data[0][0])
+    root_name = root_line.group(1).strip(" ")
+    # convert it to a tuple to use it as a key in callpath_to_node dictionary
+    root_callpath = tuple([root_name])
+    root_values = list(map(int, root_line.group(2).split(" ")[:-1]))
+
+    # After first profile.0.0.0, only get Excl and Incl metric values
+    # from other files since other columns will be the same.
+    # We assume each metric file of a rank has the same root.
+    first_file_root_name = quoted_regex.search(file_data[0][0]).group(1)
+    for f_index in range(1, len(file_data)):
+        root_name = quoted_regex.search(file_data[f_index][0]).group(1)
+        # Below assert statement throws an error if the roots are not the
+        # same for different metric files.
+        # TODO: We need to find a solution if this throws an error.
+        assert first_file_root_name == root_name, (
+            "Metric files for a rank has different roots.\n"
+            + "File: "
+            + filenames_per_rank[f_index]
+            + "\nLine: 2"
+        )
+        root_line = line_regex.match(file_data[f_index][0])
+        root_values.extend(list(map(int, root_line.group(2).split(" ")[2:4])))
+
+    # Start from the line after root.
+    # Iterate over only the first metric file of a rank
+    # since the lines should be exactly the same across
+    # all metric files of a rank.
+    # Uses the same "line_index" for other metric files of a rank.
+    nodes = []
+    for line_index in range(1, len(file_data[0])):
+        line = file_data[0][line_index]
+        # We only parse the lines that has "=>" symbol which shows the callpath info.
+        # We just skip the other lines.
+        if "=>" in line:
+            # Example: ".TAU application  => foo()  => bar()" 31 0 155019 155019 0 GROUP="TAU_SAMPLE|TAU_CALLPATH"
+            callpath_line_regex = line_regex.match(line)
+            # callpath: ".TAU application  => foo()  => bar()"
+            callpath = tuple(
+                name.strip(" ") for name in callpath_line_regex.group(1).split("=>")
+            )
+            # Don't include the value for ProfileCalls.
+            # metric_values: 31 0 155019 155019
+            metric_values = list(
+                map(float, callpath_line_regex.group(2).split(" ")[:-1])
+            )
+
+            # Example: ".TAU application  => foo()  => bar()" 31 0 155019..."
+            first_file_callpath_line = quoted_regex.search(line).group(1)
+            # After first profile.x.0.0, only get Excl and Incl metric values
+            # from other files.
+            for f_index in range(1, len(file_data)):
+                other_file_callpath_line = quoted_regex.search(
+                    file_data[f_index][line_index]
+                ).group(1)
+                # We assume metric files of a rank should have the exact same lines.
+                # Only difference should be the Incl and Excl metric values.
+                # TODO: We should find a solution if this raises an error.
+                assert first_file_callpath_line == other_file_callpath_line, (
+                    "Lines across metric files for a rank are not the same.\n"
+                    + "File: "
+                    + filenames_per_rank[f_index]
+                    + "\nLine: "
+                    + str(line_index + 3)
+                )
+                # Get the information from the same line in each file. "line_index".
+                callpath_line_regex = line_regex.match(file_data[f_index][line_index])
+                metric_values.extend(
+                    map(float, callpath_line_regex.group(2).split(" ")[2:4])
+                )
+
+            nodes.append((callpath, metric_values))
+
+    return rank, thread, root_callpath, root_name, root_values, nodes
+
+
 class TAUReader:
     """Read in a profile generated using TAU."""
 
-    def __init__(self, dirname):
+    def __init__(self, dirname, num_procs=1):
+        """Read the profiles in a directory.
+
+        Arguments:
+            dirname (str): directory of the profile.x.y.z files, or of one
+                subdirectory per metric
+            num_procs (int, optional): number of worker processes used to
+                parse the files of the ranks (and threads), if there are at
+                least ``parallel_min_profiles`` of them
+        """
         self.dirname = dirname
+        self.num_procs = num_procs
         self.node_dicts = []
         self.callpath_to_node = {}
         self.rank_thread_to_data = {}
@@ -25,6 +256,9 @@ class TAUReader:
         self.inc_metrics = []
         self.exc_metrics = []
         self.columns = []
+        # parsed (name, file, module, start line, end line) of the leaf of
+        # each callpath, which are the same across ranks and threads
+        self.leaf_info = {}
         self.multiple_ranks = False
         self.multiple_threads = False
 
@@ -56,107 +290,6 @@ class TAUReader:
         return node_dict
 
     def create_graph(self):
-        def _get_name_file_module(is_parent, node_info, symbol):
-            """This function gets the name, file and module information
-            for a node using the corresponding line in the output file.
-            Example line: [UNWIND] <file> [@] <name> [{<file_or_module>} {<line>}]
-            There are several line formats in TAU and this function gets
-            the node information considering all these formats for which
-            examples are given below.
-            """
-            name, file, module = None, None, None
-            # There are several different formats in TAU outputs.
-            # There might be file, line, and module information.
-            # The following if-else block covers all possible output
-            # formats. Example formats are given in comments.
-            if symbol == " [@] ":
-                # Check if there is a [@] symbol.
-                node_info = node_info.split(symbol)
-                # We don't need file and module information if it's a parent node.
-                if not is_parent:
-                    file = node_info[0].split()[1]
-                    if "[{" in node_info[1]:
-                        # Sometimes we see file and module information inside of [{}]
-                        # Example: [UNWIND] <file> [@] <name> [{<file_or_module>} {<line>}]
-                        name_and_module = node_info[1].split(" [{")
-                        module = name_and_module[1].split()[0].strip("}")
-                    else:
-                        # Example: [UNWIND] <file> [@] <name> <module>
-                        name_and_module = node_info[1].split()
-                        module = name_and_module[1]
-
-                    # Check if module is in file.
-                    # Assign None to file if it's .so.
-                    # Assign None to module if it's .c.
-                    if module in file:
-                        if ".so" in file:
-                            file = None
-                        if ".c" in module:
-                            module = None
-                    name = "[UNWIND] " + name_and_module[0]
-                else:
-                    # We just need to take name if it is a parent
-                    name = "[UNWIND] " + node_info[1].split()[0]
-            elif symbol == " C ":
-                # Check if there is a C symbol.
-                # "C" symbol means it's a C function.
-                node_info = node_info.split(symbol)
-                name = node_info[0]
-                # We don't need file and module information if it's a parent node.
-                if not is_parent:
-                    if "[{" in node_info[1]:
-                        # Example: <name> C [{<file>} {<line>}]
-                        node_info = node_info[1].split()
-                        file = node_info[0].strip("}[{")
-            else:
-                if "[{" in node_info:
-                    # If there isn't C or [@]
-                    # Example: [<type>] <name> [{} {}]
-                    node_info = node_info.split(" [{")
-                    name = node_info[0]
-                    # We don't need file and module information if it's a parent node.
-                    if not is_parent:
-                        file = node_info[1].split()[0].strip("}{")
-                else:
-                    # Example 1: [<type>] <name> <module>
-                    # Example 2: [<type>] <name>
-                    # Example 3: <name>
-                    name = node_info
-                    node_info = node_info.split()
-                    # We need to take module information from the first example.
-                    # Another example is "[CONTEXT] .TAU application" which contradicts
-                    # with the first example. So we check if there is "\" symbol which
-                    # will show the module information in this case.
-                    if len(node_info) == 3 and "/" in name:
-                        name = node_info[0] + " " + node_info[1]
-                        # We don't need file and module information if it's a parent node.
-                        if not is_parent:
-                            module = node_info[2]
-            return [name, file, module]
-
-        def _get_line_numbers(node_info):
-            start_line, end_line = 0, 0
-            # There should be [{}] symbols if there is line number information.
-            if "[{" in node_info:
-                tmp_module_or_file_line = (
-                    re.search(r"\{.*\}\]", node_info).group(0).split()
-                )
-                line_numbers = tmp_module_or_file_line[1].strip("}]").replace("{", "")
-                start_line = line_numbers
-                if "-" in line_numbers:
-                    # Sometimes there is "-" between start line and end line
-                    # Example: {341,1}-{396,1}
-                    line_numbers = line_numbers.split("-")
-                    start_line = line_numbers[0].split(",")[0]
-                    end_line = line_numbers[1].split(",")[0]
-                else:
-                    if "," in line_numbers:
-                        # Sometimes we don't have "-".
-                        # Example: {15,0}
-                        start_line = line_numbers.split(",")[0]
-                        end_line = line_numbers.split(",")[1]
-            return [start_line, end_line]
-
         def _create_parent(child_node, parent_callpath):
             """In TAU output, sometimes we see a node as a parent
             in the callpath before we see it as a leaf node. In
@@ -185,12 +318,9 @@ class TAUReader:
                 parent_info = parent_callpath[-1]
                 parent_name = ""
 
-                if " C " in parent_info:
-                    parent_name = _get_name_file_module(True, parent_info, " C ")[0]
-                elif " [@] " in parent_info:
-                    parent_name = _get_name_file_module(True, parent_info, " [@] ")[0]
-                else:
-                    parent_name = _get_name_file_module(True, parent_info, "")[0]
+                parent_name = get_name_file_module(
+                    True, parent_info, get_symbol(parent_info)
+                )[0]
 
                 parent_node = Node(
                     Frame({"type": "function", "name": parent_name}), None
@@ -254,51 +384,30 @@ class TAUReader:
         # Get column information from the metric files of a rank.
         self.columns = _construct_column_list(profile_filenames[0])
 
+        # Parse the files of each rank (or thread), in worker processes if
+        # there are many of them. The nodes are created in the same order
+        # either way.
+        if self.num_procs > 1 and len(profile_filenames) >= max(
+            parallel_min_profiles, self.num_procs
+        ):
+            # import this lazily, so serial reads never start the executor
+            from hatchet.util.executor import get_executor
+
+            chunksize = max(1, len(profile_filenames) // (4 * self.num_procs))
+            rank_profiles = get_executor(self.num_procs).map(
+                read_rank_profiles, profile_filenames, chunksize=chunksize
+            )
+        else:
+            rank_profiles = map(read_rank_profiles, profile_filenames)
+
         list_roots = []
         prev_rank, prev_thread = 0, 0
-        # Example filenames_per_rank: (metric1/profile.x.0.0 ...)
-        for filenames_per_rank in profile_filenames:
-            file_info = filenames_per_rank[0].split(".")
-            rank, thread = int(file_info[-3]), int(file_info[-1])
+        for rank, thread, root_callpath, root_name, root_values, nodes in rank_profiles:
             if not self.multiple_ranks:
                 self.multiple_ranks = True if rank != prev_rank else False
             if not self.multiple_threads:
                 self.multiple_threads = True if thread != prev_thread else False
 
-            # Load all files represent a different metric for a rank or a thread.
-            # If there are 2 metrics, load metric1\profile.x.0.0 and metric2\profile.x.0.0
-            file_data = []
-            for f_index in range(len(filenames_per_rank)):
-                # Store the lines after metadata.
-                file_data.append(open(filenames_per_rank[f_index], "r").readlines()[2:])
-
-            # Get the root information from only the first file to compare them
-            # with others.
-            # Example: ".TAU application" 1 1 272 15755429 0 GROUP="TAU_DEFAULT"
-            root_line = re.match(r"\"(.*)\"\s(.*)\sG", file_data[0][0])
-            root_name = root_line.group(1).strip(" ")
-            # convert it to a tuple to use it as a key in callpath_to_node dictionary
-            root_callpath = tuple([root_name])
-            root_values = list(map(int, root_line.group(2).split(" ")[:-1]))
-
-            # After first profile.0.0.0, only get Excl and Incl metric values
-            # from other files since other columns will be the same.
-            # We assume each metric file of a rank has the same root.
-            first_file_root_name = re.search(r"\"(.*?)\"", file_data[0][0]).group(1)
-            for f_index in range(1, len(file_data)):
-                root_name = re.search(r"\"(.*?)\"", file_data[f_index][0]).group(1)
-                # Below assert statement throws an error if the roots are not the
-                # same for different metric files.
-                # TODO: We need to find a solution if this throws an error.
-                assert first_file_root_name == root_name, (
-                    "Metric files for a rank has different roots.\n"
-                    + "File: "
-                    + filenames_per_rank[f_index]
-                    + "\nLine: 2"
-                )
-                root_line = re.match(r"\"(.*)\"\s(.*)\sG", file_data[f_index][0])
-                root_values.extend(list(map(int, root_line.group(2).split(" ")[2:4])))
-
             # Check if the root exists in other ranks.
             # Note that we assume the root is the same for all metric files of a rank.
             if root_callpath not in self.callpath_to_node:
@@ -326,120 +435,59 @@ class TAUReader:
             )
             self.node_dicts.append(node_dict)
 
-            # Start from the line after root.
-            # Iterate over only the first metric file of a rank
-            # since the lines should be exactly the same across
-            # all metric files of a rank.
-            # Uses the same "line_index" for other metric files of a rank.
-            for line_index in range(1, len(file_data[0])):
-                line = file_data[0][line_index]
-                metric_values = []
-                # We only parse the lines that has "=>" symbol which shows the callpath info.
-                # We just skip the other lines.
-                if "=>" in line:
-                    # Example: ".TAU application  => foo()  => bar()" 31 0 155019 155019 0 GROUP="TAU_SAMPLE|TAU_CALLPATH"
-                    callpath_line_regex = re.match(r"\"(.*)\"\s(.*)\sG", line)
-                    # callpath: ".TAU application  => foo()  => bar()"
-                    callpath = [
-                        name.strip(" ")
-                        for name in callpath_line_regex.group(1).split("=>")
-                    ]
-
-                    # Example leaf_name: StrToInt [{lulesh-util.cc} {13,1}-{29,1}]
-                    leaf_name = callpath[-1]
-                    callpath = tuple(callpath)
-                    parent_callpath = callpath[:-1]
-                    # Don't include the value for ProfileCalls.
-                    # metric_values: 31 0 155019 155019
-                    metric_values = list(
-                        map(float, callpath_line_regex.group(2).split(" ")[:-1])
+            for callpath, metric_values in nodes:
+                # Example leaf_name: StrToInt [{lulesh-util.cc} {13,1}-{29,1}]
+                # The same callpaths appear in the files of every rank, so the
+                # information of their leaf is only parsed once.
+                leaf_name = callpath[-1]
+                leaf_info = self.leaf_info.get(leaf_name)
+                if leaf_info is None:
+                    # Get name, file, and module information using the leaf name
+                    # and the symbol on it, and the start and end line information
+                    leaf_info = get_name_file_module(
+                        False, leaf_name, get_symbol(leaf_name)
+                    ) + get_line_numbers(leaf_name)
+                    self.leaf_info[leaf_name] = leaf_info
+
+                leaf_node = self.callpath_to_node.get(callpath)
+                # Check if that node is created earlier
+                if leaf_node is None:
+                    # Create the node since it doesn't exist
+                    leaf_node = Node(
+                        Frame({"type": "function", "name": leaf_info[0]}),
+                        None,
                     )
+                    self.callpath_to_node[callpath] = leaf_node
 
-                    # Get start and end line information
-                    leaf_line_numbers = _get_line_numbers(leaf_name)
-                    # Get name, file, and module information using the leaf name
-                    # and the symbol on it
-                    if " C " in leaf_name:
-                        leaf_name_file_module = _get_name_file_module(
-                            False, leaf_name, " C "
-                        )
-                    elif " [@] " in leaf_name:
-                        leaf_name_file_module = _get_name_file_module(
-                            False, leaf_name, " [@] "
-                        )
+                    # Get its parent from its callpath.
+                    parent_callpath = callpath[:-1]
+                    parent_node = self.callpath_to_node.get(parent_callpath)
+                    if parent_node is None:
+                        # Create parent if it doesn't exist.
+                        _create_parent(leaf_node, parent_callpath)
                     else:
-                        leaf_name_file_module = _get_name_file_module(
-                            False, leaf_name, ""
-                        )
-
-                    # Example: ".TAU application  => foo()  => bar()" 31 0 155019..."
-                    first_file_callpath_line = re.search(
-                        r"\"(.*?)\"", file_data[0][line_index]
-                    ).group(1)
-                    # After first profile.x.0.0, only get Excl and Incl metric values
-                    # from other files.
-                    for f_index in range(1, len(file_data)):
-                        other_file_callpath_line = re.search(
-                            r"\"(.*?)\"", file_data[f_index][line_index]
-                        ).group(1)
-                        # We assume metric files of a rank should have the exact same lines.
-                        # Only difference should be the Incl and Excl metric values.
-                        # TODO: We should find a solution if this raises an error.
-                        assert first_file_callpath_line == other_file_callpath_line, (
-                            "Lines across metric files for a rank are not the same.\n"
-                            + "File: "
-                            + filenames_per_rank[f_index]
-                            + "\nLine: "
-                            + str(line_index + 3)
-                        )
-                        # Get the information from the same line in each file. "line_index".
-                        callpath_line_regex = re.match(
-                            r"\"(.*)\"\s(.*)\sG", file_data[f_index][line_index]
-                        )
-                        metric_values.extend(
-                            map(float, callpath_line_regex.group(2).split(" ")[2:4])
-                        )
-
-                    leaf_node = self.callpath_to_node.get(callpath)
-                    # Check if that node is created earlier
-                    if leaf_node is None:
-                        # Create the node since it doesn't exist
-                        leaf_node = Node(
-                            Frame(
-                                {"type": "function", "name": leaf_name_file_module[0]}
-                            ),
-                            None,
-                        )
-                        self.callpath_to_node[callpath] = leaf_node
-
-                        # Get its parent from its callpath.
-                        parent_node = self.callpath_to_node.get(parent_callpath)
-                        if parent_node is None:
-                            # Create parent if it doesn't exist.
-                            _create_parent(leaf_node, parent_callpath)
-                        else:
-                            parent_node.add_child(leaf_node)
-                            leaf_node.add_parent(parent_node)
-
-                    node_dict = self.create_node_dict(
-                        leaf_node,
-                        self.columns,
-                        metric_values,
-                        # name
-                        leaf_name_file_module[0],
-                        # file
-                        leaf_name_file_module[1],
-                        # module
-                        leaf_name_file_module[2],
-                        # start line
-                        leaf_line_numbers[0],
-                        # end line
-                        leaf_line_numbers[1],
-                        rank,
-                        thread,
-                    )
+                        parent_node.add_child(leaf_node)
+                        leaf_node.add_parent(parent_node)
+
+                node_dict = self.create_node_dict(
+                    leaf_node,
+                    self.columns,
+                    metric_values,
+                    # name
+                    leaf_info[0],
+                    # file
+                    leaf_info[1],
+                    # module
+                    leaf_info[2],
+                    # start line
+                    leaf_info[3],
+                    # end line
+                    leaf_info[4],
+                    rank,
+                    thread,
+                )
 
-                    self.node_dicts.append(node_dict)
+                self.node_dicts.append(node_dict)
 
         return list_roots
 
@@ -470,34 +518,29 @@ class TAUReader:
         dataframe.sort_index(inplace=True)
 
         # Fill the missing ranks
-        # After unstacking and iterating over rows, there
-        # will be "NaN" values for some ranks. Find the first
-        # rank that has notna value and use it for other rows/ranks
-        # of the multiindex.
-        # TODO: iterrows() is not the best way to iterate over rows.
+        # After unstacking, there will be "NaN" values for some
+        # ranks. Find the first rank that has notna value and use
+        # it for other rows/ranks of the multiindex.
         if self.multiple_ranks or self.multiple_threads:
-            dataframe = dataframe.unstack()
-            for idx, row in dataframe.iterrows():
-                # There is always a valid name for an index.
-                # Take that valid name and assign to other ranks/rows.
-                name = row["name"][row["name"].first_valid_index()]
-                dataframe.loc[idx, "name"] = name
-
-                # Sometimes there is no file information.
-                if row["file"].first_valid_index() is not None:
-                    file = row["file"][row["file"].first_valid_index()]
-                    dataframe.loc[idx, "file"] = file
-
-                # Sometimes there is no module information.
-                if row["module"].first_valid_index() is not None:
-                    module = row["module"][row["module"].first_valid_index()]
-                    dataframe.loc[idx, "module"] = module
-
-                # Fill the rest with 0
-                dataframe.fillna(0, inplace=True)
+            # There is always a valid name for an index.
+            # Take that valid name and assign to other ranks/rows.
+            # Sometimes there is no file or module information.
+            info_columns = ["name", "file", "module"]
+            levels = list(range(dataframe.index.nlevels - 1))
+            info = dataframe[info_columns].groupby(level=levels).first()
+
+            columns = dataframe.columns
+            dataframe = dataframe.drop(columns=info_columns).unstack()
+
+            # Fill the rest with 0
+            dataframe.fillna(0, inplace=True)
 
             # Stack the dataframe
             dataframe = dataframe.stack()
+            info = info.reindex(dataframe.index.droplevel(-1))
+            for column in info_columns:
+                dataframe[column] = info[column].fillna(0).to_numpy()
+            dataframe = dataframe[columns]
 
         default_metric = "time (inc)"
 
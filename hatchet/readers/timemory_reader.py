@@ -3,21 +3,47 @@
 #
 # SPDX-License-Identifier: MIT
 
-import json
 import pandas as pd
 import os
 import glob
+import re
 from hatchet.graphframe import GraphFrame
 from ..node import Node
 from ..graph import Graph
 from ..frame import Frame
+from ..util.json_stream import JSONStream
 from ..util.timer import Timer
 
 
+# standard configurations of function + file + line in the prefix of a node
+prefix_patterns = [
+    # [func][file]
+    re.compile(r"(^\[)(?P<func>.*)(\]\[)(?P<file>.*)(\]$)"),
+    # label  [func/file:line]
+    re.compile(
+        r"(?P<head>.+)([ \t]+)\[(?P<func>\S+)([/])(?P<file>\S+):(?P<line>[0-9]+)\]$"
+    ),
+    # func@file:line/tail
+    # func/file:line/tail
+    re.compile(r"(?P<func>\S+)([@/])(?P<file>\S+):(?P<line>[0-9]+)[/]*(?P<tail>.*)"),
+    # func@file/tail
+    # func/file/tail
+    re.compile(r"(?P<func>\S+)([@/])(?P<file>\S+)([/])(?P<tail>.*)"),
+    # func:line/tail
+    re.compile(r"(?P<func>\S+):(?P<line>[0-9]+)([/]*)(?P<tail>.*)"),
+]
+
+
+def component_name(name):
+    """Name of a component without its namespace, e.g., wall_clock for
+    tim::component::wall_clock"""
+    return name.replace("tim::", "").replace("component::", "").lower()
+
+
 class TimemoryReader:
     """Read in timemory JSON output"""
 
-    def __init__(self, input, select=None, **_kwargs):
+    def __init__(self, input, select=None, ranks=None, **_kwargs):
         """Arguments:
         input (str or file-stream or dict or None):
             Valid argument types are:
@@ -28,6 +54,11 @@ class TimemoryReader:
 
         select (list of str):
             A list of strings which match the component enumeration names, e.g. ["cpu_clock"].
+            The other components are skipped when the JSON is read.
+
+        ranks (list of int):
+            The MPI and/or UPC++ ranks to read. The data of the other MPI ranks
+            is skipped when the JSON is read.
 
         per_thread (boolean):
             Ensures that when applying filters to the graphframe, frames with
@@ -51,6 +82,7 @@ class TimemoryReader:
         self.multiple_threads = False
         self.callpath_to_node_dict = {}  # (callpath, rank, thread): <node_dict>
         self.callpath_to_node = {}  # (callpath): <node>
+        self.prefix_to_attrs = {}  # (prefix): (<frame attrs>, <extra attrs>)
 
         # the per_thread and per_rank settings make sure that
         # squashing doesn't collapse the threads/ranks
@@ -77,6 +109,33 @@ class TimemoryReader:
         else:
             raise TypeError("select must be None or list of string")
 
+        if ranks is None or isinstance(ranks, (list, tuple, set)):
+            self.ranks = None if ranks is None else set(int(r) for r in ranks)
+        else:
+            raise TypeError("ranks must be None or list of int")
+
+    def keep_value(self, path):
+        """Select the parts of the timemory JSON to decode: the selected
+        components, and the selected MPI ranks of each component (see
+        JSONStream.load).
+
+        Arguments:
+            path (tuple): keys and positions leading to a value of the JSON
+        """
+        if path[0] != "timemory":
+            return True
+        if len(path) == 1:
+            return None
+        if len(path) == 2:
+            # a component
+            if self.select is not None and component_name(path[1]) not in self.select:
+                return False
+            return None if self.ranks is not None else True
+        if len(path) == 3:
+            return None if path[2] == "mpi" else True
+        # the data of an MPI rank
+        return path[3] in self.ranks
+
     def create_graph(self):
         """Create graph and dataframe"""
         list_roots = []
@@ -112,24 +171,9 @@ class TimemoryReader:
 
         def perform_regex(_prefix):
             """Performs a search for standard configurations of function + file + line"""
-            import re
-
             _tmp = None
-            for _pattern in [
-                # [func][file]
-                r"(^\[)(?P<func>.*)(\]\[)(?P<file>.*)(\]$)",
-                # label  [func/file:line]
-                r"(?P<head>.+)([ \t]+)\[(?P<func>\S+)([/])(?P<file>\S+):(?P<line>[0-9]+)\]$",
-                # func@file:line/tail
-                # func/file:line/tail
-                r"(?P<func>\S+)([@/])(?P<file>\S+):(?P<line>[0-9]+)[/]*(?P<tail>.*)",
-                # func@file/tail
-                # func/file/tail
-                r"(?P<func>\S+)([@/])(?P<file>\S+)([/])(?P<tail>.*)",
-                # func:line/tail
-                r"(?P<func>\S+):(?P<line>[0-9]+)([/]*)(?P<tail>.*)",
-            ]:
-                _tmp = process_regex(re.search(_pattern, _prefix))
+            for _pattern in prefix_patterns:
+                _tmp = process_regex(_pattern.search(_prefix))
                 if _tmp:
                     break
             return _tmp if _tmp else None
@@ -141,7 +185,19 @@ class TimemoryReader:
                 <FUNC>@<FILE>:<LINE>/...
                 <FUNC>/<FILE>:<LINE>/...
                 <SOURCE>    [<FUNC>/<FILE>:<LINE>]
+
+            The same prefixes appear in the data of every rank, thread and
+            component, so each prefix is only parsed once. The dictionaries
+            are copied since they are modified by the caller.
             """
+            _attrs = self.prefix_to_attrs.get(_prefix)
+            if _attrs is None:
+                _attrs = parse_prefix(_prefix)
+                self.prefix_to_attrs[_prefix] = _attrs
+            return (dict(_attrs[0]), dict(_attrs[1]))
+
+        def parse_prefix(_prefix):
+            """Parse a prefix (see get_name_line_file)."""
             _keys = {
                 "type": "region",
                 "name": _prefix,
@@ -391,6 +447,14 @@ class TimemoryReader:
                 # starting from the first node in the cct.
                 rank_data = ranks_data[i]
                 rank = None if _rank is None else i + _rank
+                # skip the ranks that are not selected (the data of the
+                # MPI ranks that are skipped in the JSON is None)
+                if rank_data is None or (
+                    self.ranks is not None
+                    and rank is not None
+                    and rank not in self.ranks
+                ):
+                    continue
                 if isinstance(rank_data, list):
                     for data in rank_data:
                         if len(data["children"]) != 0:
@@ -455,9 +519,7 @@ class TimemoryReader:
         # each metric data is another item in this dict.
         for metric_name, metric_data in self.graph_dict["timemory"].items():
             # strip out the namespace if provided
-            metric_name = (
-                metric_name.replace("tim::", "").replace("component::", "").lower()
-            )
+            metric_name = component_name(metric_name)
             # check for selection
             if self.select is not None and metric_name not in self.select:
                 continue
@@ -530,35 +592,29 @@ class TimemoryReader:
         dataframe.sort_index(inplace=True)
 
         # Fill the missing ranks
-        # After unstacking and iterating over rows, there
-        # will be "NaN" values for some ranks. Find the first
-        # rank that has notna value and use it for other rows/ranks
-        # of the multiindex.
-        # TODO: iterrows() is not the best way to iterate over rows.
+        # After unstacking, there will be "NaN" values for some
+        # ranks. Find the first rank that has notna value and use
+        # it for other rows/ranks of the multiindex.
         if self.multiple_ranks or self.multiple_threads:
-            dataframe = dataframe.unstack()
-            for idx, row in dataframe.iterrows():
-
-                # There is always a valid name for an index.
-                # Take that valid name and assign to other ranks/rows.
-                name = row["name"][row["name"].first_valid_index()]
-                dataframe.loc[idx, "name"] = name
+            # There is always a valid name for an index.
+            # Take that valid name and assign to other ranks/rows.
+            # Sometimes there is no file or type information.
+            info_columns = ["name", "file", "type"]
+            levels = list(range(dataframe.index.nlevels - 1))
+            info = dataframe[info_columns].groupby(level=levels).first()
 
-                # Sometimes there is no file information.
-                if row["file"].first_valid_index() is not None:
-                    file = row["file"][row["file"].first_valid_index()]
-                    dataframe.loc[idx, "file"] = file
+            columns = dataframe.columns
+            dataframe = dataframe.drop(columns=info_columns).unstack()
 
-                # Sometimes there is no file information.
-                if row["type"].first_valid_index() is not None:
-                    file = row["type"][row["type"].first_valid_index()]
-                    dataframe.loc[idx, "type"] = file
-
-                # Fill the rest with 0
-                dataframe.fillna(0, inplace=True)
+            # Fill the rest with 0
+            dataframe.fillna(0, inplace=True)
 
             # Stack the dataframe
             dataframe = dataframe.stack()
+            info = info.reindex(dataframe.index.droplevel(-1))
+            for column in info_columns:
+                dataframe[column] = info[column].fillna(0).to_numpy()
+            dataframe = dataframe[columns]
 
         return GraphFrame(
             graph, dataframe, exc_metrics, inc_metrics, self.default_metric
@@ -571,20 +627,22 @@ class TimemoryReader:
         if isinstance(self.input, dict):
             self.graph_dict = self.input
         # check if the input is a directory and get '.tree.json' files if true.
-        elif os.path.isdir(self.input):
+        elif isinstance(self.input, str) and os.path.isdir(self.input):
             tree_files = glob.glob(self.input + "/*.tree.json")
             for file in tree_files:
                 # read all files that end with .tree.json.
-                with open(file, "r") as f:
+                with open(file, "rb") as f:
                     # add all metrics to the same dict even though timemory
                     # creates a separate file for each metric.
-                    self.graph_dict["timemory"].update(json.load(f)["timemory"])
+                    self.graph_dict["timemory"].update(
+                        JSONStream(f).load(self.keep_value)["timemory"]
+                    )
         # check if the input is a filename that ends in json
         elif isinstance(self.input, str) and self.input.endswith("json"):
-            with open(self.input, "r") as f:
-                self.graph_dict = json.load(f)
+            with open(self.input, "rb") as f:
+                self.graph_dict = JSONStream(f).load(self.keep_value)
         elif not isinstance(self.input, str):
-            self.graph_dict = json.loads(self.input.read())
+            self.graph_dict = JSONStream(self.input).load(self.keep_value)
         else:
             raise TypeError("input must be dict, directory, json file, or string")
 
@@ -3,6 +3,8 @@
 #
 # SPDX-License-Identifier: MIT
 
+import io
+import json
 import subprocess
 import numpy as np
 import pandas as pd
@@ -12,6 +14,7 @@ import sys
 
 from hatchet import GraphFrame
 from hatchet.readers.caliper_reader import CaliperReader
+from hatchet.util.json_stream import JSONStream
 from hatchet.util.executable import which
 
 caliperreader_avail = True
@@ -227,6 +230,30 @@ def test_graphframe_native_lulesh_from_caliperreader(lulesh_caliper_cali):
             assert gf.dataframe[col].dtype == object
 
 
+@pytest.mark.skipif(
+    not caliperreader_avail, reason="needs caliper-reader package to be loaded"
+)
+def test_graphframe_native_incomplete_records(lulesh_caliper_cali, capsys):
+    """Check records without some attributes, or with values that cannot be
+    converted, in the native Caliper reader."""
+    r = caliperreader.CaliperReader()
+    r.read(lulesh_caliper_cali)
+    records = [record for record in r.records if "path" in record]
+    del records[0]["count"]
+    records[1]["max#time.duration"] = "not a number"
+
+    gf = GraphFrame.from_caliperreader(r)
+    df = gf.dataframe.reset_index().set_index("nid")
+
+    assert "Ignoring attribute max#time.duration" in capsys.readouterr().out
+    assert df["count"].dtype == np.float64
+    assert df["max#time.duration"].dtype == np.float64
+    assert df["time"].dtype == np.float64
+    assert df["count"].isna().sum() == 1
+    assert df["max#time.duration"].isna().sum() == 1
+    assert df["count"].notna().sum() == len(records) - 1
+
+
 def test_graphframe_native_lulesh_from_file_node_order(caliper_ordered_cali):
     """Check the order of output from the native Caliper reader by examining a known input with node order column."""
 
@@ -843,6 +870,11 @@ def test_sw4_cuda_from_caliperreader(sw4_caliper_cuda_activity_profile_cali):
     for col in gf.exc_metrics + gf.inc_metrics:
         assert col in gf.dataframe.columns
 
+    # nodes without metrics on some ranks are backfilled with zeros
+    ranks = set(gf.dataframe.index.get_level_values("rank"))
+    pairs = set(gf.dataframe.index.tolist())
+    assert pairs == set((node, rank) for node in gf.graph.traverse() for rank in ranks)
+
     assert type(gf.metadata["mpi.world.size"]) == int
     assert type(gf.metadata["cali.caliper.version"]) == str
     assert type(gf.metadata["cali.channel"]) == str
@@ -905,3 +937,72 @@ def test_graphframe_timeseries_lulesh_from_file(caliper_timeseries_cali):
     assert gf.dataframe["alloc.region.highwatermark"].iloc[1] == 63732320.0
     assert np.isnan(gf2.dataframe["loop.start_iteration"].iloc[0])
     assert np.isnan(gf2.dataframe["alloc.region.highwatermark"].iloc[0])
+
+
+def test_graphframe_timeseries_combined(caliper_timeseries_cali):
+    """Check that the timesteps of a timeseries are read into a single
+    graphframe, which the per-timestep graphframes are split from."""
+
+    gf = GraphFrame.from_timeseries(str(caliper_timeseries_cali), combined=True)
+    gf_list = GraphFrame.from_timeseries(str(caliper_timeseries_cali))
+
+    assert gf.dataframe.index.names == ["node", "timestep"]
+    assert len(gf.dataframe.index.unique(level="timestep")) == len(gf_list) == 50
+    assert len(gf.exc_metrics) == len(set(gf.exc_metrics))
+    # uint attributes keep their dtype, since no timestep has missing values
+    assert gf.dataframe["timeseries.snapshot"].dtype == np.uint64
+
+    for timestep in (0, 2, 49):
+        df_timestep = gf.dataframe.xs(timestep, level="timestep")
+        df = gf_list[timestep].dataframe
+        assert gf_list[timestep].graph is gf_list[0].graph
+        # every timestep has the columns and dtypes of the combined dataframe
+        assert list(df.columns) == list(gf.dataframe.columns)
+        assert df.dtypes.equals(gf.dataframe.dtypes)
+        assert [n.frame for n in df_timestep.index] == [n.frame for n in df.index]
+        assert np.allclose(
+            df_timestep["alloc.region.highwatermark"],
+            df["alloc.region.highwatermark"],
+            equal_nan=True,
+        )
+
+
+def test_json_stream_numbers_across_chunks(monkeypatch):
+    """Check that numbers are decoded whole when a chunk of the split JSON
+    ends inside them, e.g. right after "." or an exponent marker."""
+    text = '{"data": [[1.25, -3e5, 4.5E-3, 10], [0.5, 7E+2, 12, -0.125]], "x": 2.5}'
+    expected = json.loads(text)
+
+    for chunk_size in range(1, len(text) + 1):
+        monkeypatch.setattr(JSONStream, "chunk_size", chunk_size)
+        members = {
+            key: list(value) if key == "data" else value
+            for key, value in JSONStream(io.StringIO(text)).items()
+        }
+        assert members == expected
+
+
+def test_read_lulesh_json_stream_chunks(monkeypatch, lulesh_caliper_json):
+    """Check that the split JSON is parsed the same way when it is read in
+    small chunks, and when the columns come before the data."""
+    with open(str(lulesh_caliper_json)) as f:
+        json_obj = json.load(f)
+    json_obj = dict(
+        [("columns", json_obj["columns"])]
+        + [(key, value) for key, value in json_obj.items() if key != "columns"]
+    )
+    json_obj["cali.caliper.version"] = "2.10.0 éè"
+
+    monkeypatch.setattr(JSONStream, "chunk_size", 7)
+    reader = CaliperReader(io.BytesIO(json.dumps(json_obj, indent=1).encode()))
+    reader.read_json_sections()
+
+    assert len(reader.json_data) == 192
+    assert len(reader.json_data.columns) == 4
+    assert reader.metadata == {"cali.caliper.version": "2.10.0 éè"}
+
+    expected = GraphFrame.from_caliper(str(lulesh_caliper_json))
+    gf = GraphFrame.from_caliper(io.BytesIO(json.dumps(json_obj).encode()))
+    assert gf.dataframe["time (inc)"].tolist() == (
+        expected.dataframe["time (inc)"].tolist()
+    )
@@ -62,6 +62,210 @@ def make_mock_metric_db(
                 f.write(struct.pack(">f8", values[m]))
 
 
+class MockSparseDbFile(object):
+    """Contents of a mocked-up file of an HPCToolkit sparse database (i.e.,
+    meta.db, profile.db or cct.db)."""
+
+    def __init__(self, format_id):
+        self.data = bytearray(b"HPCTOOLKIT" + format_id + b"\x04\x00")
+        # sizes and pointers of the sections
+        self.data += bytes(16 * 8)
+
+    def alloc(self, size):
+        offset = len(self.data)
+        self.data += bytes(-(-size // 8) * 8)
+        return offset
+
+    def pack(self, fmt, offset, *values):
+        struct.pack_into(fmt, self.data, offset, *values)
+
+    def add(self, fmt, *values):
+        offset = self.alloc(struct.calcsize(fmt))
+        self.pack(fmt, offset, *values)
+        return offset
+
+    def string(self, value):
+        value = value.encode("utf-8") + b"\0"
+        offset = self.alloc(len(value))
+        self.data[offset : offset + len(value)] = value
+        return offset
+
+
+def write_mock_contexts(meta, contexts):
+    """Write sibling contexts (and their descendants) of the context tree of
+    a mocked-up meta.db.
+
+    Args:
+        meta (MockSparseDbFile): the meta.db file
+        contexts (list): (context id, flags, lexical type, flex words,
+            children) of each context
+
+    Returns:
+        (tuple): the pointer and size of the sibling contexts
+    """
+    sizes = [0x18 + 8 * len(flex) for _, _, _, flex, _ in contexts]
+    start = meta.alloc(sum(sizes))
+    offset = start
+    for (ctx_id, flags, lexical_type, flex, children), size in zip(contexts, sizes):
+        p_children, sz_children = 0, 0
+        if children:
+            p_children, sz_children = write_mock_contexts(meta, children)
+        relation = 1 if lexical_type == 0 else 0
+        meta.pack(
+            "<QQIBBBB%dQ" % len(flex),
+            offset,
+            sz_children,
+            p_children,
+            ctx_id,
+            flags,
+            relation,
+            lexical_type,
+            len(flex),
+            *flex,
+        )
+        offset += size
+    return start, sum(sizes)
+
+
+def make_mock_sparse_hpct_db(parent):
+    """Create a mocked-up HPCToolkit database in the sparse format.
+
+    The calling context tree is::
+
+        1 <program root>
+          2 main (function)
+            3 cpi.c:10 (line)
+            4 Loop@cpi.c:12 (loop)
+              5 cpi.c:13 (line)
+            6 MPI_Init (function)
+              7 libmpi.so+0x1234 (instruction)
+
+    and there are three profiles besides the summary profile: rank 0 thread
+    0, rank 1 thread 0, and rank 0 GPU stream 2.
+    """
+    meta = MockSparseDbFile(b"meta")
+
+    kinds = ["SUMMARY", "NODE", "RANK", "THREAD"]
+    kinds += ["GPUDEVICE", "GPUCONTEXT", "GPUSTREAM", "CORE"]
+    pp_names = meta.add("<%dQ" % len(kinds), *[meta.string(k) for k in kinds])
+    p_id_names = meta.add("<QB", pp_names, len(kinds))
+
+    # propagation scopes: point, function and execution
+    scopes = [
+        meta.add("<QBB", meta.string(name), scope_type, i)
+        for i, (name, scope_type) in enumerate(
+            [("point", 1), ("function", 3), ("execution", 2)]
+        )
+    ]
+    # metric ids 0, 1 and 2 are CPUTIME, and metric ids 3 and 4 are GINS
+    time_scopes = meta.alloc(3 * 16)
+    for i, scope in enumerate(scopes):
+        meta.pack("<QH", time_scopes + 16 * i, scope, i)
+    gins_scopes = meta.alloc(2 * 16)
+    meta.pack("<QH", gins_scopes, scopes[0], 3)
+    meta.pack("<QH", gins_scopes + 16, scopes[2], 4)
+    descriptions = meta.alloc(2 * 32)
+    meta.pack(
+        "<QQQHH", descriptions, meta.string("CPUTIME (sec)"), time_scopes, 0, 3, 0
+    )
+    meta.pack("<QQQHH", descriptions + 32, meta.string("GINS"), gins_scopes, 0, 2, 0)
+    p_metrics = meta.add("<QIBBBxQHB", descriptions, 2, 32, 16, 0, scopes[0], 3, 16)
+
+    cpi = meta.add("<I4xQ", 0, meta.string("/tmp/cpi"))
+    libmpi = meta.add("<I4xQ", 0, meta.string("/usr/lib/libmpi.so"))
+    cpi_c = meta.add("<I4xQ", 0, meta.string("./src/cpi.c"))
+    main = meta.add("<QQQQI4x", meta.string("main"), cpi, 0, cpi_c, 5)
+    mpi_init = meta.add("<QQQQI4x", meta.string("MPI_Init"), libmpi, 0, 0, 0)
+
+    tree = [
+        (
+            2,
+            1,
+            0,
+            [main],
+            [
+                (3, 2, 2, [cpi_c, 10], []),
+                (4, 2, 1, [cpi_c, 12], [(5, 2, 2, [cpi_c, 13], [])]),
+                (6, 1, 0, [mpi_init], [(7, 4, 3, [libmpi, 0x1234], [])]),
+            ],
+        )
+    ]
+    p_children, sz_children = write_mock_contexts(meta, tree)
+    entry_point = meta.add(
+        "<QQIH2xQ", sz_children, p_children, 1, 1, meta.string("<program root>")
+    )
+    p_context = meta.add("<QHB", entry_point, 1, 32)
+
+    meta.pack("<16Q", 16, 0, 0, 0, p_id_names, 0, p_metrics, 0, p_context, *[0] * 8)
+
+    prof = MockSparseDbFile(b"prof")
+    # flags, identifier tuple (kind, logical id) and values of each profile
+    profiles = [
+        (1, [(0, 0)], {0: [(2, 100.0)], 2: [(2, 100.0)]}),
+        (
+            0,
+            [(1, 0), (2, 0), (3, 0)],
+            {
+                0: [(2, 30.0)],
+                1: [(2, 30.0)],
+                2: [(1, 20.0), (2, 30.0)],
+                3: [(0, 10.0), (2, 10.0), (3, 5.0)],
+                5: [(0, 20.0), (2, 20.0), (3, 0.0)],
+            },
+        ),
+        (
+            0,
+            [(1, 0), (2, 1), (3, 0)],
+            {1: [(2, 8.0)], 2: [(2, 8.0)], 6: [(2, 8.0)], 7: [(0, 8.0), (2, 8.0)]},
+        ),
+        (0, [(2, 0), (5, 0), (6, 2)], {2: [(2, 1.0)], 5: [(0, 1.0), (4, 3.0)]}),
+    ]
+    p_profiles = prof.alloc(48 * len(profiles))
+    for i, (flags, ids, values) in enumerate(profiles):
+        p_id_tuple = prof.alloc(8 + 16 * len(ids))
+        prof.pack("<H", p_id_tuple, len(ids))
+        for j, (kind, logical_id) in enumerate(ids):
+            prof.pack("<BxHIQ", p_id_tuple + 8 + 16 * j, kind, 0, logical_id, 0)
+
+        ctxs = sorted(values)
+        pairs = [pair for ctx in ctxs for pair in values[ctx]]
+        p_values = prof.alloc(10 * len(pairs))
+        for j, (metric_id, value) in enumerate(pairs):
+            prof.pack("<Hd", p_values + 10 * j, metric_id, value)
+        p_ctx_indices = prof.alloc(12 * len(ctxs))
+        start = 0
+        for j, ctx in enumerate(ctxs):
+            prof.pack("<IQ", p_ctx_indices + 12 * j, ctx, start)
+            start += len(values[ctx])
+
+        prof.pack(
+            "<QQI4xQQI",
+            p_profiles + 48 * i,
+            len(pairs),
+            p_values,
+            len(ctxs),
+            p_ctx_indices,
+            p_id_tuple,
+            flags,
+        )
+    p_profile_infos = prof.add("<QIB", p_profiles, len(profiles), 48)
+    prof.pack("<4Q", 16, 0, p_profile_infos, 0, 0)
+
+    for name, db in [("meta.db", meta), ("profile.db", prof)]:
+        with open(os.path.join(parent, name), "wb") as f:
+            f.write(db.data)
+    with open(os.path.join(parent, "cct.db"), "wb") as f:
+        f.write(MockSparseDbFile(b"ctxt").data)
+
+
+@pytest.fixture
+def sparse_hpct_db(tmpdir):
+    """Builds a temporary directory containing a mocked-up HPCToolkit
+    database in the sparse format."""
+    make_mock_sparse_hpct_db(str(tmpdir))
+    return tmpdir
+
+
 @pytest.fixture
 def calc_pi_hpct_db(data_dir, tmpdir):
     """Builds a temporary directory containing the calc-pi database."""
@@ -985,6 +1189,18 @@ def mock_graph_literal_duplicate_first():
     return graph_dict
 
 
+@pytest.fixture
+def timemory_wall_json(data_dir, tmpdir):
+    """Builds a temporary directory containing the timemory wall clock JSON
+    tree file."""
+    timemory_json_file = os.path.join(data_dir, "timemory", "wall.tree.json")
+
+    shutil.copy(timemory_json_file, str(tmpdir))
+    tmpfile = os.path.join(str(tmpdir), "wall.tree.json")
+
+    return tmpfile
+
+
 @pytest.fixture
 def timemory_json_data():
 
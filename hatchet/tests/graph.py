@@ -6,6 +6,7 @@
 from hatchet.node import Node
 from hatchet.frame import Frame
 from hatchet.graph import Graph
+from hatchet.csr_graph import CSRGraph
 
 
 def test_from_lists():
@@ -92,3 +93,114 @@ def test_trees_are_trees():
         ("a", ("b", "e", "f", "g"), ("c", "e", "f", "g"), ("d", "e", "f", "g"))
     )
     assert g.is_tree()
+
+
+def test_compact_traversal_matches_nodes():
+    d = Node(Frame(name="d"))
+    diamond_subdag = Node.from_lists(("a", ("b", d), ("c", d)))
+    g = Graph.from_lists(("e", "f", diamond_subdag), ("g", diamond_subdag, "h"))
+
+    pre = list(g.traverse())
+    post = list(g.traverse(order="post"))
+    names = list(g.traverse(attrs="name"))
+    length = len(g)
+
+    g.compact()
+
+    assert list(g.traverse()) == pre
+    assert [id(n) for n in g.traverse(order="post")] == [id(n) for n in post]
+    assert list(g.traverse(attrs="name")) == names
+    assert len(g) == length
+    assert not g.is_tree()
+
+
+def test_compact_tree():
+    g = Graph.from_lists(("a", ("b", "e", "f"), ("c", "e", "f")))
+    g.compact()
+
+    assert g.is_tree()
+    assert len(g) == 7
+
+    csr = g.to_csr()
+    assert list(csr.depth) == [n._depth for n in g.traverse()]
+    assert list(csr.parent_array()) == [-1, 0, 1, 1, 0, 4, 4]
+
+
+def test_from_csr_materializes_on_demand():
+    frames = [Frame(name="main"), Frame(name="foo"), Frame(name="bar")]
+    # input order is not preorder: "bar" (frame 2) sorts before "foo"
+    csr, order = CSRGraph.from_parents([-1, 0, 0, 1], [0, 1, 2, 2], frames)
+    g = Graph.from_csr(csr)
+
+    assert len(g) == 4
+    assert g.is_tree()
+    assert list(g.traverse(attrs="name")) == ["main", "bar", "foo", "bar"]
+    assert list(order) == [0, 2, 1, 3]
+    assert csr._nodes is None
+
+    (root,) = g.roots
+    assert csr._nodes is not None
+    assert [n._hatchet_nid for n in g.traverse()] == [0, 1, 2, 3]
+    assert [n._depth for n in g.traverse()] == [0, 1, 1, 2]
+    assert [c.frame["name"] for c in root.children] == ["bar", "foo"]
+    assert root.children[1].children[0].parents == [root.children[1]]
+
+    # rewiring through Graph drops the arrays but keeps the nodes
+    g.roots = [root]
+    assert g._csr is None
+    assert len(g) == 4
+
+
+def test_compact_relinked_nodes():
+    g = Graph.from_lists(("a", "b", "c"))
+    g.compact()
+    a = g.roots[0]
+    b, c = a.children
+
+    # the arrays no longer describe the graph once its nodes are relinked
+    c.add_child(b)
+    b.add_parent(c)
+    assert not g.is_tree()
+    assert list(g.to_csr().in_degree()) == [0, 2, 1]
+    assert g._csr is None
+
+    g.compact()
+    b.children.append(Node(Frame(name="d"), b))
+    assert len(g) == 4
+    assert list(g.traverse(attrs="name")) == ["a", "b", "d", "c"]
+
+    # lists of the same length, and frames, that are assigned
+    g.compact()
+    e = Node(Frame(name="e"))
+    a.children = [b, e]
+    assert list(g.traverse(attrs="name")) == ["a", "b", "d", "e"]
+    g.compact()
+    e.frame = Frame(name="f")
+    assert list(g.traverse(attrs="name")) == ["a", "b", "d", "f"]
+
+    # changes to other graphs keep the arrays
+    g.compact()
+    csr = g._csr
+    Graph.from_lists(("x", "y"))
+    assert len(g) == 4
+    assert g._csr is csr
+
+
+def test_csr_descendants():
+    d = Node(Frame(name="d"))
+    diamond = Graph([Node.from_lists(["a", ["b", d], ["c", d]])])
+    csr = diamond.to_csr()
+    names = [frame["name"] for frame in csr.frames]
+
+    reach = {
+        names[csr.frame_ids[node]]: sorted(names[csr.frame_ids[i]] for i in nodes)
+        for node, nodes in csr.descendants()
+    }
+    # d is reachable along two paths, but counted once
+    assert reach == {
+        "a": ["a", "b", "c", "d"],
+        "b": ["b", "d"],
+        "c": ["c", "d"],
+        "d": ["d"],
+    }
+    assert [node for node, _ in csr.descendants()] == csr.postorder().tolist()
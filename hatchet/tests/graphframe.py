@@ -7,6 +7,7 @@
 
 from __future__ import division
 
+import io
 import os
 
 import pytest
@@ -18,7 +19,7 @@ from hatchet import GraphFrame, QueryMatcher
 from hatchet.graphframe import InvalidFilter, EmptyFilter
 from hatchet.frame import Frame
 from hatchet.graph import Graph
-from hatchet.node import Node
+from hatchet.node import MultiplePathError, Node
 from hatchet.version import __version__
 
 
@@ -86,6 +87,41 @@ def test_unify_hpctoolkit_data(calc_pi_hpct_db):
     assert all(gf1.dataframe.index == gf2.dataframe.index)
 
 
+def test_unify_by_call_path(monkeypatch, calc_pi_hpct_db, small_mock1, small_mock2):
+    """Test that aligning call paths gives the same result as Graph.union."""
+
+    def by_path(gf):
+        paths = {n: tuple(p.frame for p in n.path()) for n in gf.graph.traverse()}
+        df = gf.dataframe.reset_index()
+        df["node"] = df["node"].map(paths)
+        df = df.astype(str)
+        return sorted(paths.values()), df.sort_values(list(df.columns)).reset_index(
+            drop=True
+        )
+
+    hpct_gf = GraphFrame.from_hpctoolkit(str(calc_pi_hpct_db))
+    pairs = [
+        (GraphFrame.from_literal(small_mock1), GraphFrame.from_literal(small_mock2)),
+        # this graph has siblings with equal frames
+        (hpct_gf, hpct_gf.filter(lambda x: x["time"] > 1e3)),
+    ]
+    for gf1, gf2 in pairs:
+        assert gf1.copy()._union_by_call_path(gf2.copy()) is not None
+
+        fast = gf1 - gf2
+        with monkeypatch.context() as m:
+            m.setattr(GraphFrame, "_union_by_call_path", lambda self, other: None)
+            slow = gf1 - gf2
+
+        assert [n._hatchet_nid for n in fast.graph.traverse()] == list(
+            range(len(fast.graph))
+        )
+        fast_paths, fast_df = by_path(fast)
+        slow_paths, slow_df = by_path(slow)
+        assert fast_paths == slow_paths
+        assert fast_df.equals(slow_df)
+
+
 def test_invalid_constructor():
     # bad Graph
     with pytest.raises(ValueError):
@@ -167,6 +203,39 @@ def test_subtree_product():
     assert gf.dataframe.loc[e, "out2"] == 2
 
 
+def test_subgraph_sum_multi_rank_dag():
+    gf = GraphFrame.from_lists(("a", ("b", "c", "d"), ("e", "f")))
+    (a, b, c, d, e, f) = gf.graph.traverse()
+    # make d and b reachable along two paths each
+    for parent, child in ((e, d), (a, d), (f, b)):
+        parent.add_child(child)
+        child.add_parent(parent)
+    assert not gf.graph.is_tree()
+
+    # one copy of every row per rank, with some missing values
+    df = gf.dataframe.reset_index()
+    df = pd.concat([df.assign(rank=rank) for rank in range(3)], ignore_index=True)
+    df["time"] = np.arange(len(df), dtype=np.float64)
+    df.loc[df.index % 4 == 0, "time"] = np.nan
+    df["count"] = np.arange(len(df)) % 5
+    gf.dataframe = df.set_index(["node", "rank"]).sort_index()
+    expected = gf.dataframe.copy()
+
+    gf.subgraph_sum(["time", "count"], ["out", "count (inc)"])
+
+    assert gf.dataframe["count (inc)"].dtype == np.int64
+    for node in gf.graph.traverse():
+        descendants = list(node.traverse())
+        for rank in range(3):
+            rows = expected.loc[(descendants, rank), :]
+            out = gf.dataframe.loc[(node, rank), "out"]
+            if rows["time"].isnull().all():
+                assert np.isnan(out)
+            else:
+                assert out == rows["time"].sum()
+            assert gf.dataframe.loc[(node, rank), "count (inc)"] == rows["count"].sum()
+
+
 def check_filter_no_squash(gf, filter_func, num_rows):
     """Ensure filtering and squashing results in the right Graph and GraphFrame."""
 
@@ -510,6 +579,34 @@ def test_filter_no_squash_mock_literal(mock_graph_literal):
     assert all(n in filtered_gf.graph.traverse() for n in filtered_gf.dataframe["node"])
 
 
+def test_filter_parallel(monkeypatch, mock_graph_literal):
+    """Test that a callable filter gives the same result in worker processes."""
+    import sys
+    import hatchet.util.executor as executor
+
+    gf = GraphFrame.from_literal(mock_graph_literal)
+    filters = [
+        lambda x: x["time"] > 5.0,
+        lambda x: x["name"].startswith("ba") and x["node"].children != [],
+    ]
+    expected = [gf.filter(f, squash=False, num_procs=1).dataframe for f in filters]
+
+    # Force small dataframes to be filtered in parallel
+    monkeypatch.setattr(executor, "parallel_min_rows", 0)
+    rec_limit = sys.getrecursionlimit()
+    for f, expected_df in zip(filters, expected):
+        filtered_gf = gf.filter(f, squash=False, num_procs=2, rec_limit=rec_limit + 1)
+        assert filtered_gf.dataframe.equals(expected_df)
+        assert sys.getrecursionlimit() == rec_limit
+    executor.shutdown_executor()
+
+    # without shared memory (before Python 3.8), filters run serially
+    monkeypatch.setattr(executor, "_shared_memory", lambda: None)
+    assert not executor.use_parallel(len(gf.dataframe), 2)
+    filtered_gf = gf.filter(filters[1], squash=False, num_procs=2)
+    assert filtered_gf.dataframe.equals(expected[1])
+
+
 def test_filter_squash_mock_literal(mock_graph_literal):
     """Test the squash operation with a foo-bar tree."""
     gf = GraphFrame.from_literal(mock_graph_literal)
@@ -552,6 +649,43 @@ def test_filter_squash_mock_literal_multi_subtree_merge(mock_graph_literal):
     )
 
 
+def test_squash_tree_matches_squash_graph(mock_graph_literal, calc_pi_hpct_db):
+    """Test that squashing a tree with arrays gives the same GraphFrame as
+    rewiring Node objects."""
+
+    def by_path(gf):
+        paths = {}
+        for node in gf.graph.traverse():
+            paths[node] = tuple(n.frame for n in node.path())
+        df = gf.dataframe.reset_index()
+        df["node"] = df["node"].map(paths)
+        return sorted(paths.values()), df.sort_values(
+            gf.dataframe.index.names
+        ).reset_index(drop=True)
+
+    literal_gf = GraphFrame.from_literal(mock_graph_literal)
+    hpct_gf = GraphFrame.from_hpctoolkit(str(calc_pi_hpct_db))
+    filters = [
+        (literal_gf, lambda x: x["time"] > 5.0),
+        (literal_gf, lambda x: x["node"]._hatchet_nid in [1, 3, 7, 9, 21, 23]),
+        (literal_gf, lambda x: x["name"] not in ["bar", "waldo"]),
+        (hpct_gf, lambda x: x["time"] > 1e3),
+    ]
+    for gf, f in filters:
+        filtered_gf = gf.filter(f, squash=False)
+        tree_gf = filtered_gf.deepcopy()._squash_tree()
+        graph_gf = filtered_gf.deepcopy()._squash_graph()
+
+        assert tree_gf is not None
+        assert [n._hatchet_nid for n in tree_gf.graph.traverse()] == list(
+            range(len(tree_gf.graph))
+        )
+        tree_paths, tree_df = by_path(tree_gf)
+        graph_paths, graph_df = by_path(graph_gf)
+        assert tree_paths == graph_paths
+        assert tree_df.equals(graph_df)
+
+
 def test_filter_query_no_squash_high_level(mock_graph_literal):
     gf = GraphFrame.from_literal(mock_graph_literal)
     path = [
@@ -732,6 +866,42 @@ def test_to_dot(mock_graph_literal):
             assert '"%s" -> "%s"' % (node._hatchet_nid, child._hatchet_nid) in output
 
 
+def test_to_flamegraph(mock_graph_literal, calc_pi_hpct_db):
+    gf = GraphFrame.from_literal(mock_graph_literal)
+    output = gf.to_flamegraph(metric="time")
+    lines = output.splitlines()
+
+    assert len(lines) == len(gf.graph)
+    for line, node in zip(lines, gf.graph.traverse()):
+        stack = "; ".join(n.frame["name"] for n in node.path())
+        assert line == "%s %d" % (stack, round(gf.dataframe.loc[node, "time"]))
+
+    # rank and thread select the rows, and output can go to a stream
+    gf = GraphFrame.from_hpctoolkit(str(calc_pi_hpct_db))
+    stream = io.StringIO()
+    gf.to_flamegraph(rank=1, stream=stream)
+    lines = stream.getvalue().splitlines()
+    leaf = [n for n in gf.graph.traverse() if not n.children][0]
+    stack = "; ".join(gf.dataframe.loc[(n, 1), "name"] for n in leaf.path())
+    assert "%s %d" % (stack, round(gf.dataframe.loc[(leaf, 1), "time"])) in lines
+
+    gf = GraphFrame.from_lists(("a", "b", "c"))
+    gf.graph.roots[0].children[1].add_child(gf.graph.roots[0].children[0])
+    with pytest.raises(MultiplePathError):
+        gf.to_flamegraph()
+
+    # also when the nodes of a squashed graph are relinked after a first call
+    gf = GraphFrame.from_literal(mock_graph_literal)
+    gf = gf.filter(lambda row: True, squash=True)
+    assert len(gf.to_flamegraph().splitlines()) == len(gf.graph)
+    root = gf.graph.roots[0]
+    child, other = root.children[0], root.children[1]
+    other.add_child(child)
+    child.add_parent(other)
+    with pytest.raises(MultiplePathError):
+        gf.to_flamegraph()
+
+
 def test_unify_diff_graphs():
     gf1 = GraphFrame.from_lists(("a", ("b", "c"), ("d", "e")))
     gf2 = GraphFrame.from_lists(("a", ("b", "c", "d"), ("e", "f"), "g"))
@@ -1137,6 +1307,133 @@ def test_hdf_load_store(mock_graph_literal):
         os.remove("test_gframe.hdf")
 
 
+def test_hdf_load_store_multiindex(calc_pi_hpct_db, tmpdir):
+    filename = str(tmpdir.join("test_gframe.hdf"))
+    gf_orig = GraphFrame.from_hpctoolkit(str(calc_pi_hpct_db))
+    num_children = [len(n.children) for n in gf_orig.graph.traverse()]
+    gf_orig.to_hdf(filename, "test_key")
+
+    # writing does not modify the graph
+    assert [len(n.children) for n in gf_orig.graph.traverse()] == num_children
+
+    gf_loaded = GraphFrame.from_hdf(filename, key="test_key")
+
+    assert gf_orig.dataframe.equals(gf_loaded.dataframe)
+    assert gf_orig.graph == gf_loaded.graph
+    assert [n._hatchet_nid for n in gf_loaded.graph.traverse()] == [
+        n._hatchet_nid for n in gf_orig.graph.traverse()
+    ]
+
+
+def test_hdf_load_store_sliced_multiindex(calc_pi_hpct_db, tmpdir):
+    filename = str(tmpdir.join("test_gframe.hdf"))
+    gf_orig = GraphFrame.from_hpctoolkit(str(calc_pi_hpct_db))
+
+    # unlink a leaf and drop its rows, which leaves it in the index levels
+    leaf = next(n for n in gf_orig.graph.traverse() if not n.children)
+    for parent in leaf.parents:
+        parent.children.remove(leaf)
+    leaf.parents = []
+    gf_orig.dataframe = gf_orig.dataframe.drop(index=leaf, level="node")
+    assert leaf in gf_orig.dataframe.index.levels[0]
+
+    gf_orig.to_hdf(filename, "test_key")
+    gf_loaded = GraphFrame.from_hdf(filename, key="test_key")
+
+    assert gf_orig.graph == gf_loaded.graph
+    assert len(gf_loaded.dataframe) == len(gf_orig.dataframe)
+    assert [n.frame for n in gf_loaded.dataframe.index.get_level_values("node")] == [
+        n.frame for n in gf_orig.dataframe.index.get_level_values("node")
+    ]
+
+
+def test_hdf_load_store_dag(calc_pi_callgrind_dot, tmpdir):
+    filename = str(tmpdir.join("test_gframe.hdf"))
+    gf_orig = GraphFrame.from_gprof_dot(str(calc_pi_callgrind_dot))
+    gf_orig.to_hdf(filename, "test_key")
+    gf_loaded = GraphFrame.from_hdf(filename, key="test_key")
+
+    def links(gf):
+        return [
+            (
+                n.frame,
+                [p.frame for p in n.parents],
+                [c.frame for c in n.children],
+            )
+            for n in gf.graph.traverse()
+        ]
+
+    # parents lists keep their order, and parents listed several times
+    main = next(n for n in gf_loaded.graph.traverse() if n.frame["name"] == "main")
+    assert [p.frame["name"] for p in main.parents] == ["(below main)"] * 2
+    assert links(gf_loaded) == links(gf_orig)
+    assert gf_orig.dataframe.equals(gf_loaded.dataframe)
+
+    pytest.importorskip("pyarrow")
+    gf_orig.to_parquet(str(tmpdir.join("dag")))
+    gf_loaded = GraphFrame.from_parquet(str(tmpdir.join("dag")))
+    assert links(gf_loaded) == links(gf_orig)
+
+
+def test_parquet_load_store(mock_graph_literal, calc_pi_hpct_db, tmpdir):
+    pytest.importorskip("pyarrow")
+
+    gf_orig = GraphFrame.from_literal(mock_graph_literal)
+    gf_orig.to_parquet(str(tmpdir.join("literal")))
+    gf_loaded = GraphFrame.from_parquet(str(tmpdir.join("literal")))
+
+    assert gf_orig.dataframe.equals(gf_loaded.dataframe)
+    assert gf_orig.graph == gf_loaded.graph
+    assert gf_orig.exc_metrics == gf_loaded.exc_metrics
+    assert gf_orig.inc_metrics == gf_loaded.inc_metrics
+    assert gf_orig.default_metric == gf_loaded.default_metric
+
+    # multi-level index, with projection of the dataframe columns
+    gf_orig = GraphFrame.from_hpctoolkit(str(calc_pi_hpct_db))
+    gf_orig.to_parquet(str(tmpdir.join("hpct")))
+    gf_loaded = GraphFrame.from_parquet(str(tmpdir.join("hpct")), columns=["time"])
+
+    assert gf_loaded.graph == gf_orig.graph
+    assert list(gf_loaded.dataframe.columns) == ["time"]
+    assert gf_loaded.dataframe.index.names == gf_orig.dataframe.index.names
+    assert gf_loaded.exc_metrics == ["time"]
+    assert gf_loaded.inc_metrics == []
+    assert gf_loaded.default_metric == "time"
+    assert np.array_equal(
+        gf_loaded.dataframe["time"].values, gf_orig.dataframe["time"].values
+    )
+    assert all(
+        loaded.frame == orig.frame
+        for loaded, orig in zip(
+            gf_loaded.dataframe.index.get_level_values("node"),
+            gf_orig.dataframe.index.get_level_values("node"),
+        )
+    )
+
+    # frame attributes with values of several types, and metadata
+    gf_orig = GraphFrame.from_literal(
+        [
+            {
+                "frame": {"name": "main", "type": "function", "line": 10},
+                "metrics": {"time": 1.0, "time (inc)": 3.0},
+                "children": [
+                    {
+                        "frame": {"name": "foo", "type": "function", "line": "?"},
+                        "metrics": {"time": 2.0, "time (inc)": 2.0},
+                    }
+                ],
+            }
+        ]
+    )
+    gf_orig.metadata = {"cluster": "quartz", "nprocs": 4}
+    gf_orig.to_parquet(str(tmpdir.join("mixed")))
+    gf_loaded = GraphFrame.from_parquet(str(tmpdir.join("mixed")))
+
+    assert [n.frame["line"] for n in gf_loaded.graph.traverse()] == [10, "?"]
+    assert gf_orig.graph == gf_loaded.graph
+    assert gf_loaded.metadata == {"cluster": "quartz", "nprocs": 4}
+
+
 def test_preserve_inc_metrics(mock_graph_literal_time_as_line):
     gf = GraphFrame.from_literal(mock_graph_literal_time_as_line)
 
@@ -3,12 +3,22 @@
 #
 # SPDX-License-Identifier: MIT
 
+import multiprocessing
+import multiprocessing.pool
+
 import numpy as np
 import pandas as pd
 import os
 
+import pytest
+
 from hatchet import GraphFrame
 from hatchet.readers.hpctoolkit_reader import HPCToolkitReader
+from hatchet.readers.hpctoolkit_sparse_reader import (
+    HPCToolkitSparseReader,
+    ctx_index_dtype,
+    value_dtype,
+)
 
 modules = [
     "cpi",
@@ -131,6 +141,60 @@ def test_read_calc_pi_database(calc_pi_hpct_db):
     assert all(pr in reader.procedure_names.values() for pr in procedures)
 
 
+def test_parse_callpath_profile(calc_pi_hpct_db):
+    """Check the calling context tree streamed out of experiment.xml."""
+    reader = HPCToolkitReader(str(calc_pi_hpct_db))
+    reader.fill_tables()
+    reader.read_all_metricdb_files()
+    roots = reader.parse_callpath_profile()
+
+    nodes = reader.node_columns["node"]
+    assert len(roots) == 1
+    assert all(len(column) == len(nodes) for column in reader.node_columns.values())
+    assert len(set(reader.node_columns["nid"])) == len(nodes)
+    assert sorted(map(id, roots[0].traverse())) == sorted(map(id, nodes))
+    assert set(reader.node_columns["type"]) == {"PF", "S"}
+    assert len(reader.statement_nids) == reader.node_columns["type"].count("S")
+    assert len(reader.statement_parent_nids) == len(reader.statement_nids)
+
+
+def test_read_selected_ranks_and_metrics(monkeypatch, calc_pi_hpct_db):
+    """Read only some ranks and metrics of a database."""
+    joined = []
+
+    class Pool(multiprocessing.pool.Pool):
+        def join(self):
+            super(Pool, self).join()
+            joined.append(self)
+
+    monkeypatch.setattr(multiprocessing, "Pool", Pool)
+    full = GraphFrame.from_hpctoolkit(str(calc_pi_hpct_db))
+    gf = GraphFrame.from_hpctoolkit(
+        str(calc_pi_hpct_db), ranks=[0, 2], metrics=["time"]
+    )
+
+    # the worker processes that read the metric-db files have exited
+    assert len(joined) == 2
+    assert multiprocessing.active_children() == []
+
+    assert gf.exc_metrics == ["time"]
+    assert gf.inc_metrics == []
+    assert "time (inc)" not in gf.dataframe.columns
+    assert sorted(set(gf.dataframe.index.get_level_values("rank"))) == [0, 2]
+
+    expected = full.dataframe.reset_index()
+    expected = expected[expected["rank"].isin([0, 2])]
+    expected = expected.sort_values(["nid", "rank"])
+    result = gf.dataframe.reset_index().sort_values(["nid", "rank"])
+    assert np.array_equal(result["time"].values, expected["time"].values)
+    assert list(result["name"]) == list(expected["name"])
+
+    with pytest.raises(ValueError):
+        GraphFrame.from_hpctoolkit(str(calc_pi_hpct_db), metrics=["no such metric"])
+    with pytest.raises(ValueError):
+        GraphFrame.from_hpctoolkit(str(calc_pi_hpct_db), ranks=[1000])
+
+
 def test_allgather(data_dir, osu_allgather_hpct_db):
     gf = GraphFrame.from_hpctoolkit(str(osu_allgather_hpct_db))
 
@@ -202,3 +266,78 @@ def test_inclusive_time_calculation(data_dir, calc_pi_hpct_db):
     assert all(
         gf.dataframe["time (inc)"].values == gf.dataframe["orig_inc_time"].values
     )
+
+
+def test_sparse_database(sparse_hpct_db):
+    """Read a database in the sparse meta.db/profile.db format."""
+    gf = GraphFrame.from_hpctoolkit(str(sparse_hpct_db))
+
+    assert gf.exc_metrics == ["time", "GINS"]
+    assert gf.inc_metrics == ["time (inc)", "GINS (inc)"]
+    assert gf.dataframe.index.names == ["node", "rank", "thread"]
+    assert len(gf.graph) == 7
+    assert sorted(gf.dataframe["name"].unique()) == sorted(
+        [
+            "<program root>",
+            "main",
+            "cpi.c:10",
+            "Loop@cpi.c:12",
+            "cpi.c:13",
+            "MPI_Init",
+            "libmpi.so+0x1234",
+        ]
+    )
+
+    # only the non-zero values are read, plus zeros for the nodes without
+    # a value on rank 0, thread 0
+    df = gf.dataframe.reset_index()
+    assert len(df) == 13
+    assert set(df["thread"]) == {0, 502}
+    assert len(df[(df["rank"] == 0) & (df["thread"] == 0)]) == 7
+
+    rows = df.set_index(["name", "rank", "thread"])
+    assert rows.loc[("main", 0, 0), "time"] == 0
+    assert rows.loc[("main", 0, 0), "time (inc)"] == 30.0
+    assert rows.loc[("cpi.c:10", 0, 0), "GINS"] == 5.0
+    assert rows.loc[("cpi.c:13", 0, 502), "GINS (inc)"] == 3.0
+    assert rows.loc[("libmpi.so+0x1234", 1, 0), "time"] == 8.0
+    assert rows.loc[("Loop@cpi.c:12", 0, 0), "time (inc)"] == 0
+    assert rows.loc[("main", 0, 0), "file"] == "./src/cpi.c"
+    assert rows.loc[("MPI_Init", 1, 0), "module"] == "/usr/lib/libmpi.so"
+
+    assert "30.000 main ./src/cpi.c" in gf.tree(metric_column="time (inc)")
+
+
+def test_sparse_database_selection(sparse_hpct_db):
+    gf = HPCToolkitSparseReader(str(sparse_hpct_db), ranks=[1], metrics=["time"]).read()
+
+    assert gf.exc_metrics == ["time"]
+    assert gf.inc_metrics == []
+    assert gf.dataframe.index.names == ["node", "rank"]
+    assert len(gf.dataframe) == 7
+    assert gf.dataframe["time"].sum() == 8.0
+
+    gf = GraphFrame.from_hpctoolkit(str(sparse_hpct_db), threads=[502])
+    assert set(gf.dataframe.index.get_level_values("rank")) == {0}
+
+    with pytest.raises(ValueError):
+        HPCToolkitSparseReader(str(sparse_hpct_db), metrics=["cycles"]).read()
+    with pytest.raises(ValueError):
+        HPCToolkitSparseReader(str(sparse_hpct_db), ranks=[7]).read()
+
+
+def test_sparse_database_unknown_contexts(sparse_hpct_db):
+    """Values of contexts that are not in meta.db are dropped."""
+    reader = HPCToolkitSparseReader(str(sparse_hpct_db))
+    values = np.array([(0, 1.0), (0, 2.0), (0, 4.0), (1, 8.0)], dtype=value_dtype)
+    ctx_indices = np.array([(0, 0), (1, 1), (9, 2)], dtype=ctx_index_dtype)
+    buf = values.tobytes() + ctx_indices.tobytes()
+    value_block = (len(values), 0, len(ctx_indices), values.nbytes)
+
+    position, profile, column, value = reader.read_values(
+        buf, value_block, 3, np.array([5, 6]), np.array([0, 1])
+    )
+    assert list(position) == [5, 6]
+    assert list(profile) == [3, 3]
+    assert list(column) == [0, 0]
+    assert list(value) == [1.0, 2.0]
@@ -3,6 +3,10 @@
 #
 # SPDX-License-Identifier: MIT
 
+import json
+
+import numpy as np
+
 from hatchet import GraphFrame
 
 
@@ -27,3 +31,42 @@ def test_write_json(json_graphframe_specification):
     assert "".join(sorted("".join(sorted(jgs.split())))) == "".join(
         sorted("".join(json_out.split()))
     )
+
+
+def test_columnar_json(json_graphframe_specification, tmpdir):
+    with open(json_graphframe_specification, "r") as f:
+        gf = GraphFrame.from_json(f.read())
+
+    for backend in ("json", None):
+        gf_loaded = GraphFrame.from_json(gf.to_json(columnar=True, backend=backend))
+        assert gf_loaded.graph == gf.graph
+        assert gf_loaded.dataframe.equals(gf.dataframe)
+        assert gf_loaded.default_metric == gf.default_metric
+
+    # stream the columnar layout to a binary file and read it back
+    filename = str(tmpdir.join("columnar.json"))
+    with open(filename, "wb") as f:
+        gf.to_json(f, columnar=True)
+    with open(filename, "rb") as f:
+        gf_loaded = GraphFrame.from_json(f)
+    assert gf_loaded.graph == gf.graph
+    assert gf_loaded.dataframe.equals(gf.dataframe)
+
+    columnar = gf.to_dict(columnar=True)
+    assert columnar["format"] == "columnar"
+    assert len(columnar["graph"]["nodes"]["nid"]) == len(gf.graph)
+    assert columnar["dataframe"]["name"] == list(gf.dataframe["name"])
+    assert GraphFrame.from_json(json.dumps(columnar)).graph == gf.graph
+
+
+def test_json_non_finite(json_graphframe_specification):
+    with open(json_graphframe_specification, "r") as f:
+        gf = GraphFrame.from_json(f.read())
+    gf.dataframe["time"] = np.inf
+
+    # the json module writes Infinity, which orjson cannot decode
+    for columnar in (False, True):
+        text = gf.to_json(columnar=columnar, backend="json")
+        assert "Infinity" in text
+        gf_loaded = GraphFrame.from_json(text)
+        assert np.isinf(gf_loaded.dataframe["time"]).all()
@@ -0,0 +1,62 @@
+# Copyright 2017-2023 Lawrence Livermore National Security, LLC and other
+# Hatchet Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import os
+
+import pytest
+
+from hatchet import GraphFrame
+from hatchet.profile_store import ProfileStore
+
+pytest.importorskip("pyarrow")
+
+
+def test_append_and_load(mock_graph_literal, calc_pi_hpct_db, tmpdir):
+    dirname = str(tmpdir.join("store"))
+    gf_literal = GraphFrame.from_literal(mock_graph_literal)
+    gf_hpct = GraphFrame.from_hpctoolkit(str(calc_pi_hpct_db))
+
+    store = ProfileStore(dirname)
+    assert store.append(gf_literal, metadata={"app": "mock", "size": 1}) == 0
+    assert store.append(gf_literal, metadata={"app": "mock", "size": 2}) == 1
+    # the second copy of the literal adds no frames
+    literal_frames = {node.frame for node in gf_literal.graph.traverse()}
+    assert len(ProfileStore(dirname)._read_frames()[0]) == len(literal_frames)
+    assert store.append(gf_hpct, key="cpi", metadata={"app": "cpi"}) == "cpi"
+
+    with pytest.raises(ValueError):
+        store.append(gf_hpct, key="cpi")
+    # keys that JSON would not read back unchanged are rejected before
+    # anything is written
+    with pytest.raises(TypeError):
+        store.append(gf_literal, key=("mock", 3))
+    assert sorted(os.listdir(os.path.join(dirname, "runs"))) == ["0", "1", "2"]
+
+    # reopen the store from disk
+    store = ProfileStore(dirname)
+    assert len(store) == 3
+    assert store.keys() == [0, 1, "cpi"]
+    assert list(store.runs.loc[[0, 1], "size"]) == [1, 2]
+    assert store.select(app="mock") == [0, 1]
+    assert store.select(keys=[1, "cpi"], app="mock") == [1]
+
+    frames = store._read_frames()[0]
+    assert len(frames) == len(set(frames))
+    assert set(frames) == literal_frames | {
+        node.frame for node in gf_hpct.graph.traverse()
+    }
+
+    gf_loaded = store.load(["cpi"])
+    assert len(gf_loaded) == 1
+    assert gf_loaded[0].graph == gf_hpct.graph
+    assert gf_loaded[0].dataframe.equals(gf_hpct.dataframe)
+    assert gf_loaded[0].metadata["app"] == "cpi"
+
+    gfs_loaded = store.load(app="mock", columns=["time"])
+    assert [gf.metadata["size"] for gf in gfs_loaded] == [1, 2]
+    for gf in gfs_loaded:
+        assert gf.graph == gf_literal.graph
+        assert list(gf.dataframe.columns) == ["time"]
+        assert gf.dataframe["time"].equals(gf_literal.dataframe["time"])
@@ -1326,3 +1326,143 @@ def test_multi_index_mode_assertion_error(tau_profile_dir):
     engine = QueryEngine()
     with pytest.raises(MultiIndexModeMismatch):
         engine.apply(query, gf.graph, gf.dataframe)
+
+
+def test_vectorized_predicates(mock_graph_literal, tau_profile_dir):
+    gf = GraphFrame.from_literal(mock_graph_literal)
+    queries = [
+        ObjectQuery([{"name": "fr[a-z]+"}, ("+", {"time (inc)": ">= 25.0"})]),
+        ObjectQuery([("*", {"depth": "<= 2", "time": [">= 5", "< 10"]})]),
+        ObjectQuery([{"node_id": 3}, "*", {"depth": -1}]),
+        ObjectQuery([{"missing": 1}]),
+        StringQuery(
+            u"""MATCH (".", p)->("*")->(".", q)
+            WHERE p."name" STARTS WITH "b" OR NOT p."time" < 5.0
+            AND q."name" =~ "ba.*" AND q."time (inc)" >= 5.0
+            """
+        ),
+        StringQuery(
+            u"""MATCH (".", p)
+            WHERE p."time" > 2 AND p."missing" IS NONE OR p IS LEAF
+            """
+        ),
+    ]
+    for query in queries:
+        assert all(pred is not None for pred in query.vectorized_predicates)
+        assert sorted(QueryEngine().apply(query, gf.graph, gf.dataframe)) == sorted(
+            QueryEngine(vectorize=False).apply(query, gf.graph, gf.dataframe)
+        )
+
+    gf = GraphFrame.from_tau(tau_profile_dir)
+    for mode in ["all", "any"]:
+        queries = [
+            ObjectQuery([("+", {"time (inc)": ">= 17983.0", "name": ".*"})], mode),
+            StringQuery(
+                u"""MATCH ("*", p)
+                WHERE p."time" < 24.0 OR p."name" ENDS WITH "c"
+                """,
+                mode,
+            ),
+        ]
+        for query in queries:
+            assert sorted(
+                QueryEngine().apply(query, gf.graph, gf.dataframe)
+            ) == sorted(
+                QueryEngine(vectorize=False).apply(query, gf.graph, gf.dataframe)
+            )
+
+
+def test_automaton_matcher(mock_graph_literal, calc_pi_hpct_db):
+    with pytest.raises(ValueError):
+        QueryEngine(matcher="nfa")
+
+    gf = GraphFrame.from_literal(mock_graph_literal)
+    queries = [
+        ObjectQuery([{"name": "foo"}, "*", {"time (inc)": ">= 10"}]),
+        ObjectQuery(["*", {"name": "ba.*"}, ("*", {"time": "> 5"})]),
+        ObjectQuery([("+", {"time (inc)": ">= 5"}), {"name": "waldo"}]),
+        ObjectQuery([{"name": "qux"}, ("*", {"time": "< 10"})]),
+        ObjectQuery([{"name": "qux"}, "*", {"depth": -1}]),
+        ObjectQuery(["*", "*", {"name": "grault"}]),
+        ObjectQuery([{"name": "nomatch"}, "*"]),
+    ]
+    for query in queries:
+        assert sorted(
+            QueryEngine(matcher="automaton").apply(query, gf.graph, gf.dataframe)
+        ) == sorted(QueryEngine().apply(query, gf.graph, gf.dataframe))
+
+    gf = GraphFrame.from_hpctoolkit(str(calc_pi_hpct_db))
+    queries = [
+        ObjectQuery([{"name": "main"}, "*", {"name": "PMPI_.*"}], "all"),
+        ObjectQuery(["*", {"name": ".*Init.*"}, ("+", {"type": "function"})], "all"),
+        ObjectQuery([{"name": "main"}, ("*", {"time (inc)": "> 0"})], "any"),
+    ]
+    for query in queries:
+        assert sorted(
+            QueryEngine(matcher="automaton").apply(query, gf.graph, gf.dataframe)
+        ) == sorted(QueryEngine().apply(query, gf.graph, gf.dataframe))
+
+
+def test_predicate_cache(mock_graph_literal):
+    gf = GraphFrame.from_literal(mock_graph_literal)
+    engine = QueryEngine()
+    query = ObjectQuery([{"name": "foo"}, ("+", {"time": ">= 5"})])
+    matches = sorted(engine.apply(query, gf.graph, gf.dataframe))
+    # "+" adds two query nodes with the same predicate
+    assert len(engine.predicate_cache) == 2
+
+    # Cached results are reused, but not once the DataFrame is modified
+    assert sorted(engine.apply(query, gf.graph, gf.dataframe)) == matches
+    gf.dataframe["time"] = 0.0
+    assert engine.apply(query, gf.graph, gf.dataframe) == []
+    assert len(engine.predicate_cache) == 2
+    gf.dataframe.loc[:, "time"] = 10.0
+    matches = sorted(QueryEngine().apply(query, gf.graph, gf.dataframe))
+    assert matches != []
+    assert sorted(engine.apply(query, gf.graph, gf.dataframe)) == matches
+    engine.invalidate_cache(gf.dataframe)
+    assert len(engine.predicate_cache) == 0
+
+    # Subqueries share the predicates they have in common
+    gf = GraphFrame.from_literal(mock_graph_literal)
+    engine = QueryEngine()
+    conj = ConjunctionQuery(
+        ObjectQuery([{"name": "foo"}, "*"]), ObjectQuery([{"name": "foo"}, "*"])
+    )
+    engine.apply(conj, gf.graph, gf.dataframe)
+    assert len(engine.predicate_cache) == 2
+
+    engine = QueryEngine(cache_size=1)
+    engine.apply(query, gf.graph, gf.dataframe)
+    assert len(engine.predicate_cache) == 1
+    assert len(QueryEngine(cache_size=0).predicate_cache) == 0
+
+    # GraphFrame methods that modify the DataFrame drop its cached results
+    gf.filter(query, squash=False)
+    assert len(gf.query_engine.predicate_cache) == 2
+    gf.subtree_sum(["time"])
+    assert len(gf.query_engine.predicate_cache) == 0
+
+
+def test_parallel_query_engine(mock_graph_literal):
+    gf = GraphFrame.from_literal(mock_graph_literal)
+    assert len(gf.graph.roots) > 1
+    queries = [
+        ObjectQuery([{"name": "foo"}, "*", {"time (inc)": ">= 10"}]),
+        ObjectQuery([("*", {"time (inc)": ">= 5"}), {"name": "waldo"}]),
+        ConjunctionQuery(
+            ObjectQuery([{"name": "qux"}, "*"]),
+            StringQuery(u"""MATCH (".", p)->("*") WHERE p."time" >= 5"""),
+        ),
+        DisjunctionQuery(
+            ObjectQuery([{"name": "qux"}, "*"]), ObjectQuery([{"name": "bar"}, "*"])
+        ),
+        ExclusiveDisjunctionQuery(
+            ObjectQuery([("*", {"time (inc)": "> 10"})]),
+            ObjectQuery([{"name": "bar"}, "*"]),
+        ),
+    ]
+    for query in queries:
+        assert sorted(
+            QueryEngine(num_procs=2).apply(query, gf.graph, gf.dataframe)
+        ) == sorted(QueryEngine().apply(query, gf.graph, gf.dataframe))
@@ -72,3 +72,17 @@ def test_graphframe_to_literal(tau_profile_dir):
     gf_literal = GraphFrame.from_literal(graph_literal)
 
     assert len(gf.graph) == len(gf_literal.graph)
+
+
+def test_graphframe_parallel(monkeypatch, tau_profile_dir):
+    """Check that the profiles of the ranks are read the same way in worker
+    processes."""
+    gf = GraphFrame.from_tau(str(tau_profile_dir), num_procs=1)
+
+    monkeypatch.setattr("hatchet.readers.tau_reader.parallel_min_profiles", 2)
+    gf_parallel = GraphFrame.from_tau(str(tau_profile_dir), num_procs=2)
+
+    assert gf_parallel.dataframe.index.names == ["node", "rank"]
+    assert len(gf_parallel.graph) == len(gf.graph)
+    assert gf_parallel.dataframe["time"].tolist() == gf.dataframe["time"].tolist()
+    assert gf_parallel.dataframe["name"].tolist() == gf.dataframe["name"].tolist()
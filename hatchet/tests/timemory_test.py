@@ -3,6 +3,9 @@
 #
 # SPDX-License-Identifier: MIT
 
+import io
+import json
+
 import numpy as np
 
 from hatchet import GraphFrame
@@ -64,3 +67,42 @@ def test_default_metric(timemory_json_data):
         lhs = "{}".format(getattr(gf, func)(gf.default_metric))
         rhs = "{}".format(getattr(gf, func)())
         assert lhs == rhs
+
+
+def test_graphframe_from_file(timemory_wall_json):
+    """Sanity test a GraphFrame read from a timemory JSON tree file."""
+    gf = GraphFrame.from_timemory(str(timemory_wall_json))
+
+    assert "rank" in gf.dataframe.index.names
+    assert len(gf.graph) == 14
+    assert gf.default_metric == "sum.wall_clock"
+    assert "sum.wall_clock (inc)" in gf.inc_metrics
+
+
+def test_selected_ranks_and_components(timemory_wall_json):
+    """Check that only the selected ranks and components are read."""
+    gf = GraphFrame.from_timemory(str(timemory_wall_json))
+    with open(str(timemory_wall_json), "rb") as f:
+        gf_rank = GraphFrame.from_timemory(f, ranks=[1])
+
+    assert gf_rank.dataframe.index.unique(level="rank").tolist() == [1]
+    assert np.allclose(
+        gf_rank.dataframe["sum.wall_clock"].to_numpy(),
+        gf.dataframe.xs(1, level="rank")["sum.wall_clock"].to_numpy(),
+    )
+
+    # add a second component, and only read that one
+    with open(str(timemory_wall_json)) as f:
+        json_obj = json.load(f)
+    cpu_clock = dict(json_obj["timemory"]["WALL_CLOCK"], type="cpu")
+    json_obj["timemory"]["tim::component::cpu_clock"] = cpu_clock
+    gf_cpu = GraphFrame.from_timemory(
+        io.StringIO(json.dumps(json_obj)), ["cpu_clock"], ranks=[0]
+    )
+
+    assert gf_cpu.default_metric == "sum.cpu_clock"
+    assert not any("wall" in column for column in gf_cpu.dataframe.columns)
+    assert gf_cpu.dataframe.index.unique(level="rank").tolist() == [0]
+
+    with pytest.raises(TypeError):
+        GraphFrame.from_timemory(str(timemory_wall_json), ranks=1)
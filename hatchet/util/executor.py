@@ -0,0 +1,303 @@
+# Copyright 2017-2023 Lawrence Livermore National Security, LLC and other
+# Hatchet Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import atexit
+import itertools
+import os
+import sys
+from contextlib import contextmanager
+
+import dill
+import multiprocess as mp
+import numpy as np
+import pandas as pd
+
+
+# DataFrames with fewer rows than this are processed serially, because
+# starting the work in other processes costs more than it saves
+parallel_min_rows = 50000
+
+_executor = None
+_executor_procs = 0
+
+# numbers the SharedState objects of this process (see SharedState)
+_tokens = itertools.count()
+
+# token and decoded value of the last SharedState used by a worker process
+_worker_state = {}
+
+
+def _shared_memory():
+    """The multiprocessing.shared_memory module, or None if it is not
+    available (before Python 3.8)."""
+    try:
+        from multiprocessing import shared_memory
+    except ImportError:
+        return None
+    return shared_memory
+
+
+def has_shared_memory():
+    """Whether data can be sent to worker processes through shared memory."""
+    return _shared_memory() is not None
+
+
+def get_executor(num_procs):
+    """Return the pool of worker processes shared by parallel operations.
+
+    The pool is created the first time it is needed and kept until the
+    interpreter exits. It is recreated if a different number of processes
+    is requested.
+
+    Arguments:
+        num_procs (int): number of worker processes
+    """
+    global _executor, _executor_procs
+    if _executor is None or _executor_procs != num_procs:
+        shutdown_executor()
+        _executor = mp.Pool(num_procs)
+        _executor_procs = num_procs
+    return _executor
+
+
+def shutdown_executor():
+    """Stop the worker processes of the shared pool, if it exists."""
+    global _executor, _executor_procs
+    if _executor is not None:
+        _executor.terminate()
+        _executor.join()
+        _executor = None
+        _executor_procs = 0
+
+
+atexit.register(shutdown_executor)
+
+
+def use_parallel(num_rows, num_procs):
+    """Whether a DataFrame with ``num_rows`` rows should be processed in
+    ``num_procs`` worker processes (which needs shared memory)."""
+    return (
+        num_procs > 1
+        and num_rows >= max(parallel_min_rows, num_procs)
+        and has_shared_memory()
+    )
+
+
+@contextmanager
+def recursion_limit(limit):
+    """Raise the recursion limit to at least ``limit`` inside the context,
+    and restore the previous limit afterwards."""
+    previous = sys.getrecursionlimit()
+    if limit > previous:
+        sys.setrecursionlimit(limit)
+    try:
+        yield
+    finally:
+        sys.setrecursionlimit(previous)
+
+
+class SharedState(object):
+    """An object copied once into shared memory for the worker processes.
+
+    Tasks refer to the object by ``ref`` instead of carrying a pickled copy
+    of it, and each worker decodes it only the first time it sees it (see
+    worker_state). Requires Python 3.8 or later.
+    """
+
+    def __init__(self, obj):
+        """Pickle an object into shared memory.
+
+        Arguments:
+            obj: the object, which is pickled with dill
+        """
+        data = dill.dumps(obj, recurse=True)
+        self.shm = _shared_memory().SharedMemory(create=True, size=max(len(data), 1))
+        self.shm.buf[: len(data)] = data
+        self.ref = ((os.getpid(), next(_tokens)), self.shm.name, len(data))
+
+    def close(self):
+        """Release the shared memory block."""
+        self.shm.close()
+        self.shm.unlink()
+
+
+def worker_state(ref, decode=None):
+    """The object of a SharedState in a worker process.
+
+    The object is unpickled, and passed to ``decode``, only the first time a
+    worker sees ``ref``; the result is kept until the worker gets another.
+
+    Arguments:
+        ref (tuple): the ``ref`` of the SharedState
+        decode (callable, optional): converts the unpickled object to the
+            value that is returned
+
+    Returns:
+        the object, or the value returned by ``decode``
+    """
+    token, name, size = ref
+    if _worker_state.get("token") != token:
+        shm = _shared_memory().SharedMemory(name=name)
+        try:
+            value = dill.loads(bytes(shm.buf[:size]))
+        finally:
+            shm.close()
+        if decode is not None:
+            value = decode(value)
+        _worker_state.clear()
+        _worker_state.update(token=token, value=value)
+    return _worker_state["value"]
+
+
+def _node_array(csr):
+    """The nodes of a CSRGraph, as an array that positions index into."""
+    nodes = np.empty(len(csr), dtype=object)
+    nodes[:] = csr.nodes
+    return nodes
+
+
+class SharedColumns(object):
+    """Numeric columns of a DataFrame, copied once into shared memory.
+
+    Worker processes attach to the shared memory block by name instead of
+    receiving pickled copies of the data. The "node" column is encoded as
+    positions into the CSRGraph of the graph, if one is given, and the
+    CSRGraph is sent to each worker once (see SharedState), so Node objects
+    are recreated from the graph arrays once per worker instead of being
+    pickled one by one. Other columns are pickled, one chunk of rows per
+    task. Requires Python 3.8 or later.
+    """
+
+    def __init__(self, dframe, graph=None):
+        """Copy the numeric columns of a DataFrame into shared memory.
+
+        Arguments:
+            dframe (pandas.DataFrame): DataFrame with a default (range) index
+            graph (Graph, optional): the graph that the nodes in the "node"
+                column belong to
+        """
+        self.dframe = dframe
+        self.graph_state = None
+        self.node_column = None
+        arrays = {}
+        for i, (name, column) in enumerate(dframe.items()):
+            if name == "node" and graph is not None:
+                positions = self._node_positions(column, graph)
+                if positions is not None:
+                    arrays[i] = positions
+                    self.node_column = i
+            elif column.dtype.kind in "biuf":
+                arrays[i] = column.to_numpy()
+
+        self.layout = []
+        offset = 0
+        for i, array in arrays.items():
+            self.layout.append((i, array.dtype.str, offset))
+            offset += -(-array.nbytes // 8) * 8
+        self.shm = _shared_memory().SharedMemory(create=True, size=max(offset, 1))
+        for i, dtype, offset in self.layout:
+            array = arrays[i]
+            np.ndarray(array.shape, dtype, self.shm.buf, offset)[:] = array
+
+    def _node_positions(self, column, graph):
+        """Positions of the nodes of a column in the CSRGraph of the graph,
+        or None if some nodes are not part of the graph."""
+        csr = graph.to_csr()
+        index = {id(node): i for i, node in enumerate(csr.nodes)}
+        codes, uniques = pd.factorize(column)
+        positions = np.array([index.get(id(node), -1) for node in uniques])
+        if (positions < 0).any():
+            return None
+        self.graph_state = SharedState(csr)
+        return positions[codes].astype(np.int32)
+
+    def task(self, function, start, stop):
+        """Arguments of _apply_chunk for rows ``start`` to ``stop``."""
+        shared = set(i for i, _, _ in self.layout)
+        pickled = {
+            i: column.iloc[start:stop].to_numpy()
+            for i, (_, column) in enumerate(self.dframe.items())
+            if i not in shared
+        }
+        return (
+            function,
+            self.shm.name,
+            self.layout,
+            self.dframe.columns,
+            pickled,
+            None if self.graph_state is None else self.graph_state.ref,
+            self.node_column,
+            start,
+            stop,
+        )
+
+    def close(self):
+        """Release the shared memory blocks."""
+        self.shm.close()
+        self.shm.unlink()
+        if self.graph_state is not None:
+            self.graph_state.close()
+
+
+def _apply_chunk(task):
+    """Apply a function to the rows of a chunk of a shared DataFrame in a
+    worker process (see SharedColumns)."""
+    function, shm_name, layout, columns, pickled, graph, node_column, start, stop = task
+    function = dill.loads(function)
+    shm = _shared_memory().SharedMemory(name=shm_name)
+    try:
+        arrays = dict(pickled)
+        for i, dtype, offset in layout:
+            dtype = np.dtype(dtype)
+            array = np.ndarray(stop, dtype, shm.buf, offset)[start:stop].copy()
+            if i == node_column:
+                # the nodes are linked, as the function may follow them
+                array = worker_state(graph, _node_array)[array]
+            arrays[i] = array
+        chunk = pd.DataFrame(
+            {i: arrays[i] for i in range(len(columns))},
+            index=pd.RangeIndex(start, stop),
+        )
+        chunk.columns = columns
+        return chunk.apply(function, axis=1).to_numpy()
+    finally:
+        shm.close()
+
+
+def apply_rows(function, dframe, num_procs, graph=None):
+    """Apply a function to every row of a DataFrame in the shared pool of
+    worker processes.
+
+    Arguments:
+        function (callable): function applied to each row (as a Series)
+        dframe (pandas.DataFrame): DataFrame with a default (range) index
+        num_procs (int): number of worker processes
+        graph (Graph, optional): the graph that the nodes in the "node"
+            column belong to
+
+    Returns:
+        (numpy.ndarray): the result for each row, or None if the function
+            cannot be sent to worker processes, or shared memory is not
+            available
+    """
+    if not has_shared_memory():
+        return None
+    try:
+        function = dill.dumps(function, recurse=True)
+    except Exception:
+        # e.g., a closure over an object that cannot be pickled
+        return None
+    bounds = np.linspace(0, len(dframe), num_procs + 1).astype(int)
+    shared = SharedColumns(dframe, graph)
+    try:
+        tasks = [
+            shared.task(function, start, stop)
+            for start, stop in zip(bounds[:-1], bounds[1:])
+            if stop > start
+        ]
+        results = get_executor(num_procs).map(_apply_chunk, tasks, chunksize=1)
+    finally:
+        shared.close()
+    return np.concatenate(results)
@@ -0,0 +1,194 @@
+# Copyright 2017-2023 Lawrence Livermore National Security, LLC and other
+# Hatchet Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import codecs
+import json
+
+
+class JSONStream(object):
+    """Incremental parser of a JSON document whose top-level value is an
+    object.
+
+    The document is read from the stream chunk by chunk. The members of the
+    top-level object can be iterated over one at a time (see items), and
+    parts of the document can be skipped (see load): they are still parsed,
+    but discarded right away instead of being kept in memory.
+    """
+
+    chunk_size = 1 << 16
+
+    def __init__(self, stream):
+        """Parse a JSON document from a file-like object.
+
+        Args:
+            stream (file-like): stream of the document, opened in text or
+                binary mode
+        """
+        self.stream = stream
+        self.decoder = json.JSONDecoder()
+        self.text_decoder = codecs.getincrementaldecoder("utf-8")()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """Append the next chunk of the stream to the unparsed part of the
+        buffer. Returns False at the end of the stream."""
+        while not self.eof:
+            # read at least as much as is left in the buffer, so that a
+            # large value is not decoded again for every chunk
+            chunk = self.stream.read(max(self.chunk_size, len(self.buf) - self.pos))
+            if not chunk:
+                self.eof = True
+                chunk = self.text_decoder.decode(b"", final=True)
+            elif isinstance(chunk, bytes):
+                chunk = self.text_decoder.decode(chunk)
+            if chunk:
+                self.buf = self.buf[self.pos :] + chunk
+                self.pos = 0
+                return True
+        return False
+
+    def _peek(self):
+        """Skip whitespace and return the next character ("" at the end)."""
+        while True:
+            while self.pos < len(self.buf) and self.buf[self.pos] in " \t\n\r":
+                self.pos += 1
+            if self.pos < len(self.buf):
+                return self.buf[self.pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, chars):
+        """Consume the next character, which must be one of chars."""
+        char = self._peek()
+        if not char or char not in chars:
+            raise ValueError(
+                "Invalid JSON: expected one of %r, found %r" % (chars, char)
+            )
+        self.pos += 1
+        return char
+
+    def _value(self):
+        """Decode the next JSON value."""
+        self._peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buf, self.pos)
+            except json.JSONDecodeError:
+                # the value may continue in the next chunk
+                if self._fill():
+                    continue
+                raise
+            # a number may also continue in the next chunk (no value is
+            # followed by one of these characters in a valid document)
+            if (
+                end == len(self.buf) or self.buf[end] in "0123456789.eE+-"
+            ) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def _skip(self):
+        """Skip the next JSON value.
+
+        The value is decoded by the C decoder of the json module and
+        discarded right away, which is faster than scanning for its end in
+        Python.
+        """
+        self._value()
+
+    def _load(self, path, keep):
+        """Decode the next JSON value, at the given path of the document."""
+        char = self._peek()
+        if char == "{":
+            self.pos += 1
+            value = {}
+            if self._peek() == "}":
+                self.pos += 1
+                return value
+            while True:
+                key = self._value()
+                self._expect(":")
+                member = path + (key,)
+                selected = keep(member)
+                if selected is None:
+                    value[key] = self._load(member, keep)
+                elif selected:
+                    value[key] = self._value()
+                else:
+                    self._skip()
+                if self._expect(",}") == "}":
+                    return value
+        elif char == "[":
+            self.pos += 1
+            value = []
+            if self._peek() == "]":
+                self.pos += 1
+                return value
+            while True:
+                element = path + (len(value),)
+                selected = keep(element)
+                if selected is None:
+                    value.append(self._load(element, keep))
+                elif selected:
+                    value.append(self._value())
+                else:
+                    # keep the positions of the other elements
+                    self._skip()
+                    value.append(None)
+                if self._expect(",]") == "]":
+                    return value
+        return self._value()
+
+    def load(self, keep):
+        """Decode the document, skipping the values that are not selected.
+
+        Arguments:
+            keep (callable): called with the path of each value (a tuple of
+                the keys of objects and the positions in arrays leading to
+                it), returns True to decode the value, False to skip it, or
+                None to decide for each of its members or elements. Skipped
+                members of objects are left out, and skipped elements of
+                arrays are replaced by None.
+
+        Returns:
+            (dict): the decoded top-level object
+        """
+        if self._peek() != "{":
+            self._expect("{")
+        return self._load((), keep)
+
+    def _rows(self):
+        """Decode the elements of an array one at a time."""
+        self._expect("[")
+        if self._peek() == "]":
+            self.pos += 1
+            return
+        while True:
+            yield self._value()
+            if self._expect(",]") == "]":
+                return
+
+    def items(self, lazy=("data",)):
+        """Iterate over the (key, value) members of the top-level object.
+
+        Arguments:
+            lazy (tuple, optional): keys of the arrays whose value is an
+                iterator over their elements, which has to be exhausted
+                before the next member is read
+        """
+        self._expect("{")
+        if self._peek() == "}":
+            return
+        while True:
+            key = self._value()
+            self._expect(":")
+            if key in lazy:
+                yield key, self._rows()
+            else:
+                yield key, self._value()
+            if self._expect(",}") == "}":
+                return
@@ -3,7 +3,8 @@
 #
 # SPDX-License-Identifier: MIT
 
-from hatchet.node import Node
+import numpy as np
+import pandas as pd
 
 from abc import abstractmethod
 
@@ -19,33 +20,72 @@ except ImportError:
     ABC = ABCMeta("ABC", (object,), {"__slots__": ()})
 
 
-def _get_node_from_df_iloc(df, ind):
-    node = None
-    if isinstance(df.iloc[ind].name, tuple):
-        node = df.iloc[ind].name[0]
-    elif isinstance(df.iloc[ind].name, Node):
-        node = df.iloc[ind].name
+def _node_codes(index, csr):
+    """Positions in ``csr`` of the distinct nodes of a GraphFrame index.
+
+    The codes of a MultiIndex refer to its levels once unused levels are
+    removed (see ``pandas.MultiIndex.remove_unused_levels``).
+
+    Return:
+        (numpy.ndarray, numpy.ndarray): the position of every distinct node,
+            and for every row of the index, which distinct node it holds
+    """
+    if "node" not in index.names:
+        raise InvalidDataFrameIndex("DataFrame index must have a 'node' level")
+    if isinstance(index, pd.MultiIndex):
+        # the levels of a sliced index can still hold nodes it no longer uses
+        index = index.remove_unused_levels()
+        level = index.names.index("node")
+        uniques, codes = index.levels[level], index.codes[level]
     else:
-        raise InvalidDataFrameIndex(
-            "DataFrame index elements must be either a tuple or a Node"
-        )
-    return node
-
-
-def _fill_children_and_parents(dump_df):
-    dump_df["children"] = [[] for _ in range(len(dump_df))]
-    dump_df["parents"] = [[] for _ in range(len(dump_df))]
-    for i in range(len(dump_df)):
-        node = _get_node_from_df_iloc(dump_df, i)
-        dump_df.iat[i, dump_df.columns.get_loc("children")] = [
-            c._hatchet_nid for c in node.children
-        ]
-        node.children = []
-        dump_df.iat[i, dump_df.columns.get_loc("parents")] = [
-            p._hatchet_nid for p in node.parents
-        ]
-        node.parents = []
-    return dump_df
+        codes, uniques = pd.factorize(index)
+    positions = {id(node): i for i, node in enumerate(csr.nodes)}
+    return np.array([positions[id(node)] for node in uniques], dtype=np.int32), codes
+
+
+def _node_positions(index, csr):
+    """Position in ``csr`` of the node of every row of a GraphFrame index."""
+    unique_positions, codes = _node_codes(index, csr)
+    return unique_positions[codes]
+
+
+def _child_order(csr):
+    """Position of every child link of ``csr`` in its parent's children list.
+
+    The links of a CSRGraph are in traversal order, which can differ from
+    the order of ``Node.children`` (for example, between siblings with equal
+    frames). A child listed several times takes its positions in order.
+    """
+    nodes = csr.nodes
+    offsets = csr.child_offsets.tolist()
+    children = csr.child_indices.tolist()
+    order = np.zeros(len(children), dtype=np.int32)
+    for i, node in enumerate(nodes):
+        start, end = offsets[i], offsets[i + 1]
+        if end - start > 1:
+            positions = {}
+            for k, child in enumerate(node.children):
+                positions.setdefault(id(child), []).append(k)
+            order[start:end] = [
+                positions[id(nodes[c])].pop(0) for c in children[start:end]
+            ]
+    return order
+
+
+def _graph_arrays(csr):
+    """The structure of a graph as flat arrays, plus its frame table."""
+    edge_parents, edge_children = csr.edges()
+    return {
+        "parents": edge_parents,
+        "children": edge_children,
+        "order": _child_order(csr),
+        "parent_links": csr.parent_links(),
+        "frame_ids": csr.frame_ids,
+        "frames": csr.frames,
+        "nids": csr.nids,
+        "depth": csr.depth,
+        "roots": csr.roots,
+    }
 
 
 class DataframeWriter(ABC):
@@ -57,16 +97,27 @@ class DataframeWriter(ABC):
         pass
 
     def write(self, gf, **kwargs):
-        gf_cpy = gf.deepcopy()
-        dump_df = _fill_children_and_parents(gf_cpy.dataframe)
+        csr = gf.graph.to_csr()
+
+        # nodes in the index are replaced by their positions in the graph
+        # arrays, so neither the GraphFrame nor its nodes need to be copied
+        dump_df = gf.dataframe.copy(deep=False)
+        if isinstance(dump_df.index, pd.MultiIndex):
+            dump_df.index = dump_df.index.remove_unused_levels()
+        unique_positions, codes = _node_codes(dump_df.index, csr)
+        if isinstance(dump_df.index, pd.MultiIndex):
+            dump_df.index = dump_df.index.set_levels(unique_positions, level="node")
+        else:
+            dump_df.index = pd.Index(unique_positions[codes], name="node")
+
+        dump_df["graph"] = None
+        dump_df.iat[0, dump_df.columns.get_loc("graph")] = _graph_arrays(csr)
         dump_df["exc_metrics"] = None
-        dump_df.iat[0, dump_df.columns.get_loc("exc_metrics")] = gf_cpy.exc_metrics
+        dump_df.iat[0, dump_df.columns.get_loc("exc_metrics")] = gf.exc_metrics
         dump_df["inc_metrics"] = None
-        dump_df.iat[0, dump_df.columns.get_loc("inc_metrics")] = gf_cpy.inc_metrics
+        dump_df.iat[0, dump_df.columns.get_loc("inc_metrics")] = gf.inc_metrics
         dump_df["default_metric"] = None
-        dump_df.iat[
-            0, dump_df.columns.get_loc("default_metric")
-        ] = gf_cpy.default_metric
+        dump_df.iat[0, dump_df.columns.get_loc("default_metric")] = gf.default_metric
         self._write_dataframe_to_file(dump_df, **kwargs)
 
 
@@ -0,0 +1,226 @@
+# Copyright 2017-2023 Lawrence Livermore National Security, LLC and other
+# Hatchet Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import io
+import json
+
+import numpy as np
+import pandas as pd
+
+from .dataframe_writer import _child_order, _node_positions
+
+
+def _default(obj):
+    """Encode numpy scalars and arrays, which the JSON libraries reject."""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    raise TypeError("Object of type %s is not JSON serializable" % type(obj).__name__)
+
+
+def _encoder(backend=None):
+    """Function that encodes a value as a JSON string.
+
+    Arguments:
+        backend (str, optional): "orjson", "ujson", or "json"; by default,
+            the first of these that can be imported
+
+    Return:
+        (str, function): the backend, and its encoding function
+    """
+    if backend is None:
+        for backend in ("orjson", "ujson", "json"):
+            try:
+                __import__(backend)
+                break
+            except ImportError:
+                pass
+
+    if backend == "orjson":
+        import orjson
+
+        option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+        return (
+            backend,
+            lambda obj: orjson.dumps(obj, default=_default, option=option).decode(),
+        )
+    elif backend == "ujson":
+        import ujson
+
+        return backend, lambda obj: ujson.dumps(obj, default=_default)
+    elif backend == "json":
+        return backend, lambda obj: json.dumps(obj, default=_default)
+    raise ValueError("Unknown JSON backend: %s" % backend)
+
+
+def _column_values(values):
+    """Values of a dataframe column as a list, with None for missing values."""
+    values = np.asarray(values)
+    if values.dtype.kind in "fO":
+        missing = pd.isna(values)
+        if missing.any():
+            values = values.astype(object)
+            values[missing] = None
+    return values.tolist()
+
+
+class JsonWriter:
+    """Convert a GraphFrame to a JSON-compatible dictionary or to JSON.
+
+    Two layouts are supported. The records layout, which ``from_json`` has
+    always read, lists the graph of each root node by node, and the
+    dataframe row by row. The columnar layout stores the graph as arrays
+    (a table of unique frames, the frame and nid of every node, and the
+    parent and child of every link, all by node position), and the
+    dataframe as one array per column, in which nodes are positions.
+
+    Arguments:
+        backend (str, optional): JSON library to encode with: "orjson",
+            "ujson", or "json" (default: the first that is installed)
+    """
+
+    def __init__(self, backend=None):
+        self.backend, self.dumps = _encoder(backend)
+
+    def _records_dict(self, gf):
+        """The records layout, in which the graph of each root is stored as
+        {hatchet_nid: {"data": frame attributes, "children": [hatchet_nid]}}.
+        """
+        hatchet_dict = {}
+
+        graphs = []
+        for root in gf.graph.roots:
+            formatted_graph_dict = {}
+            for n in root.traverse():
+                formatted_graph_dict[n._hatchet_nid] = {
+                    "data": n.frame.attrs,
+                    "children": [c._hatchet_nid for c in n.children],
+                }
+            graphs.append(formatted_graph_dict)
+
+        hatchet_dict["graph"] = graphs
+
+        hatchet_dict["dataframe_indices"] = list(gf.dataframe.index.names)
+        ef = gf.dataframe.reset_index()
+        columns = [
+            [n._hatchet_nid for n in ef[c].tolist()]
+            if c == "node"
+            else _column_values(ef[c].to_numpy())
+            for c in ef.columns
+        ]
+        hatchet_dict["dataframe"] = [
+            dict(zip(ef.columns, row)) for row in zip(*columns)
+        ]
+
+        hatchet_dict["inclusive_metrics"] = gf.inc_metrics
+        hatchet_dict["exclusive_metrics"] = gf.exc_metrics
+
+        return hatchet_dict
+
+    def _columnar_parts(self, gf):
+        """The graph and metric lists of the columnar layout, and the columns
+        of its dataframe as (name, numpy array) pairs.
+        """
+        csr = gf.graph.to_csr()
+        positions = {id(node): i for i, node in enumerate(csr.nodes)}
+
+        # links in the order of the children lists
+        edge_parents, edge_children = csr.edges()
+        links = np.lexsort((_child_order(csr), edge_parents))
+        graph = {
+            "frames": [frame.attrs for frame in csr.frames],
+            "nodes": {"frame": csr.frame_ids, "nid": csr.nids},
+            "edges": {"parent": edge_parents[links], "child": edge_children[links]},
+            "roots": [positions[id(root)] for root in gf.graph.roots],
+        }
+        header = {
+            "format": "columnar",
+            "graph": graph,
+            "dataframe_indices": list(gf.dataframe.index.names),
+            "inclusive_metrics": gf.inc_metrics,
+            "exclusive_metrics": gf.exc_metrics,
+            "default_metric": gf.default_metric,
+        }
+
+        index = gf.dataframe.index
+        columns = [
+            (name, _node_positions(index, csr))
+            if name == "node"
+            else (name, index.get_level_values(name).to_numpy())
+            for name in index.names
+        ]
+        columns.extend((c, gf.dataframe[c].to_numpy()) for c in gf.dataframe.columns)
+        return header, columns
+
+    def _encode_column(self, values):
+        if self.backend == "orjson" and values.dtype.kind in "biuf":
+            # orjson encodes numeric arrays directly, with NaN as null
+            return self.dumps(np.ascontiguousarray(values))
+        return self.dumps(_column_values(values))
+
+    def to_dict(self, gf, columnar=False):
+        """Convert ``gf`` to a dictionary of JSON-compatible values.
+
+        Arguments:
+            gf (GraphFrame): the GraphFrame to convert
+            columnar (bool, optional): use the columnar layout
+
+        Returns:
+            (dict): the dictionary
+        """
+        if not columnar:
+            return self._records_dict(gf)
+
+        header, columns = self._columnar_parts(gf)
+        graph = header["graph"]
+        graph["nodes"] = {k: v.tolist() for k, v in graph["nodes"].items()}
+        graph["edges"] = {k: v.tolist() for k, v in graph["edges"].items()}
+        header["dataframe"] = {c: _column_values(values) for c, values in columns}
+        return header
+
+    def write(self, gf, stream=None, columnar=False):
+        """Encode ``gf`` as JSON.
+
+        In the columnar layout, the dataframe is encoded and written one
+        column at a time, so the whole document is never held in memory.
+
+        Arguments:
+            gf (GraphFrame): the GraphFrame to encode
+            stream (file, optional): text or binary file to write to
+            columnar (bool, optional): use the columnar layout
+
+        Returns:
+            (str): the JSON document, if no stream was given
+        """
+        if stream is None:
+            buffer = io.StringIO()
+            self.write(gf, buffer, columnar)
+            return buffer.getvalue()
+
+        if isinstance(stream, io.TextIOBase):
+            write = stream.write
+        else:
+
+            def write(text):
+                stream.write(text.encode("utf-8"))
+
+        if not columnar:
+            write(self.dumps(self._records_dict(gf)))
+            return
+
+        header, columns = self._columnar_parts(gf)
+        write("{")
+        write(
+            ", ".join(self.dumps(k) + ": " + self.dumps(v) for k, v in header.items())
+        )
+        write(', "dataframe": {')
+        for i, (name, values) in enumerate(columns):
+            if i > 0:
+                write(", ")
+            write(self.dumps(name))
+            write(": ")
+            write(self._encode_column(values))
+        write("}}")
@@ -0,0 +1,155 @@
+# Copyright 2017-2023 Lawrence Livermore National Security, LLC and other
+# Hatchet Project Developers. See the top-level LICENSE file for details.
+#
+# SPDX-License-Identifier: MIT
+
+import json
+import os
+
+import numpy as np
+
+from .dataframe_writer import _child_order, _node_positions
+
+
+def _frame_table(frames):
+    """Columns of a table with one row per interned frame.
+
+    Attributes a frame does not have are stored as nulls. An attribute whose
+    values have several types (e.g. the line is an int in some frames and a
+    str in others) cannot be stored in a typed column, so its values are
+    stored as JSON strings instead.
+
+    Returns:
+        (dict, list): the columns, and the names of the JSON-encoded ones
+    """
+    keys = {}
+    for frame in frames:
+        for key in frame.attrs:
+            keys.setdefault(key, None)
+
+    columns = {}
+    json_columns = []
+    for key in keys:
+        values = [frame.attrs.get(key) for frame in frames]
+        if len({type(v) for v in values if v is not None}) > 1:
+            values = [None if v is None else json.dumps(v) for v in values]
+            json_columns.append(key)
+        columns[key] = values
+    return columns, json_columns
+
+
+class ParquetWriter:
+    """Write a GraphFrame to a directory of Parquet files.
+
+    The graph is stored as integer arrays (one row per node and one row per
+    parent-child link) that refer to a table of interned frames, and the
+    dataframe is stored with typed columns in which nodes are replaced by
+    their positions in the node table. Neither the graph nor the dataframe
+    is copied.
+    """
+
+    def __init__(self, dirname):
+        self.dirname = dirname
+
+    def _write_table(self, name, table, **kwargs):
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, os.path.join(self.dirname, name + ".parquet"), **kwargs)
+
+    def write_frames(self, frames, **kwargs):
+        """Write a table of frames, one row per frame.
+
+        Arguments:
+            frames (list): Frame objects
+            kwargs: passed on to ``pyarrow.parquet.write_table``
+        """
+        import pyarrow as pa
+
+        columns, json_columns = _frame_table(frames)
+        table = pa.table(columns).replace_schema_metadata(
+            {"hatchet": json.dumps({"json_columns": json_columns})}
+        )
+        self._write_table("frames", table, **kwargs)
+
+    def write_graph(self, csr, frame_ids, **kwargs):
+        """Write the node and link arrays of a graph, and the parents list
+        of every node.
+
+        Arguments:
+            csr (CSRGraph): snapshot of the graph
+            frame_ids (numpy.ndarray): row of each node's frame in the frame
+                table
+            kwargs: passed on to ``pyarrow.parquet.write_table``
+        """
+        import pyarrow as pa
+
+        roots = np.zeros(len(csr), dtype=bool)
+        roots[csr.roots] = True
+        nodes = pa.table(
+            {
+                "frame": frame_ids,
+                "nid": csr.nids,
+                "depth": csr.depth,
+                "root": roots,
+            }
+        )
+        edge_parents, edge_children = csr.edges()
+        edges = pa.table(
+            {
+                "parent": edge_parents,
+                "child": edge_children,
+                "order": _child_order(csr),
+            }
+        )
+        link_children, link_parents = csr.parent_links()
+        parents = pa.table({"child": link_children, "parent": link_parents})
+        self._write_table("nodes", nodes, **kwargs)
+        self._write_table("edges", edges, **kwargs)
+        self._write_table("parents", parents, **kwargs)
+
+    def write_dataframe(self, gf, csr, **kwargs):
+        """Write the dataframe of ``gf``, with nodes replaced by positions.
+
+        Arguments:
+            gf (GraphFrame): the GraphFrame whose dataframe to write
+            csr (CSRGraph): snapshot of the graph of ``gf``
+            kwargs: passed on to ``pyarrow.parquet.write_table``
+        """
+        import pyarrow as pa
+
+        index = gf.dataframe.index
+        metrics = pa.Table.from_pandas(gf.dataframe, preserve_index=False)
+        for i, name in enumerate(index.names):
+            if name == "node":
+                column = _node_positions(index, csr)
+            else:
+                column = index.get_level_values(name)
+            metrics = metrics.add_column(i, name, pa.array(column))
+        hatchet_metadata = {
+            "index": list(index.names),
+            "exc_metrics": gf.exc_metrics,
+            "inc_metrics": gf.inc_metrics,
+            "default_metric": gf.default_metric,
+            "metadata": gf.metadata,
+        }
+        # metadata values that JSON cannot represent are stored as strings
+        metrics = metrics.replace_schema_metadata(
+            dict(
+                metrics.schema.metadata or {},
+                hatchet=json.dumps(hatchet_metadata, default=str),
+            )
+        )
+        self._write_table("metrics", metrics, **kwargs)
+
+    def write(self, gf, **kwargs):
+        """Write ``gf`` to the directory, creating it if needed.
+
+        Arguments:
+            gf (GraphFrame): the GraphFrame to write
+            kwargs: passed on to ``pyarrow.parquet.write_table``
+        """
+        os.makedirs(self.dirname, exist_ok=True)
+        csr = gf.graph.to_csr()
+        self.write_frames(csr.frames, **kwargs)
+        self.write_graph(csr, csr.frame_ids, **kwargs)
+        self.write_dataframe(gf, csr, **kwargs)
@@ -27,7 +27,6 @@ should_cythonize = False
 mod_import_path = "hatchet.cython_modules.libs"
 mod_file_path = "hatchet/cython_modules"
 mod_names = [
-    "reader_modules",
     "graphframe_modules",
 ]
 
@@ -64,10 +63,6 @@ if should_cythonize:
 
 
 ext_modules = [
-    Extension(
-        "hatchet.cython_modules.libs.reader_modules",
-        ["hatchet/cython_modules/reader_modules.pyx"],
-    ),
     Extension(
         "hatchet.cython_modules.libs.graphframe_modules",
         ["hatchet/cython_modules/graphframe_modules.pyx"],